@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime
+from collections import Counter, defaultdict
+from db_client import supabase
+from valkey_client import initialize_valkey_client
+from leaderboard_index import (
+    CATEGORIES,
+    LEADERBOARD_NAMES_KEY,
+    LEADERBOARD_COMPLETED_KEY,
+    completion_day,
+    completion_member,
+    leaderboard_key,
+    score_histogram_key,
+)
+from user_stats import compute_stats, stats_key
+
+PAGE_SIZE = 1000
+
+
+def fetch_all_rows(table, columns):
+    """
+    Pages through a Supabase table and yields every row.
+    """
+    start = 0
+    while True:
+        response = (
+            supabase.table(table)
+            .select(columns)
+            .range(start, start + PAGE_SIZE - 1)
+            .execute()
+        )
+        rows = response.dict().get("data", [])
+        yield from rows
+        if len(rows) < PAGE_SIZE:
+            return
+        start += PAGE_SIZE
+
+
+async def backfill():
+    """
+    Seeds the Valkey leaderboard sorted sets from Supabase.
+
+    Scores and display names come from the 'leaderboard' table, and the
+    completed set comes from 'completed_questions' so submissions that were
+    already counted aren't scored twice once incremental updates start.
+    The score histograms are rebuilt from the same scores, and per-user
+    stats from the same completions. Daily and weekly
+    windows start empty and fill from new submissions.
+    """
+    client = await initialize_valkey_client()
+    try:
+        users = 0
+        histograms = {category: Counter() for category in CATEGORIES.values()}
+        for row in fetch_all_rows(
+            "leaderboard", "user_id, display_name, introductory, interview"
+        ):
+            user_id = row["user_id"]
+            for difficulty, category in CATEGORIES.items():
+                score = row.get(difficulty) or 0
+                if score:
+                    await client.zadd(
+                        leaderboard_key(category), {user_id: score}
+                    )
+                    histograms[category][score] += 1
+            if row.get("display_name"):
+                await client.hset(
+                    LEADERBOARD_NAMES_KEY, {user_id: row["display_name"]}
+                )
+            users += 1
+        print(f"Backfilled scores for {users} users.")
+
+        for category, histogram in histograms.items():
+            key = score_histogram_key(category)
+            await client.delete([key])
+            if histogram:
+                await client.hset(
+                    key,
+                    {str(score): str(n) for score, n in histogram.items()},
+                )
+
+        completions = 0
+        per_user = defaultdict(list)
+        for row in fetch_all_rows(
+            "completed_questions",
+            "user_id, question_id, difficulty, completed_at",
+        ):
+            await client.sadd(
+                LEADERBOARD_COMPLETED_KEY,
+                [completion_member(row["user_id"], row["question_id"])],
+            )
+            completed_at = row.get("completed_at")
+            day = completion_day(
+                datetime.fromisoformat(completed_at) if completed_at else None
+            )
+            per_user[row["user_id"]].append((row["difficulty"], day))
+            completions += 1
+        print(f"Backfilled {completions} completed questions.")
+
+        for user_id, user_completions in per_user.items():
+            await client.hset(
+                stats_key(user_id), compute_stats(user_completions)
+            )
+        print(f"Backfilled stats for {len(per_user)} users.")
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
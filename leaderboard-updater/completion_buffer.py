@@ -0,0 +1,60 @@
+# Write-behind buffer for the 'completed_questions' table.
+#
+# Accepted submissions are appended to a Valkey stream by the API handler and
+# bulk-inserted into Supabase by flush_completions.py, so a burst of
+# submissions becomes one PostgREST request per batch instead of one per row.
+from glide import MaxId, MinId
+
+COMPLETIONS_STREAM_KEY = "completed_questions:buffer"
+# Rows Supabase rejected (e.g. a non-UUID user_id or an unknown question_id),
+# kept for inspection instead of blocking the entries behind them
+DEAD_LETTER_STREAM_KEY = "completed_questions:dead_letter"
+COMPLETION_FIELDS = ("user_id", "question_id", "difficulty", "completed_at")
+
+
+async def buffer_completion(client, data):
+    """
+    Appends a completed question to the stream.
+    Returns the stream entry id.
+    """
+    values = [(field, str(data[field])) for field in COMPLETION_FIELDS]
+    entry_id = await client.xadd(COMPLETIONS_STREAM_KEY, values)
+    return entry_id.decode("utf-8")
+
+
+async def read_completions(client, count):
+    """
+    Reads up to count of the oldest buffered completions.
+    Returns a list of (entry_id, row) tuples, oldest first.
+    """
+    entries = await client.xrange(
+        COMPLETIONS_STREAM_KEY, MinId(), MaxId(), count=count
+    )
+    completions = []
+    for entry_id, pairs in (entries or {}).items():
+        row = {
+            field.decode("utf-8"): value.decode("utf-8")
+            for field, value in pairs
+        }
+        completions.append((entry_id.decode("utf-8"), row))
+    return completions
+
+
+async def remove_completions(client, entry_ids):
+    """
+    Deletes flushed entries from the stream.
+    """
+    if not entry_ids:
+        return 0
+    return await client.xdel(COMPLETIONS_STREAM_KEY, entry_ids)
+
+
+async def dead_letter_completion(client, row, error):
+    """
+    Moves a row Supabase rejected to the dead-letter stream, with the error.
+    Returns the dead-letter entry id.
+    """
+    values = [(field, str(value)) for field, value in row.items()]
+    values.append(("error", str(error)))
+    entry_id = await client.xadd(DEAD_LETTER_STREAM_KEY, values)
+    return entry_id.decode("utf-8")
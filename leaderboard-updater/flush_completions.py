@@ -0,0 +1,161 @@
+import os
+import json
+import asyncio
+from db_client import supabase
+from valkey_client import initialize_valkey_client
+from completion_buffer import (
+    dead_letter_completion,
+    read_completions,
+    remove_completions,
+)
+from refresh_trigger import request_leaderboard_refresh
+
+# Rows per PostgREST request, and the most batches flushed per invocation
+BATCH_SIZE = int(os.getenv("FLUSH_BATCH_SIZE", "500"))
+MAX_BATCHES = int(os.getenv("FLUSH_MAX_BATCHES", "20"))
+# SQLSTATE classes of errors caused by the rows themselves: data exceptions
+# (e.g. an invalid UUID) and constraint violations (e.g. a broken FK)
+REJECTED_ROW_SQLSTATES = ("22", "23")
+
+
+class CompletionInsertError(RuntimeError):
+    """
+    Raised when PostgREST reports an error for an insert, with its SQLSTATE
+    code when there is one.
+    """
+
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+
+def insert_completions(rows):
+    """
+    Bulk-inserts completed questions in a single PostgREST request.
+
+    Rows are keyed on (user_id, question_id) and duplicates are ignored, so
+    a batch that is retried after a partial failure never double-counts.
+    """
+    response = (
+        supabase.table("completed_questions")
+        .upsert(
+            rows,
+            on_conflict="user_id,question_id",
+            ignore_duplicates=True,
+        )
+        .execute()
+    )
+    result = response.dict()
+    if result.get("error"):
+        error_msg = result["error"].get("message", "Unknown error")
+        raise CompletionInsertError(
+            f"Error inserting completions: {error_msg}",
+            result["error"].get("code"),
+        )
+    return result.get("data", [])
+
+
+def dedupe_rows(rows):
+    """
+    Drops repeated (user_id, question_id) pairs within a batch, keeping the
+    earliest, since PostgREST rejects a batch that conflicts with itself.
+    """
+    unique = {}
+    for row in rows:
+        unique.setdefault((row["user_id"], row["question_id"]), row)
+    return list(unique.values())
+
+
+def is_rejected(error):
+    """
+    Returns True if Supabase rejected the rows themselves, rather than the
+    request failing (e.g. a timeout), so retrying them can never succeed.
+    PostgREST errors carry the Postgres SQLSTATE as their code.
+    """
+    code = str(getattr(error, "code", None) or "")
+    return code[:2] in REJECTED_ROW_SQLSTATES
+
+
+async def insert_batch(client, rows):
+    """
+    Inserts a batch of rows. If Supabase rejects the batch, its rows are
+    retried one at a time and the ones it still rejects are moved to the
+    dead-letter stream, so they can't block the rest of the stream. Any
+    other failure is raised, leaving the batch buffered for the next run.
+    Returns the number of dead-lettered rows.
+    """
+    try:
+        insert_completions(rows)
+        return 0
+    except Exception as e:
+        if not is_rejected(e):
+            raise
+        print(f"DEBUG: Batch rejected ({e}); retrying row by row.")
+
+    dead_lettered = 0
+    for row in rows:
+        try:
+            insert_completions([row])
+        except Exception as e:
+            if not is_rejected(e):
+                raise
+            print(f"DEBUG: Dead-lettering rejected completion {row}: {e}")
+            await dead_letter_completion(client, row, e)
+            dead_lettered += 1
+    return dead_lettered
+
+
+async def flush():
+    """
+    Drains the completions stream into Supabase batch by batch. Entries are
+    only removed from the stream once their batch has been inserted or its
+    rejected rows dead-lettered, and the leaderboard cache refresher is
+    triggered if anything was flushed.
+    Returns the number of stream entries flushed.
+    """
+    client = await initialize_valkey_client()
+    flushed = 0
+    try:
+        for _ in range(MAX_BATCHES):
+            completions = await read_completions(client, BATCH_SIZE)
+            if not completions:
+                break
+
+            entry_ids = [entry_id for entry_id, _ in completions]
+            rows = dedupe_rows([row for _, row in completions])
+            print(
+                f"DEBUG: Flushing {len(rows)} completions "
+                f"({len(entry_ids)} stream entries)."
+            )
+            await insert_batch(client, rows)
+            await remove_completions(client, entry_ids)
+            flushed += len(entry_ids)
+
+            if len(completions) < BATCH_SIZE:
+                break
+
+        # The new rows change the scores in Supabase, so refresh the cached
+        # leaderboard (debounced across overlapping flushes).
+        if flushed:
+            try:
+                await request_leaderboard_refresh(client)
+            except Exception as e:
+                print("DEBUG: Failed to trigger leaderboard refresh:", e)
+    finally:
+        await client.close()
+    return flushed
+
+
+def lambda_handler(event, context):
+    """
+    Scheduled Lambda entry point that flushes buffered completions.
+    """
+    try:
+        flushed = asyncio.run(flush())
+    except Exception as e:
+        error_msg = f"Failed to flush completions: {str(e)}"
+        print("DEBUG:", error_msg)
+        return {"statusCode": 500, "body": json.dumps({"error": error_msg})}
+
+    print(f"DEBUG: Flushed {flushed} completions.")
+    return {"statusCode": 200, "body": json.dumps({"flushed": flushed})}
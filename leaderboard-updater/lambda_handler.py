@@ -1,13 +1,89 @@
 import json
-from datetime import datetime
+import asyncio
+from datetime import datetime, timezone
 from db_client import supabase
+from valkey_client import initialize_valkey_client
+from leaderboard_index import (
+    completion_day,
+    has_display_name,
+    record_completion,
+)
+from user_stats import update_user_stats
+from completion_buffer import COMPLETION_FIELDS, buffer_completion
+from flush_completions import insert_completions
+
+
+def get_display_name(user_id):
+    """
+    Looks up the user's display name from the Supabase 'leaderboard' table.
+    Returns None if the user has no leaderboard row.
+    """
+    response = (
+        supabase.table("leaderboard")
+        .select("display_name")
+        .eq("user_id", user_id)
+        .limit(1)
+        .execute()
+    )
+    rows = response.dict().get("data", [])
+    return rows[0].get("display_name") if rows else None
+
+
+async def update_leaderboard_index(client, data):
+    """
+    Applies the completed question to the Valkey leaderboard sorted sets
+    (all-time, daily and weekly) and to the user's stats hash.
+    Returns the user's new score, or None if it was already counted.
+    """
+    completed_at = datetime.fromisoformat(data["completed_at"])
+    display_name = None
+    if not await has_display_name(client, data["user_id"]):
+        display_name = get_display_name(data["user_id"])
+    score = await record_completion(
+        client,
+        data["user_id"],
+        data["question_id"],
+        data["difficulty"],
+        display_name=display_name,
+        completed_at=completed_at,
+    )
+    if score is not None:
+        await update_user_stats(
+            client,
+            data["user_id"],
+            data["difficulty"],
+            completion_day(completed_at),
+        )
+    return score
+
+
+async def record_submission(data):
+    """
+    Buffers the completed question for the batched Supabase insert, then
+    applies it to the leaderboard. The leaderboard is best-effort: the
+    buffered row is what ends up in Supabase, so a failure there is logged
+    rather than failing the request.
+    Returns (entry_id, score).
+    """
+    client = await initialize_valkey_client()
+    try:
+        entry_id = await buffer_completion(client, data)
+        score = None
+        try:
+            score = await update_leaderboard_index(client, data)
+        except Exception as e:
+            print("DEBUG: Failed to update leaderboard index:", e)
+        return entry_id, score
+    finally:
+        await client.close()
 
 
 def lambda_handler(event, context):
     """
     Lambda handler to take JSON data from API Gateway, either from the request body
-    or query string parameters, parse it, and insert the record into the
-    'completed_questions' table in Supabase.
+    or query string parameters, parse it, and queue the record for a batched
+    insert into the 'completed_questions' table in Supabase (see
+    flush_completions.py).
     Expected fields: user_id, question_id, difficulty, and optionally completed_at.
     """
     print("DEBUG: Received event:", json.dumps(event))
@@ -69,33 +145,50 @@ def lambda_handler(event, context):
                 "body": json.dumps({"error": error_msg}),
             }
 
-    print("DEBUG: Final input data to be inserted:", data)
+    if not data.get("completed_at"):
+        data["completed_at"] = datetime.now(timezone.utc).isoformat()
+    row = {field: data[field] for field in COMPLETION_FIELDS}
+    print("DEBUG: Final input data to be inserted:", row)
 
-    # 5. Insert data into Supabase 'completed_questions' table.
+    # 5. Buffer the row for the batched insert and update the leaderboard.
     try:
-        print(
-            "DEBUG: Inserting data into Supabase table 'completed_questions'..."
-        )
-        response = supabase.table("completed_questions").insert(data).execute()
-        print("DEBUG: Raw response from Supabase:", response)
-        result = response.dict()
-        if result.get("error"):
-            error_msg = result["error"].get("message", "Unknown error")
-            print("DEBUG: Supabase returned error:", error_msg)
+        entry_id, score = asyncio.run(record_submission(row))
+    except Exception as e:
+        print("DEBUG: Failed to buffer completion; inserting directly:", e)
+        entry_id, score = None, None
+
+    # 6. If Valkey is unavailable, fall back to inserting straight into
+    # Supabase so the submission isn't lost.
+    if entry_id is None:
+        try:
+            inserted = insert_completions([row])
+        except Exception as e:
+            error_msg = f"Failed to insert data: {str(e)}"
+            print("DEBUG:", error_msg)
             return {
                 "statusCode": 500,
                 "body": json.dumps({"error": error_msg}),
             }
-    except Exception as e:
-        error_msg = f"Failed to insert data: {str(e)}"
-        print("DEBUG:", error_msg)
-        return {"statusCode": 500, "body": json.dumps({"error": error_msg})}
 
-    success_msg = "Data inserted successfully"
-    print("DEBUG:", success_msg, "Inserted data:", result.get("data"))
+        success_msg = "Data inserted successfully"
+        print("DEBUG:", success_msg, "Inserted data:", inserted)
+        return {
+            "statusCode": 200,
+            "body": json.dumps(
+                {"message": success_msg, "data": inserted, "score": None}
+            ),
+        }
+
+    success_msg = "Data queued successfully"
+    print("DEBUG:", success_msg, "Stream entry:", entry_id)
     return {
-        "statusCode": 200,
+        "statusCode": 202,
         "body": json.dumps(
-            {"message": success_msg, "data": result.get("data")}
+            {
+                "message": success_msg,
+                "data": row,
+                "entry_id": entry_id,
+                "score": score,
+            }
         ),
     }
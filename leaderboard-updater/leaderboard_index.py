@@ -0,0 +1,160 @@
+# Sorted-set leaderboard kept in Valkey.
+#
+# Every accepted submission bumps the user's score in the sorted set for the
+# question's difficulty, so main-api can read the top-N straight from Valkey
+# instead of waiting for a full rebuild from Supabase. Daily and weekly
+# leaderboards are separate sorted sets per time bucket which expire on
+# their own once the window has passed.
+#
+# Alongside each all-time sorted set, a histogram hash of score -> number of
+# users with that score lets main-api answer "you're in the top 12%" without
+# ranking every user.
+#
+# ElastiCache Serverless runs in cluster mode, where a script may only touch
+# keys in one hash slot. Every key RECORD_COMPLETION_SCRIPT uses therefore
+# shares the "{lb}" hash tag, e.g. "{lb}:easy" and "{lb}:hist:easy".
+from datetime import datetime, timezone
+from glide import Script
+
+# Question difficulty -> leaderboard category
+CATEGORIES = {"introductory": "easy", "interview": "hard"}
+# Hash tag shared by every leaderboard key, so they all map to one slot
+LEADERBOARD_HASH_TAG = "{lb}"
+# Rolling window -> seconds its sorted set is kept after the last update
+WINDOW_TTLS = {"daily": 2 * 24 * 60 * 60, "weekly": 14 * 24 * 60 * 60}
+# Hash of user_id -> display_name used when rendering the leaderboard
+LEADERBOARD_NAMES_KEY = f"{LEADERBOARD_HASH_TAG}:names"
+# Set of "user_id:question_id" pairs that have already been scored
+LEADERBOARD_COMPLETED_KEY = f"{LEADERBOARD_HASH_TAG}:completed"
+
+# Scores one completion atomically: the pair is only marked as scored
+# together with every increment and the histogram move, so a failed update
+# can be retried without losing or double-counting the point.
+#   KEYS[1] = completed set, KEYS[2] = all-time sorted set,
+#   KEYS[3] = all-time score histogram, KEYS[4..] = rolling window sorted sets
+#   ARGV[1] = completed member, ARGV[2] = user_id,
+#   ARGV[3..] = TTL of each rolling window, in KEYS order
+# The user moves from the histogram bucket for new_score - 1 to the one for
+# new_score. Users with no score aren't counted, so a first solve only adds
+# to bucket 1.
+RECORD_COMPLETION_SCRIPT = Script("""
+if redis.call('SADD', KEYS[1], ARGV[1]) == 0 then
+    return false
+end
+for i = 4, #KEYS do
+    redis.call('ZINCRBY', KEYS[i], 1, ARGV[2])
+    redis.call('EXPIRE', KEYS[i], ARGV[i - 1])
+end
+local score = redis.call('ZINCRBY', KEYS[2], 1, ARGV[2])
+local new_score = tonumber(score)
+redis.call('HINCRBY', KEYS[3], string.format('%d', new_score), 1)
+if new_score > 1 then
+    redis.call('HINCRBY', KEYS[3], string.format('%d', new_score - 1), -1)
+end
+return score
+""")
+
+
+def window_id(window, day):
+    """
+    Returns the time bucket a day falls into for a rolling window,
+    e.g. "2025-03-02" for daily or "2025-W09" for weekly.
+    """
+    if window == "daily":
+        return day.isoformat()
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def leaderboard_key(category, window="all", day=None):
+    """
+    Returns the sorted set key for a category and window. The all-time
+    leaderboard lives at "{lb}:{category}", and rolling windows at
+    "{lb}:{window}:{bucket}:{category}".
+    """
+    if window == "all":
+        return f"{LEADERBOARD_HASH_TAG}:{category}"
+    return (
+        f"{LEADERBOARD_HASH_TAG}:{window}:{window_id(window, day)}:{category}"
+    )
+
+
+def score_histogram_key(category):
+    """
+    Returns the hash of score -> user count for a category's all-time
+    leaderboard, e.g. "{lb}:hist:easy".
+    """
+    return f"{LEADERBOARD_HASH_TAG}:hist:{category}"
+
+
+def completion_day(completed_at=None):
+    """
+    Returns the UTC date of a completion, defaulting to today.
+    """
+    if completed_at is None:
+        completed_at = datetime.now(timezone.utc)
+    elif completed_at.tzinfo is not None:
+        completed_at = completed_at.astimezone(timezone.utc)
+    return completed_at.date()
+
+
+def completion_member(user_id, question_id):
+    """
+    Returns the member stored in the completed set for a submission.
+    """
+    return f"{user_id}:{question_id}"
+
+
+async def has_display_name(client, user_id):
+    """
+    Returns True if the user's display name is already cached.
+    """
+    return await client.hexists(LEADERBOARD_NAMES_KEY, user_id)
+
+
+async def record_completion(
+    client,
+    user_id,
+    question_id,
+    difficulty,
+    display_name=None,
+    completed_at=None,
+):
+    """
+    Applies an accepted submission to the all-time, daily and weekly
+    leaderboard sorted sets and the all-time score histogram.
+
+    Each (user_id, question_id) pair is only scored once, so repeated
+    submissions of the same question never inflate a user's score. The
+    daily and weekly buckets are chosen from completed_at (UTC), defaulting
+    to now.
+
+    Returns the user's new all-time score, or None if the pair was already
+    scored. Raises a ValueError for an unknown difficulty.
+    """
+    category = CATEGORIES.get(difficulty)
+    if category is None:
+        raise ValueError(f"Unknown difficulty: {difficulty}")
+
+    if display_name:
+        await client.hset(LEADERBOARD_NAMES_KEY, {user_id: display_name})
+
+    day = completion_day(completed_at)
+    key = leaderboard_key(category)
+    new_score = await client.invoke_script(
+        RECORD_COMPLETION_SCRIPT,
+        keys=[LEADERBOARD_COMPLETED_KEY, key, score_histogram_key(category)]
+        + [leaderboard_key(category, window, day) for window in WINDOW_TTLS],
+        args=[completion_member(user_id, question_id), user_id]
+        + [str(ttl) for ttl in WINDOW_TTLS.values()],
+    )
+    if new_score is None:
+        print(
+            f"DEBUG: {user_id} already scored for question {question_id}; "
+            "skipping leaderboard update."
+        )
+        return None
+
+    new_score = float(new_score)
+    print(f"DEBUG: {key} score for {user_id} is now {new_score}")
+    return new_score
@@ -0,0 +1,46 @@
+import os
+import json
+import boto3
+from glide import ConditionalChange, ExpirySet, ExpiryType
+
+# SQS queue feeding the lambda_cache_leaderboard function; refreshes are
+# skipped if it isn't configured.
+REFRESH_QUEUE_URL = os.getenv("LEADERBOARD_REFRESH_QUEUE_URL")
+# Flushes of accepted submissions within this window trigger a single
+# refresh. The message is delivered once the window has passed, so the
+# refresher sees every flush in it without waiting itself.
+REFRESH_DEBOUNCE_SECONDS = int(os.getenv("REFRESH_DEBOUNCE_SECONDS", "5"))
+REFRESH_PENDING_KEY = "active_leaderboard:refresh_pending"
+
+sqs = boto3.client("sqs", region_name=os.getenv("AWS_REGION", "eu-north-1"))
+
+
+async def request_leaderboard_refresh(client):
+    """
+    Queues a delayed run of the leaderboard cache refresher, unless one is
+    already pending for the current debounce window.
+    Returns True if a refresh was queued.
+    """
+    if not REFRESH_QUEUE_URL:
+        return False
+
+    scheduled = await client.set(
+        REFRESH_PENDING_KEY,
+        "1",
+        conditional_set=ConditionalChange.ONLY_IF_DOES_NOT_EXIST,
+        expiry=ExpirySet(ExpiryType.SEC, REFRESH_DEBOUNCE_SECONDS),
+    )
+    if scheduled is None:
+        print("DEBUG: Leaderboard refresh already pending.")
+        return False
+
+    sqs.send_message(
+        QueueUrl=REFRESH_QUEUE_URL,
+        MessageBody=json.dumps({"source": "completions"}),
+        DelaySeconds=REFRESH_DEBOUNCE_SECONDS,
+    )
+    print(
+        "DEBUG: Queued leaderboard refresh in "
+        f"{REFRESH_DEBOUNCE_SECONDS} seconds."
+    )
+    return True
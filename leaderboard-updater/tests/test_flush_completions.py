@@ -0,0 +1,304 @@
+import sys
+import json
+import types
+import pytest
+
+# db_client connects to Supabase on import, so the tests provide their own
+# module in its place; insert_completions is patched per test.
+sys.modules.setdefault("db_client", types.ModuleType("db_client"))
+sys.modules["db_client"].supabase = None
+
+import flush_completions  # noqa: E402
+from completion_buffer import (  # noqa: E402
+    COMPLETIONS_STREAM_KEY,
+    DEAD_LETTER_STREAM_KEY,
+    buffer_completion,
+    read_completions,
+    remove_completions,
+)
+
+
+# --- Fake Valkey Client ---
+class FakeValkeyClient:
+    """
+    Keeps each stream as an ordered dict of entry id -> field pairs, with
+    the bytes keys and values GLIDE returns.
+    """
+
+    def __init__(self):
+        self.streams = {}
+        self.next_id = 1
+        self.closed = False
+
+    async def xadd(self, key, values):
+        entry_id = f"{self.next_id}-0".encode("utf-8")
+        self.next_id += 1
+        self.streams.setdefault(key, {})[entry_id] = [
+            [field.encode("utf-8"), value.encode("utf-8")]
+            for field, value in values
+        ]
+        return entry_id
+
+    async def xrange(self, key, start, end, count=None):
+        entries = list(self.streams.get(key, {}).items())[:count]
+        return dict(entries) or None
+
+    async def xdel(self, key, ids):
+        stream = self.streams.get(key, {})
+        removed = 0
+        for entry_id in ids:
+            if stream.pop(entry_id.encode("utf-8"), None) is not None:
+                removed += 1
+        return removed
+
+    async def close(self):
+        self.closed = True
+
+
+def completion(user_id, question_id):
+    return {
+        "user_id": user_id,
+        "question_id": question_id,
+        "difficulty": "introductory",
+        "completed_at": "2025-03-02T12:00:00+00:00",
+    }
+
+
+class Inserted(list):
+    """
+    Batches passed to insert_completions, plus the clients a refresh was
+    requested with.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.refreshes = []
+
+
+# --- Pytest Fixtures ---
+@pytest.fixture
+def fake_valkey_client():
+    return FakeValkeyClient()
+
+
+@pytest.fixture
+def inserted(monkeypatch, fake_valkey_client):
+    """
+    Routes the flusher to the fake client and records every inserted batch
+    and refresh request.
+    """
+    batches = Inserted()
+
+    async def fake_initialize():
+        return fake_valkey_client
+
+    async def fake_refresh(client):
+        batches.refreshes.append(client)
+        return True
+
+    monkeypatch.setattr(
+        flush_completions, "initialize_valkey_client", fake_initialize
+    )
+    monkeypatch.setattr(
+        flush_completions, "request_leaderboard_refresh", fake_refresh
+    )
+    monkeypatch.setattr(
+        flush_completions, "insert_completions", batches.append
+    )
+    return batches
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(flush_completions, "BATCH_SIZE", 2)
+    monkeypatch.setattr(flush_completions, "MAX_BATCHES", 10)
+
+
+# --- Stream Buffer Tests ---
+@pytest.mark.asyncio
+async def test_buffered_completions_read_back_oldest_first(
+    fake_valkey_client,
+):
+    first = await buffer_completion(fake_valkey_client, completion("u1", 1))
+    await buffer_completion(fake_valkey_client, completion("u2", 2))
+
+    completions = await read_completions(fake_valkey_client, 1)
+
+    assert completions == [
+        (
+            first,
+            {
+                "user_id": "u1",
+                "question_id": "1",
+                "difficulty": "introductory",
+                "completed_at": "2025-03-02T12:00:00+00:00",
+            },
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_remove_completions(fake_valkey_client):
+    entry_id = await buffer_completion(fake_valkey_client, completion("u1", 1))
+
+    assert await remove_completions(fake_valkey_client, []) == 0
+    assert await remove_completions(fake_valkey_client, [entry_id]) == 1
+    assert await read_completions(fake_valkey_client, 10) == []
+
+
+# --- Flusher Tests ---
+class FakeTable:
+    def __init__(self, calls, name):
+        self.calls = calls
+        self.name = name
+
+    def upsert(self, rows, **options):
+        self.calls.append((self.name, rows, options))
+        return self
+
+    def execute(self):
+        return types.SimpleNamespace(dict=lambda: {"data": []})
+
+
+def test_insert_completions_ignores_duplicates(monkeypatch):
+    calls = []
+    fake_supabase = types.SimpleNamespace(
+        table=lambda name: FakeTable(calls, name)
+    )
+    monkeypatch.setattr(flush_completions, "supabase", fake_supabase)
+    rows = [completion("u1", 1)]
+
+    flush_completions.insert_completions(rows)
+
+    assert calls == [
+        (
+            "completed_questions",
+            rows,
+            {"on_conflict": "user_id,question_id", "ignore_duplicates": True},
+        )
+    ]
+
+
+def test_dedupe_rows_keeps_earliest():
+    rows = [
+        {"user_id": "u1", "question_id": "1", "completed_at": "a"},
+        {"user_id": "u1", "question_id": "1", "completed_at": "b"},
+        {"user_id": "u2", "question_id": "1", "completed_at": "c"},
+    ]
+
+    unique = flush_completions.dedupe_rows(rows)
+
+    assert [row["completed_at"] for row in unique] == ["a", "c"]
+
+
+@pytest.mark.asyncio
+async def test_flush_drains_stream_in_batches(fake_valkey_client, inserted):
+    for user_id in ("u1", "u2", "u3"):
+        await buffer_completion(fake_valkey_client, completion(user_id, 1))
+
+    flushed = await flush_completions.flush()
+
+    assert flushed == 3
+    assert [len(batch) for batch in inserted] == [2, 1]
+    assert fake_valkey_client.streams[COMPLETIONS_STREAM_KEY] == {}
+    assert inserted.refreshes == [fake_valkey_client]
+    assert fake_valkey_client.closed
+
+
+@pytest.mark.asyncio
+async def test_flush_dedupes_within_a_batch(fake_valkey_client, inserted):
+    await buffer_completion(fake_valkey_client, completion("u1", 1))
+    await buffer_completion(fake_valkey_client, completion("u1", 1))
+
+    flushed = await flush_completions.flush()
+
+    assert flushed == 2
+    assert [len(batch) for batch in inserted] == [1]
+
+
+@pytest.mark.asyncio
+async def test_unavailable_database_keeps_entries_buffered(
+    monkeypatch, fake_valkey_client, inserted
+):
+    """
+    A failure that isn't about the rows (here a timeout) leaves them
+    buffered for the next run.
+    """
+    await buffer_completion(fake_valkey_client, completion("u1", 1))
+
+    def failing_insert(rows):
+        raise RuntimeError("Error inserting completions: timeout")
+
+    monkeypatch.setattr(
+        flush_completions, "insert_completions", failing_insert
+    )
+
+    with pytest.raises(RuntimeError):
+        await flush_completions.flush()
+
+    assert len(await read_completions(fake_valkey_client, 10)) == 1
+    assert inserted.refreshes == []
+    assert fake_valkey_client.closed
+
+
+@pytest.mark.asyncio
+async def test_rejected_row_is_dead_lettered(
+    monkeypatch, fake_valkey_client, inserted
+):
+    """
+    A row Supabase rejects is moved to the dead-letter stream, and the good
+    rows in its batch and behind it are still inserted.
+    """
+    for user_id in ("u1", "not-a-uuid", "u3"):
+        await buffer_completion(fake_valkey_client, completion(user_id, 1))
+
+    def rejecting_insert(rows):
+        if any(row["user_id"] == "not-a-uuid" for row in rows):
+            raise flush_completions.CompletionInsertError(
+                "Error inserting completions: invalid input syntax for "
+                'type uuid: "not-a-uuid"',
+                "22P02",
+            )
+        inserted.append(rows)
+
+    monkeypatch.setattr(
+        flush_completions, "insert_completions", rejecting_insert
+    )
+
+    flushed = await flush_completions.flush()
+
+    assert flushed == 3
+    assert [[row["user_id"] for row in batch] for batch in inserted] == [
+        ["u1"],
+        ["u3"],
+    ]
+    assert fake_valkey_client.streams[COMPLETIONS_STREAM_KEY] == {}
+    [dead_letter] = fake_valkey_client.streams[DEAD_LETTER_STREAM_KEY].values()
+    fields = {field.decode(): value.decode() for field, value in dead_letter}
+    assert fields["user_id"] == "not-a-uuid"
+    assert "invalid input syntax" in fields["error"]
+    assert inserted.refreshes == [fake_valkey_client]
+
+
+@pytest.mark.parametrize(
+    "code, rejected",
+    [("22P02", True), ("23503", True), ("23505", True), ("57014", False)],
+)
+def test_is_rejected(code, rejected):
+    error = flush_completions.CompletionInsertError("error", code)
+    assert flush_completions.is_rejected(error) is rejected
+    assert not flush_completions.is_rejected(RuntimeError("timeout"))
+
+
+@pytest.mark.asyncio
+async def test_empty_stream_skips_refresh(fake_valkey_client, inserted):
+    assert await flush_completions.flush() == 0
+    assert inserted == []
+    assert inserted.refreshes == []
+
+
+def test_lambda_handler_reports_flushed_count(fake_valkey_client, inserted):
+    response = flush_completions.lambda_handler({}, None)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"]) == {"flushed": 0}
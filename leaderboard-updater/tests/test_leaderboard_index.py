@@ -0,0 +1,211 @@
+import os
+import binascii
+import pytest
+from datetime import datetime, timezone
+from glide import (
+    GlideClusterClient,
+    GlideClusterClientConfiguration,
+    NodeAddress,
+)
+
+from leaderboard_index import (
+    LEADERBOARD_COMPLETED_KEY,
+    RECORD_COMPLETION_SCRIPT,
+    WINDOW_TTLS,
+    leaderboard_key,
+    record_completion,
+    score_histogram_key,
+)
+
+# Set to a throwaway cluster-mode Valkey to run the real script, e.g.
+#   VALKEY_TEST_HOST=localhost VALKEY_TEST_PORT=7000
+VALKEY_TEST_HOST = os.getenv("VALKEY_TEST_HOST")
+VALKEY_TEST_PORT = int(os.getenv("VALKEY_TEST_PORT", "6379"))
+
+
+def key_slot(key):
+    """
+    Returns the cluster hash slot of a key, honouring {hash tags}.
+    """
+    tag = key.partition("{")[2].partition("}")
+    if tag[1] and tag[0]:
+        key = tag[0]
+    return binascii.crc_hqx(key.encode("utf-8"), 0) % 16384
+
+
+# --- Fake Valkey Client ---
+class FakeValkeyClient:
+    """
+    Keeps sets, sorted sets and hashes in dicts. Scripts are emulated in
+    Python, all-or-nothing like the real server runs them, and reject keys
+    in different slots like a cluster-mode server.
+    """
+
+    def __init__(self):
+        self.sets = {}
+        self.zsets = {}
+        self.hashes = {}
+        self.ttls = {}
+        self.fail_scripts = False
+
+    def zincrby(self, key, increment, member):
+        zset = self.zsets.setdefault(key, {})
+        zset[member] = zset.get(member, 0) + increment
+        return zset[member]
+
+    def hincrby(self, key, field, increment):
+        hash_ = self.hashes.setdefault(key, {})
+        hash_[field] = hash_.get(field, 0) + increment
+        return hash_[field]
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    async def invoke_script(self, script, keys, args):
+        if self.fail_scripts:
+            raise ConnectionError("connection reset")
+        assert script is RECORD_COMPLETION_SCRIPT
+        if len({key_slot(key) for key in keys}) > 1:
+            raise RuntimeError(
+                "CROSSSLOT Keys in request don't hash to the same slot"
+            )
+        completed = self.sets.setdefault(keys[0], set())
+        if args[0] in completed:
+            return None
+        completed.add(args[0])
+        for key, ttl in zip(keys[3:], args[2:]):
+            self.zincrby(key, 1, args[1])
+            self.ttls[key] = int(ttl)
+        new_score = self.zincrby(keys[1], 1, args[1])
+        self.hincrby(keys[2], str(new_score), 1)
+        if new_score > 1:
+            self.hincrby(keys[2], str(new_score - 1), -1)
+        return str(new_score).encode("utf-8")
+
+
+COMPLETED_AT = datetime(2025, 3, 2, 12, tzinfo=timezone.utc)
+
+
+# --- Test Cases ---
+@pytest.mark.asyncio
+async def test_record_completion_scores_every_window_once():
+    client = FakeValkeyClient()
+
+    score = await record_completion(
+        client, "u1", "q1", "introductory", completed_at=COMPLETED_AT
+    )
+    again = await record_completion(
+        client, "u1", "q1", "introductory", completed_at=COMPLETED_AT
+    )
+
+    assert score == 1.0
+    assert again is None
+    day = COMPLETED_AT.date()
+    assert client.zsets[leaderboard_key("easy")] == {"u1": 1}
+    for window, ttl in WINDOW_TTLS.items():
+        key = leaderboard_key("easy", window, day)
+        assert client.zsets[key] == {"u1": 1}
+        assert client.ttls[key] == ttl
+
+
+@pytest.mark.asyncio
+async def test_histogram_moves_with_the_score():
+    client = FakeValkeyClient()
+
+    await record_completion(client, "u1", "q1", "introductory")
+    await record_completion(client, "u2", "q1", "introductory")
+    await record_completion(client, "u1", "q2", "introductory")
+    # A repeat leaves the histogram alone too.
+    await record_completion(client, "u1", "q2", "introductory")
+
+    assert client.hashes[score_histogram_key("easy")] == {"1": 1, "2": 1}
+
+
+@pytest.mark.asyncio
+async def test_failed_update_can_be_retried():
+    """
+    The pair is only marked as scored by the same script that scores it, so
+    a failed update leaves nothing behind and a retry still counts.
+    """
+    client = FakeValkeyClient()
+    client.fail_scripts = True
+    with pytest.raises(ConnectionError):
+        await record_completion(client, "u1", "q1", "interview")
+    assert not client.sets.get(LEADERBOARD_COMPLETED_KEY)
+    assert not client.hashes.get(score_histogram_key("hard"))
+
+    client.fail_scripts = False
+    assert await record_completion(client, "u1", "q1", "interview") == 1.0
+
+
+@pytest.mark.asyncio
+async def test_unknown_difficulty_raises():
+    with pytest.raises(ValueError):
+        await record_completion(FakeValkeyClient(), "u1", "q1", "expert")
+
+
+def test_key_slot_matches_cluster():
+    # Slots from the cluster specification and CLUSTER KEYSLOT.
+    assert key_slot("123456789") == 12739
+    assert key_slot("{user1000}.following") == key_slot("user1000")
+    assert key_slot("{lb}:hist:easy") == key_slot("lb")
+
+
+@pytest.mark.asyncio
+async def test_script_keys_share_one_slot():
+    """
+    ElastiCache Serverless runs in cluster mode, so every key the script
+    touches must hash to the same slot.
+    """
+    day = COMPLETED_AT.date()
+    keys = [LEADERBOARD_COMPLETED_KEY]
+    for category in ("easy", "hard"):
+        keys += [leaderboard_key(category), score_histogram_key(category)]
+        keys += [leaderboard_key(category, w, day) for w in WINDOW_TTLS]
+
+    assert len({key_slot(key) for key in keys}) == 1
+
+
+# --- Valkey Cluster Tests ---
+@pytest.mark.asyncio
+@pytest.mark.skipif(not VALKEY_TEST_HOST, reason="VALKEY_TEST_HOST not set")
+async def test_record_completion_on_cluster():
+    """
+    Runs the real script on a cluster-mode server.
+    """
+    client = await GlideClusterClient.create(
+        GlideClusterClientConfiguration(
+            addresses=[NodeAddress(VALKEY_TEST_HOST, VALKEY_TEST_PORT)]
+        )
+    )
+    day = COMPLETED_AT.date()
+    keys = [
+        LEADERBOARD_COMPLETED_KEY,
+        leaderboard_key("easy"),
+        score_histogram_key("easy"),
+    ] + [leaderboard_key("easy", window, day) for window in WINDOW_TTLS]
+    try:
+        await client.delete(keys)
+
+        first = await record_completion(
+            client, "u1", "q1", "introductory", completed_at=COMPLETED_AT
+        )
+        repeat = await record_completion(
+            client, "u1", "q1", "introductory", completed_at=COMPLETED_AT
+        )
+        second = await record_completion(
+            client, "u1", "q2", "introductory", completed_at=COMPLETED_AT
+        )
+
+        assert (first, repeat, second) == (1.0, None, 2.0)
+        assert await client.hgetall(score_histogram_key("easy")) == {
+            b"1": b"0",
+            b"2": b"1",
+        }
+        for window, ttl in WINDOW_TTLS.items():
+            key = leaderboard_key("easy", window, day)
+            assert await client.zscore(key, "u1") == 2.0
+            assert 0 < await client.ttl(key) <= ttl
+    finally:
+        await client.delete(keys)
+        await client.close()
@@ -0,0 +1,96 @@
+import json
+import pytest
+from glide import ConditionalChange
+
+import refresh_trigger
+from refresh_trigger import (
+    REFRESH_DEBOUNCE_SECONDS,
+    REFRESH_PENDING_KEY,
+    request_leaderboard_refresh,
+)
+
+
+# --- Fake Valkey Client ---
+class FakeValkeyClient:
+    """
+    Supports SET with NX; expire() stands in for the key's TTL running out.
+    """
+
+    def __init__(self):
+        self.store = {}
+        self.expiries = {}
+
+    async def set(self, key, value, conditional_set=None, expiry=None):
+        only_if_missing = (
+            conditional_set == ConditionalChange.ONLY_IF_DOES_NOT_EXIST
+        )
+        if only_if_missing and key in self.store:
+            return None
+        self.store[key] = value
+        self.expiries[key] = expiry
+        return "OK"
+
+    def expire(self, key):
+        self.store.pop(key, None)
+
+
+class FakeSQS:
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, **kwargs):
+        self.messages.append(kwargs)
+        return {"MessageId": str(len(self.messages))}
+
+
+# --- Pytest Fixtures ---
+@pytest.fixture
+def sqs(monkeypatch):
+    fake = FakeSQS()
+    monkeypatch.setattr(refresh_trigger, "sqs", fake)
+    monkeypatch.setattr(
+        refresh_trigger, "REFRESH_QUEUE_URL", "https://sqs.test/refresh"
+    )
+    return fake
+
+
+# --- Test Cases ---
+@pytest.mark.asyncio
+async def test_refresh_is_queued_with_delay(sqs):
+    client = FakeValkeyClient()
+
+    assert await request_leaderboard_refresh(client) is True
+
+    assert sqs.messages == [
+        {
+            "QueueUrl": "https://sqs.test/refresh",
+            "MessageBody": json.dumps({"source": "completions"}),
+            "DelaySeconds": REFRESH_DEBOUNCE_SECONDS,
+        }
+    ]
+    assert REFRESH_PENDING_KEY in client.store
+    assert client.expiries[REFRESH_PENDING_KEY] is not None
+
+
+@pytest.mark.asyncio
+async def test_flushes_in_one_window_share_a_refresh(sqs):
+    client = FakeValkeyClient()
+
+    assert await request_leaderboard_refresh(client) is True
+    assert await request_leaderboard_refresh(client) is False
+    assert len(sqs.messages) == 1
+
+    # Once the window has passed, the next flush queues a new refresh.
+    client.expire(REFRESH_PENDING_KEY)
+    assert await request_leaderboard_refresh(client) is True
+    assert len(sqs.messages) == 2
+
+
+@pytest.mark.asyncio
+async def test_no_queue_configured(monkeypatch, sqs):
+    monkeypatch.setattr(refresh_trigger, "REFRESH_QUEUE_URL", None)
+    client = FakeValkeyClient()
+
+    assert await request_leaderboard_refresh(client) is False
+    assert sqs.messages == []
+    assert client.store == {}
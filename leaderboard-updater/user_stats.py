@@ -0,0 +1,86 @@
+# Per-user stats kept in Valkey, updated once per newly completed question
+# so main-api can serve them with a single HGETALL.
+#
+# stats:{user_id} is a hash with the fields:
+#   introductory, interview, total  - solved counts
+#   current_streak, longest_streak  - consecutive UTC days with a solve
+#   last_solved_day                 - ISO date of the latest solve
+from datetime import timedelta
+from glide import Script
+
+# Applies one completion atomically. Completions older than the last solved
+# day still count towards the totals but leave the streak alone.
+#   KEYS[1] = stats hash
+#   ARGV[1] = difficulty field, ARGV[2] = solved day, ARGV[3] = day before
+UPDATE_STATS_SCRIPT = Script("""
+local key = KEYS[1]
+redis.call('HINCRBY', key, ARGV[1], 1)
+redis.call('HINCRBY', key, 'total', 1)
+
+local last = redis.call('HGET', key, 'last_solved_day')
+local current = tonumber(redis.call('HGET', key, 'current_streak') or '0')
+if (not last) or ARGV[2] > last then
+    if last == ARGV[3] then
+        current = current + 1
+    else
+        current = 1
+    end
+    local longest = tonumber(redis.call('HGET', key, 'longest_streak') or '0')
+    if current > longest then
+        longest = current
+    end
+    redis.call(
+        'HSET', key,
+        'current_streak', current,
+        'longest_streak', longest,
+        'last_solved_day', ARGV[2]
+    )
+end
+return current
+""")
+
+
+def stats_key(user_id):
+    return f"stats:{user_id}"
+
+
+async def update_user_stats(client, user_id, difficulty, day):
+    """
+    Records a newly completed question in the user's stats hash.
+    Returns the user's current streak.
+    """
+    previous_day = day - timedelta(days=1)
+    return await client.invoke_script(
+        UPDATE_STATS_SCRIPT,
+        keys=[stats_key(user_id)],
+        args=[difficulty, day.isoformat(), previous_day.isoformat()],
+    )
+
+
+def compute_stats(completions):
+    """
+    Builds the stats hash for one user from (difficulty, day) pairs. Used by
+    backfill_leaderboard.py to seed the hashes from existing completions.
+    """
+    stats = {"introductory": 0, "interview": 0, "total": 0}
+    for difficulty, _ in completions:
+        if difficulty in stats:
+            stats[difficulty] += 1
+        stats["total"] += 1
+
+    days = sorted({day for _, day in completions})
+    current = longest = 0
+    previous = None
+    for day in days:
+        if previous is not None and day - previous == timedelta(days=1):
+            current += 1
+        else:
+            current = 1
+        longest = max(longest, current)
+        previous = day
+
+    stats["current_streak"] = current
+    stats["longest_streak"] = longest
+    if previous is not None:
+        stats["last_solved_day"] = previous.isoformat()
+    return {field: str(value) for field, value in stats.items()}
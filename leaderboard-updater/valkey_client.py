@@ -0,0 +1,32 @@
+import os
+from glide import (
+    GlideClient,
+    GlideClientConfiguration,
+    NodeAddress,
+    Logger,
+    LogLevel,
+)
+
+# Configure logger for Glide
+Logger.set_logger_config(LogLevel.INFO)
+
+
+async def initialize_valkey_client():
+    """
+    Initializes the Valkey client using Glide.
+    """
+    host = os.getenv(
+        "VALKEY_HOST", "main-cache-mutbnm.serverless.eun1.cache.amazonaws.com"
+    )
+    port = int(os.getenv("VALKEY_PORT", "6379"))
+
+    addresses = [NodeAddress(host, port)]
+    config = GlideClientConfiguration(addresses=addresses, use_tls=True)
+
+    try:
+        client = await GlideClient.create(config)
+        print("Valkey client created successfully.")
+        return client
+    except Exception as e:
+        print("Failed to create Valkey client:", e)
+        raise
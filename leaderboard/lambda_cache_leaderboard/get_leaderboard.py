@@ -1,8 +1,12 @@
 import httpx
 import os
-import json
 
-BASE_URL = os.getenv("LEADERBOARD_API_URL")
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+# Database function returning the top entries for both difficulties at once
+# (see supabase/migrations/20261019000002_get_leaderboard_top.sql)
+LEADERBOARD_RPC = "get_leaderboard_top"
 
 
 class DailyLeaderboardError(Exception):
@@ -10,24 +14,30 @@ class DailyLeaderboardError(Exception):
 
 
 async def get_leaderboard(count=5):
-    print(f"DEBUG: LEADERBOARD_API_URL = {BASE_URL}")
-
-    url = f"{BASE_URL}/lambda-leaderboard"
-    print(f"DEBUG: Constructed URL = {url}")
+    """
+    Fetches the top entries for both difficulties straight from Supabase in a
+    single RPC call. The lists come back ordered highest score first.
+    Returns a dict with keys 'easy' and 'hard'.
+    """
+    url = f"{SUPABASE_URL}/rest/v1/rpc/{LEADERBOARD_RPC}"
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+    }
 
     try:
-        async with httpx.AsyncClient(timeout=72.0) as client:
-            print("DEBUG: About to make GET request for leaderboard data...")
-            response = await client.get(url)
-            print(
-                f"DEBUG: Response received. Status code = {response.status_code}"
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            print("DEBUG: About to call leaderboard RPC...")
+            response = await client.post(
+                url, headers=headers, json={"p_count": count}
             )
             print(
-                f"DEBUG: Response body (truncated to 300 chars): {response.text[:300]}"
+                f"DEBUG: Response received. Status code = {response.status_code}"
             )
     except httpx.RequestError as exc:
         raise DailyLeaderboardError(
-            f"Failed to contact external API: {str(exc)}"
+            f"Failed to contact Supabase: {str(exc)}"
         ) from exc
 
     if response.status_code != 200:
@@ -36,30 +46,39 @@ async def get_leaderboard(count=5):
         )
 
     try:
-        data = json.loads(response.text)
-        print(
-            f"DEBUG: Successfully parsed JSON. Number of top-level keys = {len(data)}"
-        )
+        data = response.json()
     except ValueError as exc:
         raise DailyLeaderboardError(
-            f"Invalid JSON response from external API: {str(exc)}"
+            f"Invalid JSON response from Supabase: {str(exc)}"
         ) from exc
 
-    # Extract the lists for each category
-    introductory_list = data.get("introductory", [])
-    interview_list = data.get("interview", [])
+    return {
+        "easy": data.get("introductory") or [],
+        "hard": data.get("interview") or [],
+    }
+
 
-    # Sort for easy (introductory) descending
-    easy_sorted = sorted(
-        introductory_list, key=lambda x: x.get("score", 0), reverse=True
-    )
-    easy_top = easy_sorted[:count]
+def rank_entries(entries):
+    """
+    Adds a 1-based rank to each entry, which arrive highest score first.
+    Returns entries shaped like {"rank": 1, "name": "Alice", "score": 100}.
+    """
+    return [
+        {
+            "rank": index + 1,
+            "name": entry.get("name") or "Unknown",
+            "score": entry.get("score") or 0,
+        }
+        for index, entry in enumerate(entries)
+    ]
 
-    # Sort for hard (interview) descending
-    hard_sorted = sorted(
-        interview_list, key=lambda x: x.get("score", 0), reverse=True
-    )
-    hard_top = hard_sorted[:count]
 
-    print("DEBUG: Returning top records for easy & hard.")
-    return {"easy": easy_top, "hard": hard_top}
+def format_leaderboard_snapshot(leaderboard):
+    """
+    Formats the leaderboard exactly as main-api serves it, so readers can
+    return the snapshot without parsing or sorting it again.
+    """
+    return {
+        category: rank_entries(leaderboard.get(category, []))
+        for category in ("easy", "hard")
+    }
@@ -1,16 +1,21 @@
 import os
 import json
 import asyncio
+import hashlib
 from dotenv import load_dotenv
 from glide import (
+    ExpirySet,
+    ExpiryType,
     GlideClient,
     GlideClientConfiguration,
     NodeAddress,
     Logger,
     LogLevel,
+    Script,
 )
 from get_leaderboard import (
     get_leaderboard,
+    format_leaderboard_snapshot,
 )  # Note: ensure function names match
 
 # Load environment variables from .env file if needed
@@ -19,6 +24,47 @@ load_dotenv()
 # Configure logger for Glide
 Logger.set_logger_config(LogLevel.INFO)
 
+# Snapshots are immutable and written to "{namespace}:v{n}". The small
+# "{namespace}:current" pointer holds {"version": n, "hash": ...} and is moved
+# by PUBLISH_SCRIPT once the new snapshot is in place. The namespace is used
+# as a hash tag, so in cluster mode the pointer and every snapshot share a
+# slot and the script can touch both. The testing deployment sets
+# LEADERBOARD_NAMESPACE=leaderboard_testing.
+NAMESPACE = "{" + os.getenv("LEADERBOARD_NAMESPACE", "leaderboard") + "}"
+POINTER_KEY = f"{NAMESPACE}:current"
+VERSION_COUNTER_KEY = f"{NAMESPACE}:version"
+# Every snapshot is written with this expiry. Only the one the pointer moves
+# to is persisted; superseded snapshots (kept briefly for readers still
+# holding the old pointer) and ones that lost a race expire on their own.
+OLD_SNAPSHOT_TTL_SECONDS = int(os.getenv("OLD_SNAPSHOT_TTL_SECONDS", "300"))
+
+# Moves the pointer to a new snapshot unless a newer version is already
+# published, so an older snapshot from a concurrent refresh can't win.
+#   KEYS[1] = pointer, KEYS[2] = new snapshot
+#   ARGV[1] = new version, ARGV[2] = new pointer
+# Returns {published version, superseded version}: the published version is
+# ARGV[1] if the pointer moved, and the superseded one is 0 if nothing was
+# replaced. Cluster mode only allows keys declared in KEYS, so the caller
+# expires the superseded snapshot.
+PUBLISH_SCRIPT = Script("""
+local current = redis.call('GET', KEYS[1])
+local previous = 0
+if current then
+    previous = cjson.decode(current)['version']
+    if previous >= tonumber(ARGV[1]) then
+        return {previous, 0}
+    end
+end
+redis.call('SET', KEYS[1], ARGV[2])
+redis.call('PERSIST', KEYS[2])
+return {tonumber(ARGV[1]), previous}
+""")
+
+# The event loop and Valkey client are kept for the lifetime of the
+# container so warm invocations reuse the same connection.
+loop = asyncio.new_event_loop()
+valkey_client = None
+
 
 async def initialize_valkey_client():
     """
@@ -45,26 +91,46 @@ async def initialize_valkey_client():
         raise
 
 
+def snapshot_key(version):
+    return f"{NAMESPACE}:v{version}"
+
+
+def content_hash(payload):
+    """
+    Returns a stable hash of the leaderboard payload.
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
 async def async_handler(event, context):
     """
-    Async handler that initializes the client if needed, fetches leaderboard data,
-    and updates the cache.
+    Async handler that fetches leaderboard data, writes it as a new
+    versioned snapshot and moves the pointer to it, skipping the write when
+    the leaderboard hasn't changed.
+
+    Runs on a schedule, and from the leaderboard-updater's SQS queue once
+    accepted submissions reach Supabase. The updater delays those messages
+    by its debounce window, so a burst of submissions is already in
+    Supabase when this runs.
     """
+    global valkey_client
 
     print("DEBUG: Received event:", event)
 
     # Initialize the client if not already done.
-    print("DEBUG: valkey_client is None; initializing now.")
-    try:
-        valkey_client = await initialize_valkey_client()
-    except Exception as e:
-        print("DEBUG: Exception while initializing Valkey client:", e)
-        return {
-            "statusCode": 500,
-            "body": json.dumps(
-                {"error": f"Valkey initialization failed: {str(e)}"}
-            ),
-        }
+    if valkey_client is None:
+        print("DEBUG: valkey_client is None; initializing now.")
+        try:
+            valkey_client = await initialize_valkey_client()
+        except Exception as e:
+            print("DEBUG: Exception while initializing Valkey client:", e)
+            return {
+                "statusCode": 500,
+                "body": json.dumps(
+                    {"error": f"Valkey initialization failed: {str(e)}"}
+                ),
+            }
 
     # Try to get new leaderboard data.
     try:
@@ -75,27 +141,70 @@ async def async_handler(event, context):
         print(f"DEBUG: Error getting leaderboard: {e}")
         return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
 
-    cache_payload = leaderboard
-    print("DEBUG: cache_payload ready. Key to store = 'active_leaderboard'")
+    cache_payload = format_leaderboard_snapshot(leaderboard)
+    new_hash = content_hash(cache_payload)
 
-    # Update the cache with the new data.
-    key = "active_leaderboard"
+    # Publish a new snapshot only if the content changed, or if the current
+    # snapshot is gone (e.g. evicted) even though the pointer survived.
     try:
-        print("DEBUG: Attempting to set data in Valkey cache...")
-        await valkey_client.set(key, json.dumps(cache_payload))
-        print("DEBUG: Successfully set data in Valkey cache.")
+        pointer = await valkey_client.get(POINTER_KEY)
+        current = json.loads(pointer) if pointer else None
+        if (
+            current
+            and current.get("hash") == new_hash
+            and await valkey_client.exists([snapshot_key(current["version"])])
+        ):
+            print("DEBUG: Leaderboard unchanged; skipping cache write.")
+            return {
+                "statusCode": 200,
+                "body": json.dumps({"updated": False, **current}),
+            }
+
+        version = await valkey_client.incr(VERSION_COUNTER_KEY)
+        print(f"DEBUG: Writing leaderboard snapshot '{snapshot_key(version)}'")
+        await valkey_client.set(
+            snapshot_key(version),
+            json.dumps(cache_payload),
+            expiry=ExpirySet(ExpiryType.SEC, OLD_SNAPSHOT_TTL_SECONDS),
+        )
+        new_pointer = {"version": version, "hash": new_hash}
+        published, superseded = await valkey_client.invoke_script(
+            PUBLISH_SCRIPT,
+            keys=[POINTER_KEY, snapshot_key(version)],
+            args=[str(version), json.dumps(new_pointer)],
+        )
+        if superseded:
+            # Readers still holding the old pointer get a grace period.
+            await valkey_client.expire(
+                snapshot_key(superseded), OLD_SNAPSHOT_TTL_SECONDS
+            )
+        if int(published) != version:
+            print(
+                f"DEBUG: Version {published} already published; "
+                f"leaving version {version} to expire."
+            )
+            return {
+                "statusCode": 200,
+                "body": json.dumps({"updated": False, "version": published}),
+            }
+        print(f"DEBUG: Moved '{POINTER_KEY}' to version {version}.")
     except Exception as e:
         print(f"DEBUG: Error setting data in Valkey cache: {e}")
+        # Drop the client so the next invocation reconnects.
+        valkey_client = None
         return {
             "statusCode": 500,
             "body": json.dumps({"error": f"Cache update failed: {str(e)}"}),
         }
 
-    return {"statusCode": 200, "body": json.dumps(cache_payload)}
+    return {
+        "statusCode": 200,
+        "body": json.dumps({"updated": True, **new_pointer}),
+    }
 
 
 def lambda_handler(event, context):
     """
     Synchronous wrapper for the async lambda handler.
     """
-    return asyncio.run(async_handler(event, context))
+    return loop.run_until_complete(async_handler(event, context))
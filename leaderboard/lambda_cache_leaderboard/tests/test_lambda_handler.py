@@ -0,0 +1,244 @@
+import json
+import binascii
+import pytest
+from unittest.mock import AsyncMock
+
+import lambda_handler
+from lambda_handler import (
+    POINTER_KEY,
+    PUBLISH_SCRIPT,
+    VERSION_COUNTER_KEY,
+    OLD_SNAPSHOT_TTL_SECONDS,
+    async_handler,
+    snapshot_key,
+)
+
+
+def key_slot(key):
+    """
+    Returns the cluster hash slot of a key, honouring {hash tags}.
+    """
+    tag = key.partition("{")[2].partition("}")
+    if tag[1] and tag[0]:
+        key = tag[0]
+    return binascii.crc_hqx(key.encode("utf-8"), 0) % 16384
+
+
+# --- Fake Valkey Client ---
+class FakeValkeyClient:
+    """
+    Keeps string keys and their TTLs in dicts, returning bytes like GLIDE.
+    PUBLISH_SCRIPT is emulated in Python and, like a cluster-mode server,
+    rejects keys in different slots.
+    """
+
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        value = self.store.get(key)
+        return value.encode("utf-8") if value is not None else None
+
+    async def set(self, key, value, expiry=None):
+        self.store[key] = value
+        self.ttls.pop(key, None)
+        if expiry is not None:
+            self.ttls[key] = int(expiry.value)
+        return "OK"
+
+    async def incr(self, key):
+        value = int(self.store.get(key, 0)) + 1
+        self.store[key] = str(value)
+        return value
+
+    async def exists(self, keys):
+        return sum(key in self.store for key in keys)
+
+    async def expire(self, key, seconds):
+        if key not in self.store:
+            return False
+        self.ttls[key] = seconds
+        return True
+
+    async def invoke_script(self, script, keys, args):
+        assert script is PUBLISH_SCRIPT
+        if len({key_slot(key) for key in keys}) > 1:
+            raise RuntimeError(
+                "CROSSSLOT Keys in request don't hash to the same slot"
+            )
+        pointer_key, new_key = keys
+        version, pointer = args
+        current = self.store.get(pointer_key)
+        previous = json.loads(current)["version"] if current else 0
+        if previous >= int(version):
+            return [previous, 0]
+        self.store[pointer_key] = pointer
+        self.ttls.pop(new_key, None)
+        return [int(version), previous]
+
+    def evict(self, key):
+        self.store.pop(key, None)
+        self.ttls.pop(key, None)
+
+    def pointer(self):
+        return json.loads(self.store[POINTER_KEY])
+
+    async def close(self):
+        pass
+
+
+LEADERBOARD = {"easy": [{"name": "alice", "score": 3}], "hard": []}
+
+
+# --- Pytest Fixtures ---
+@pytest.fixture
+def fake_valkey_client():
+    return FakeValkeyClient()
+
+
+@pytest.fixture(autouse=True)
+def patch_valkey_client(mocker, fake_valkey_client):
+    """
+    Patch GlideClient.create so the handler connects to the fake client,
+    and reset the client kept between invocations.
+    """
+    mocker.patch(
+        "lambda_handler.GlideClient.create", return_value=fake_valkey_client
+    )
+    lambda_handler.valkey_client = None
+
+
+@pytest.fixture
+def leaderboard(mocker):
+    """
+    Serves LEADERBOARD from get_leaderboard; tests can change the result.
+    """
+    return mocker.patch(
+        "lambda_handler.get_leaderboard",
+        new=AsyncMock(return_value=LEADERBOARD),
+    )
+
+
+def test_pointer_and_snapshots_share_one_slot():
+    assert POINTER_KEY == "{leaderboard}:current"
+    assert key_slot(POINTER_KEY) == key_slot(snapshot_key(1))
+    assert key_slot(POINTER_KEY) == key_slot(snapshot_key(12345))
+
+
+# --- Async Handler Tests ---
+@pytest.mark.asyncio
+async def test_publishes_snapshot_and_pointer(fake_valkey_client, leaderboard):
+    result = await async_handler({}, {})
+
+    assert result["statusCode"] == 200
+    body = json.loads(result["body"])
+    assert body["updated"] is True
+    assert body["version"] == 1
+    assert fake_valkey_client.pointer() == {
+        "version": 1,
+        "hash": body["hash"],
+    }
+    assert json.loads(fake_valkey_client.store[snapshot_key(1)]) == {
+        "easy": [{"rank": 1, "name": "alice", "score": 3}],
+        "hard": [],
+    }
+    # The published snapshot was persisted.
+    assert snapshot_key(1) not in fake_valkey_client.ttls
+
+
+@pytest.mark.asyncio
+async def test_unchanged_leaderboard_skips_write(
+    fake_valkey_client, leaderboard
+):
+    await async_handler({}, {})
+
+    result = await async_handler({"source": "completions"}, {})
+
+    body = json.loads(result["body"])
+    assert body["updated"] is False
+    assert body["version"] == 1
+    assert fake_valkey_client.store[VERSION_COUNTER_KEY] == "1"
+
+
+@pytest.mark.asyncio
+async def test_evicted_snapshot_is_republished(
+    fake_valkey_client, leaderboard
+):
+    """
+    A pointer whose snapshot was evicted must not keep the unchanged
+    leaderboard from being written again.
+    """
+    await async_handler({}, {})
+    fake_valkey_client.evict(snapshot_key(1))
+
+    result = await async_handler({}, {})
+
+    assert json.loads(result["body"])["updated"] is True
+    assert fake_valkey_client.pointer()["version"] == 2
+    assert snapshot_key(2) in fake_valkey_client.store
+
+
+@pytest.mark.asyncio
+async def test_changed_leaderboard_expires_old_snapshot(
+    fake_valkey_client, leaderboard
+):
+    await async_handler({}, {})
+    leaderboard.return_value = {
+        "easy": [{"name": "alice", "score": 4}],
+        "hard": [],
+    }
+
+    await async_handler({}, {})
+
+    assert fake_valkey_client.pointer()["version"] == 2
+    assert fake_valkey_client.ttls[snapshot_key(1)] == OLD_SNAPSHOT_TTL_SECONDS
+    assert snapshot_key(2) not in fake_valkey_client.ttls
+
+
+@pytest.mark.asyncio
+async def test_older_snapshot_cannot_replace_newer(
+    fake_valkey_client, leaderboard
+):
+    """
+    A refresh that lost the race to a newer version leaves the pointer
+    alone, and its own snapshot keeps its expiry.
+    """
+    newer = {"version": 3, "hash": "newer"}
+    fake_valkey_client.store[POINTER_KEY] = json.dumps(newer)
+    fake_valkey_client.store[snapshot_key(3)] = "{}"
+    fake_valkey_client.store[VERSION_COUNTER_KEY] = "1"
+
+    result = await async_handler({}, {})
+
+    assert result["statusCode"] == 200
+    assert json.loads(result["body"]) == {"updated": False, "version": 3}
+    assert fake_valkey_client.pointer() == newer
+    assert fake_valkey_client.ttls[snapshot_key(2)] == OLD_SNAPSHOT_TTL_SECONDS
+    assert snapshot_key(3) not in fake_valkey_client.ttls
+
+
+@pytest.mark.asyncio
+async def test_get_leaderboard_failure(fake_valkey_client, leaderboard):
+    leaderboard.side_effect = Exception("Supabase down")
+
+    result = await async_handler({}, {})
+
+    assert result["statusCode"] == 500
+    assert "Supabase down" in json.loads(result["body"])["error"]
+    assert POINTER_KEY not in fake_valkey_client.store
+
+
+@pytest.mark.asyncio
+async def test_initialization_failure(mocker):
+    mocker.patch(
+        "lambda_handler.GlideClient.create",
+        side_effect=Exception("Init failure"),
+    )
+
+    result = await async_handler({}, {})
+
+    assert result["statusCode"] == 500
+    assert (
+        "Valkey initialization failed" in json.loads(result["body"])["error"]
+    )
@@ -1,66 +1,62 @@
 import os
+import time
 from db_client.db_client import supabase
 
+# Database function returning the top entries for both difficulties at once
+# (see supabase/migrations/20261019000002_get_leaderboard_top.sql)
+LEADERBOARD_RPC = "get_leaderboard_top"
 
-def get_top_leaderboard_entries(count=5, difficulty="introductory"):
-    # Optionally override count from an environment variable, if set.
-    count = int(os.getenv("LEADERBOARD_COUNT", count))
+# Results are cached per container for a short time, keyed on count
+CACHE_TTL_SECONDS = float(os.getenv("LEADERBOARD_CACHE_TTL", "5"))
+_cache = {}
 
-    # Debug: log the environment variables (mask sensitive info if needed)
-    print("DEBUG: SUPABASE_URL =", os.getenv("SUPABASE_URL"))
-    # Note: You might not want to print the key in production!
-    print("DEBUG: SUPABASE_KEY =", os.getenv("SUPABASE_KEY"))
-    print(
-        f"DEBUG: get_top_leaderboard_entries called with count={count}, difficulty={difficulty}"
-    )
 
-    # Query for top entries based on 'introductory' score (highest first)
-    introductory_query = (
-        supabase.table("leaderboard")
-        .select("display_name, introductory")
-        .order("introductory", desc=True)
-        .limit(count)
-    )
-    introductory_response = introductory_query.execute()
-    print("DEBUG: introductory_response =", introductory_response)
-    introductory_data = introductory_response.dict()
-    if introductory_data.get("error"):
-        error_msg = introductory_data["error"].get("message", "Unknown error")
-        raise RuntimeError(
-            f"Error fetching 'introductory' leaderboard: {error_msg}"
-        )
-    introductory_leaders = introductory_data.get("data", [])
+def _get_cached(count):
+    cached = _cache.get(count)
+    if cached and cached[0] > time.monotonic():
+        print(f"DEBUG: leaderboard cache hit for count={count}")
+        return cached[1]
+    return None
 
-    # Query for top entries based on 'interview' score (highest first)-
-    interview_query = (
-        supabase.table("leaderboard")
-        .select("display_name, interview")
-        .order("interview", desc=True)
-        .limit(count)
-    )
-    interview_response = interview_query.execute()
-    print("DEBUG: interview_response =", interview_response)
-    interview_data = interview_response.dict()
-    if interview_data.get("error"):
-        error_msg = interview_data["error"].get("message", "Unknown error")
-        raise RuntimeError(
-            f"Error fetching 'interview' leaderboard: {error_msg}"
-        )
-    interview_leaders = interview_data.get("data", [])
 
-    # Transform the data into a simplified format
-    introductory_results = [
-        {"name": entry["display_name"], "score": entry["introductory"]}
-        for entry in introductory_leaders
-    ]
-    interview_results = [
-        {"name": entry["display_name"], "score": entry["interview"]}
-        for entry in interview_leaders
-    ]
+def _set_cached(count, result):
+    _cache[count] = (time.monotonic() + CACHE_TTL_SECONDS, result)
 
-    result = {
-        "introductory": introductory_results,
-        "interview": interview_results,
+
+def _parse_result(data):
+    """
+    Validates the RPC result, which is already ordered highest score first:
+    {"introductory": [{"name": ..., "score": ...}], "interview": [...]}
+    """
+    if not isinstance(data, dict):
+        raise RuntimeError(f"Unexpected leaderboard response: {data!r}")
+    return {
+        "introductory": data.get("introductory") or [],
+        "interview": data.get("interview") or [],
     }
-    print("DEBUG: returning result =", result)
+
+
+def get_top_leaderboard_entries(count=5):
+    # Optionally override count from an environment variable, if set.
+    count = int(os.getenv("LEADERBOARD_COUNT", count))
+    print(f"DEBUG: get_top_leaderboard_entries called with count={count}")
+
+    cached = _get_cached(count)
+    if cached is not None:
+        return cached
+
+    # Both difficulties come back from a single database round trip.
+    response = supabase.rpc(LEADERBOARD_RPC, {"p_count": count}).execute()
+    data = response.dict()
+    if data.get("error"):
+        error_msg = data["error"].get("message", "Unknown error")
+        raise RuntimeError(f"Error fetching leaderboard: {error_msg}")
+
+    result = _parse_result(data.get("data"))
+    _set_cached(count, result)
+    print(
+        "DEBUG: returning "
+        f"{len(result['introductory'])} introductory and "
+        f"{len(result['interview'])} interview entries"
+    )
     return result
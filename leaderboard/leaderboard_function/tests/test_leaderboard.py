@@ -0,0 +1,162 @@
+import sys
+import json
+import types
+import pytest
+
+
+# --- Fake Supabase Client ---
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def dict(self):
+        return self.payload
+
+
+class FakeRPC:
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        self.client.calls.append((self.name, self.params))
+        return FakeResponse(self.client.response)
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.calls = []
+        self.response = {"data": {"introductory": [], "interview": []}}
+
+    def rpc(self, name, params):
+        return FakeRPC(self, name, params)
+
+
+# db_client connects to Supabase on import, so the tests provide their own
+# module in its place.
+fake_supabase = FakeSupabase()
+fake_db_client = types.ModuleType("db_client.db_client")
+fake_db_client.supabase = fake_supabase
+sys.modules.setdefault("db_client", types.ModuleType("db_client"))
+sys.modules["db_client.db_client"] = fake_db_client
+
+import leaderboard  # noqa: E402
+from app import lambda_handler  # noqa: E402
+
+
+# --- Pytest Fixtures ---
+@pytest.fixture(autouse=True)
+def reset_state(monkeypatch):
+    """
+    Clears the per-container cache and the recorded RPC calls before each
+    test.
+    """
+    monkeypatch.delenv("LEADERBOARD_COUNT", raising=False)
+    leaderboard._cache.clear()
+    fake_supabase.calls.clear()
+    fake_supabase.response = {
+        "data": {
+            "introductory": [{"name": "alice", "score": 3}],
+            "interview": [{"name": "bob", "score": 1}],
+        }
+    }
+
+
+# --- Test Cases ---
+def test_both_difficulties_come_from_one_rpc():
+    result = leaderboard.get_top_leaderboard_entries(count=3)
+
+    assert fake_supabase.calls == [("get_leaderboard_top", {"p_count": 3})]
+    assert result == {
+        "introductory": [{"name": "alice", "score": 3}],
+        "interview": [{"name": "bob", "score": 1}],
+    }
+
+
+def test_missing_difficulty_defaults_to_empty_list():
+    fake_supabase.response = {"data": {"introductory": None}}
+
+    result = leaderboard.get_top_leaderboard_entries()
+
+    assert result == {"introductory": [], "interview": []}
+
+
+def test_rpc_error_raises():
+    fake_supabase.response = {"error": {"message": "boom"}}
+
+    with pytest.raises(RuntimeError, match="boom"):
+        leaderboard.get_top_leaderboard_entries()
+
+
+def test_unexpected_response_raises():
+    fake_supabase.response = {"data": [1, 2]}
+
+    with pytest.raises(RuntimeError, match="Unexpected"):
+        leaderboard.get_top_leaderboard_entries()
+
+
+def test_count_override_from_environment(monkeypatch):
+    monkeypatch.setenv("LEADERBOARD_COUNT", "10")
+
+    leaderboard.get_top_leaderboard_entries(count=3)
+
+    assert fake_supabase.calls == [("get_leaderboard_top", {"p_count": 10})]
+
+
+def test_results_are_cached_per_count(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(leaderboard.time, "monotonic", lambda: now[0])
+
+    first = leaderboard.get_top_leaderboard_entries(count=5)
+    second = leaderboard.get_top_leaderboard_entries(count=5)
+    leaderboard.get_top_leaderboard_entries(count=10)
+
+    assert second is first
+    assert [params for _, params in fake_supabase.calls] == [
+        {"p_count": 5},
+        {"p_count": 10},
+    ]
+
+
+def test_cache_expires_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(leaderboard.time, "monotonic", lambda: now[0])
+
+    leaderboard.get_top_leaderboard_entries()
+    now[0] += leaderboard.CACHE_TTL_SECONDS + 0.1
+    leaderboard.get_top_leaderboard_entries()
+
+    assert len(fake_supabase.calls) == 2
+
+
+def test_errors_are_not_cached():
+    fake_supabase.response = {"error": {"message": "boom"}}
+    with pytest.raises(RuntimeError):
+        leaderboard.get_top_leaderboard_entries()
+
+    fake_supabase.response = {"data": {"introductory": [], "interview": []}}
+    leaderboard.get_top_leaderboard_entries()
+
+    assert len(fake_supabase.calls) == 2
+
+
+# --- Lambda Handler Tests ---
+def test_lambda_handler_uses_count_parameter():
+    response = lambda_handler({"queryStringParameters": {"count": "2"}}, None)
+
+    assert response["statusCode"] == 200
+    assert fake_supabase.calls == [("get_leaderboard_top", {"p_count": 2})]
+    body = json.loads(response["body"])
+    assert body["introductory"] == [{"name": "alice", "score": 3}]
+
+
+def test_lambda_handler_returns_500_on_error():
+    fake_supabase.response = {"error": {"message": "boom"}}
+
+    response = lambda_handler({}, None)
+
+    assert response["statusCode"] == 500
+    assert json.loads(response["body"]) == {
+        "error": "Error fetching leaderboard: boom"
+    }
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, WebSocket
+from fastapi import FastAPI, HTTPException, Query, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 import httpx
 from pydantic import BaseModel
@@ -18,8 +18,20 @@ from glide import (
     Logger,
     LogLevel,
 )
-from questions_fns import get_day_index, parse_inputs_outputs
-from leaderboard import format_leaderboard_data
+from questions_fns import (
+    get_day_index,
+    get_scheduled_questions,
+    parse_inputs_outputs,
+    select_test_cases,
+)
+from stats_fns import get_user_stats
+from leaderboard import (
+    LEADERBOARD_WINDOWS,
+    get_leaderboard_from_index,
+    get_leaderboard_snapshot,
+    get_user_percentiles,
+    get_user_ranks,
+)
 
 load_dotenv()
 
@@ -41,6 +53,8 @@ valkey_client = None
 sqs = boto3.client("sqs", region_name=os.getenv("AWS_REGION", "eu-north-1"))
 SQS_QUEUE_URL = os.getenv("SQS_QUEUE_URL")
 LEADERBOARD_API_URL = os.getenv("LEADERBOARD_API_URL")
+LEADERBOARD_MAX_PAGE_SIZE = 100
+LEADERBOARD_WINDOW_PATTERN = "^(" + "|".join(LEADERBOARD_WINDOWS) + ")$"
 
 # class SubmitCodePayload(BaseModel):
 #     code: str
@@ -103,6 +117,46 @@ async def get_daily_questions(max_test_cases=None):
     if not valkey_client:
         return {"error": "Valkey client not initialized."}
 
+    # Today's entry from the question schedule, prepared by the updater.
+    try:
+        scheduled = await get_scheduled_questions(valkey_client)
+    except Exception as e:
+        return {"error": str(e)}
+
+    if scheduled is not None:
+        # Copies, so trimming test cases leaves the cached entry intact.
+        easy = dict(scheduled["easy"])
+        hard = dict(scheduled["hard"])
+    else:
+        print("DEBUG: No question schedule for today; using active_questions.")
+        legacy = await get_legacy_daily_questions()
+        if "error" in legacy:
+            return legacy
+        easy, hard = legacy["easy"], legacy["hard"]
+
+    # Limit number of test cases sent to client
+    if max_test_cases is not None:
+        easy["inputs"] = easy["inputs"][:max_test_cases]
+        easy["outputs"] = easy["outputs"][:max_test_cases]
+        hard["inputs"] = hard["inputs"][:max_test_cases]
+        hard["outputs"] = hard["outputs"][:max_test_cases]
+        # The minimized suite is only used for submissions.
+        for question in (easy, hard):
+            question.pop("pruned_inputs", None)
+            question.pop("pruned_outputs", None)
+
+    print(f"Today's easy Q: {easy}")
+    print(f"Today's hard Q: {hard}")
+
+    # Return the selected questions as a JSON object.
+    return {"easy": easy, "hard": hard}
+
+
+async def get_legacy_daily_questions():
+    """
+    Reads today's questions from the single active_questions key written
+    before the question schedule existed.
+    """
     key = "active_questions"
     try:
         cached_value = await valkey_client.get(key)
@@ -151,17 +205,6 @@ async def get_daily_questions(max_test_cases=None):
     easy = parse_inputs_outputs(easy)
     hard = parse_inputs_outputs(hard)
 
-    # Limit number of test cases sent to client
-    if max_test_cases is not None:
-        easy["inputs"] = easy["inputs"][:max_test_cases]
-        easy["outputs"] = easy["outputs"][:max_test_cases]
-        hard["inputs"] = hard["inputs"][:max_test_cases]
-        hard["outputs"] = hard["outputs"][:max_test_cases]
-
-    print(f"Today's easy Q: {easy}")
-    print(f"Today's hard Q: {hard}")
-
-    # Return the selected questions as a JSON object.
     return {"easy": easy, "hard": hard}
 
 
@@ -250,7 +293,7 @@ async def submit_code(payload: Dict[str, Any]):
         }
 
     job_id = str(uuid.uuid4())
-    test_cases = {"inputs": question["inputs"], "outputs": question["outputs"]}
+    test_cases = select_test_cases(question, is_submit)
     starter_code = question["starter_code"]
     difficulty = question["difficulty"]
 
@@ -279,54 +322,123 @@ async def submit_code(payload: Dict[str, Any]):
 
 
 @app.get("/api/leaderboard")
-async def leaderboard():
-    global valkey_client
+async def leaderboard(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(5, ge=1, le=LEADERBOARD_MAX_PAGE_SIZE),
+    window: str = Query("all", pattern=LEADERBOARD_WINDOW_PATTERN),
+):
     if not valkey_client:
         raise HTTPException(
             status_code=500, detail="Valkey client not initialized"
         )
 
-    key = "active_leaderboard"
+    # Serve straight from the sorted sets kept by the leaderboard-updater.
     try:
-        cached_value = await valkey_client.get(key)
-        if cached_value:
-            leaderboard_data = json.loads(cached_value)
-        else:
-            raise Exception(
-                "Could not find data in cache for key 'active_leaderboard'"
-            )
+        data = await get_leaderboard_from_index(
+            valkey_client, offset=offset, limit=limit, window=window
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    # Rolling windows have no snapshot to fall back to; an empty window just
+    # means nobody has solved a question in it yet.
+    if any(data.values()) or offset > 0 or window != "all":
+        return data
 
-    # Return the cached leaderboard data as-is
-    data = format_leaderboard_data(leaderboard_data)
+    # Fall back to the refresher's snapshot until the sorted sets are seeded.
+    try:
+        data = await get_leaderboard_snapshot(valkey_client, "leaderboard")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if data is None:
+        raise HTTPException(
+            status_code=500, detail="Could not find leaderboard snapshot"
+        )
     return data
 
 
+@app.get("/api/leaderboard/rank/{user_id}")
+async def leaderboard_rank(
+    user_id: str,
+    neighbours: int = Query(2, ge=0, le=10),
+    window: str = Query("all", pattern=LEADERBOARD_WINDOW_PATTERN),
+):
+    if not valkey_client:
+        raise HTTPException(
+            status_code=500, detail="Valkey client not initialized"
+        )
+
+    try:
+        ranks = await get_user_ranks(
+            valkey_client, user_id, neighbours, window
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not any(ranks.values()):
+        raise HTTPException(
+            status_code=404, detail=f"No leaderboard entry for user {user_id}"
+        )
+    return {"user_id": user_id, **ranks}
+
+
+@app.get("/api/leaderboard/percentile/{user_id}")
+async def leaderboard_percentile(user_id: str):
+    if not valkey_client:
+        raise HTTPException(
+            status_code=500, detail="Valkey client not initialized"
+        )
+
+    try:
+        percentiles = await get_user_percentiles(valkey_client, user_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not any(percentiles.values()):
+        raise HTTPException(
+            status_code=404, detail=f"No leaderboard entry for user {user_id}"
+        )
+    return {"user_id": user_id, **percentiles}
+
+
 @app.get("/api/leaderboard-testing")
 async def leaderboard_testing():
-    global valkey_client
     if not valkey_client:
         raise HTTPException(
             status_code=500, detail="Valkey client not initialized"
         )
 
-    test_key = "active_leaderboard_testing"
     try:
-        cached_value = await valkey_client.get(test_key)
-        if cached_value:
-            leaderboard_data = json.loads(cached_value)
-        else:
-            raise Exception(
-                "Could not find data in cache for key 'active_leaderboard_testing'"
-            )
+        data = await get_leaderboard_snapshot(
+            valkey_client, "leaderboard_testing"
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-
-    data = format_leaderboard_data(leaderboard_data)
+    if data is None:
+        raise HTTPException(
+            status_code=500, detail="Could not find leaderboard snapshot"
+        )
     return data
 
 
+@app.get("/api/stats/{user_id}")
+async def user_stats(user_id: str):
+    if not valkey_client:
+        raise HTTPException(
+            status_code=500, detail="Valkey client not initialized"
+        )
+
+    try:
+        stats = await get_user_stats(valkey_client, user_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if stats is None:
+        raise HTTPException(
+            status_code=404, detail=f"No stats found for user {user_id}"
+        )
+    return stats
+
+
 # ==== WEBSOCKET for job results ===
 @app.websocket("/ws/job-status/{job_id}")
 async def websocket_job_status(websocket: WebSocket, job_id: str):
@@ -1,3 +1,46 @@
+import json
+import asyncio
+from datetime import datetime, timezone
+from glide import RangeByIndex
+
+# Leaderboard categories, each backed by Valkey sorted sets kept by the
+# leaderboard-updater (all-time plus daily and weekly buckets). They share
+# the "{lb}" hash tag so the updater can write them in one cluster slot.
+CATEGORIES = ("easy", "hard")
+LEADERBOARD_WINDOWS = ("all", "daily", "weekly")
+# Hash of user_id -> display_name, also kept by the leaderboard-updater
+LEADERBOARD_NAMES_KEY = "{lb}:names"
+# Upper bounds of the "top X%" labels returned with a user's percentile
+PERCENTILE_BUCKETS = (1, 5, 10, 25, 50)
+
+# Decoded snapshots written by the leaderboard cache refresher, kept per
+# namespace as (version, data) so a snapshot is only parsed once
+_snapshot_cache = {}
+
+
+def leaderboard_key(category: str, window: str = "all", day=None) -> str:
+    """
+    Returns the sorted set key for a category and window, matching the keys
+    written by the leaderboard-updater. Rolling windows use the bucket that
+    contains day (UTC), defaulting to today.
+
+    Examples:
+        leaderboard_key("easy") -> "{lb}:easy"
+        leaderboard_key("easy", "daily") -> "{lb}:daily:2025-03-02:easy"
+        leaderboard_key("hard", "weekly") -> "{lb}:weekly:2025-W09:hard"
+    """
+    if window == "all":
+        return f"{{lb}}:{category}"
+    if day is None:
+        day = datetime.now(timezone.utc).date()
+    if window == "daily":
+        bucket = day.isoformat()
+    else:
+        year, week, _ = day.isocalendar()
+        bucket = f"{year}-W{week:02d}"
+    return f"{{lb}}:{window}:{bucket}:{category}"
+
+
 def format_leaderboard_entry(entry: dict, rank: int) -> dict:
     """
     Formats a single leaderboard entry for presentation.
@@ -54,3 +97,240 @@ def format_leaderboard_data(raw_data: dict) -> dict:
         formatted_data[category] = formatted_entries
 
     return formatted_data
+
+
+async def get_entries(
+    client, category: str, offset: int = 0, limit: int = 5, window="all"
+) -> list:
+    """
+    Reads a page of entries for a category from its Valkey sorted set.
+
+    Args:
+        client: The Valkey client.
+        category (str): Either "easy" or "hard".
+        offset (int): The zero-based position of the first entry.
+        limit (int): The maximum number of entries to return.
+        window (str): "all", "daily" or "weekly".
+
+    Returns:
+        list: Formatted entries, highest score first, ranked from offset + 1.
+    """
+    scores = await client.zrange_withscores(
+        leaderboard_key(category, window),
+        RangeByIndex(offset, offset + limit - 1),
+        reverse=True,
+    )
+    user_ids = list(scores.keys())
+    if not user_ids:
+        return []
+
+    names = await client.hmget(LEADERBOARD_NAMES_KEY, user_ids)
+    entries = []
+    for index, (user_id, name) in enumerate(zip(user_ids, names)):
+        entry = {"score": int(scores[user_id])}
+        if name:
+            entry["name"] = name.decode("utf-8")
+        entries.append(
+            format_leaderboard_entry(entry, rank=offset + index + 1)
+        )
+    return entries
+
+
+async def get_leaderboard_from_index(
+    client, offset: int = 0, limit: int = 5, window: str = "all"
+) -> dict:
+    """
+    Builds a page of the leaderboard for every category from the Valkey
+    sorted sets.
+
+    Returns:
+        dict: The same shape as format_leaderboard_data, for example
+              { "easy": [ { "rank": 1, "name": "Alice", "score": 100 } ],
+                "hard": [ ... ] }
+    """
+    results = await asyncio.gather(
+        *(get_entries(client, c, offset, limit, window) for c in CATEGORIES)
+    )
+    return dict(zip(CATEGORIES, results))
+
+
+async def get_user_rank(
+    client, category: str, user_id: str, neighbours: int = 2, window="all"
+):
+    """
+    Looks up a user's position in a category along with the entries
+    directly above and below them.
+
+    Args:
+        client: The Valkey client.
+        category (str): Either "easy" or "hard".
+        user_id (str): The user to look up.
+        neighbours (int): How many entries to include either side.
+        window (str): "all", "daily" or "weekly".
+
+    Returns:
+        dict | None: For example
+              { "rank": 12, "score": 4, "neighbours": [ ... ] },
+              or None if the user has no score in this category.
+    """
+    rank_and_score = await client.zrevrank_withscore(
+        leaderboard_key(category, window), user_id
+    )
+    if rank_and_score is None:
+        return None
+
+    position, score = rank_and_score
+    offset = max(position - neighbours, 0)
+    limit = position - offset + neighbours + 1
+    return {
+        "rank": position + 1,
+        "score": int(score),
+        "neighbours": await get_entries(
+            client, category, offset, limit, window
+        ),
+    }
+
+
+async def get_user_ranks(
+    client, user_id: str, neighbours: int = 2, window: str = "all"
+) -> dict:
+    """
+    Looks up a user's position in every category.
+    """
+    results = await asyncio.gather(
+        *(
+            get_user_rank(client, c, user_id, neighbours, window)
+            for c in CATEGORIES
+        )
+    )
+    return dict(zip(CATEGORIES, results))
+
+
+async def get_leaderboard_snapshot(client, namespace: str = "leaderboard"):
+    """
+    Returns the latest leaderboard snapshot written by the cache refresher.
+
+    The refresher writes immutable, already ranked snapshots to
+    "{namespace}:v{n}" and then moves the "{namespace}:current" pointer to
+    them, with the namespace in braces as a cluster hash tag. Only the small pointer is read on each call; the snapshot itself
+    is fetched and decoded once per version.
+
+    Returns:
+        dict | None: The formatted leaderboard, or None if there is no
+              snapshot yet.
+    """
+    tag = f"{{{namespace}}}"
+    pointer = await client.get(f"{tag}:current")
+    if pointer is None:
+        return None
+    version = json.loads(pointer)["version"]
+
+    cached = _snapshot_cache.get(namespace)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    raw = await client.get(f"{tag}:v{version}")
+    if raw is None:
+        return None
+    data = json.loads(raw)
+    _snapshot_cache[namespace] = (version, data)
+    return data
+
+
+def score_histogram_key(category: str) -> str:
+    """
+    Returns the hash of score -> number of users kept by the
+    leaderboard-updater for a category's all-time leaderboard.
+    """
+    return f"{{lb}}:hist:{category}"
+
+
+def percentile_bucket(top_percent: float) -> str:
+    """
+    Returns the coarse label shown for the share of users with a higher
+    score, e.g. "top 10%" for 7.5: fewer than 10% of users are ahead.
+    """
+    for threshold in PERCENTILE_BUCKETS:
+        if top_percent < threshold:
+            return f"top {threshold}%"
+    return "bottom 50%"
+
+
+def compute_percentile(histogram: dict, score: int) -> dict:
+    """
+    Works out where a score sits among all scored users from a histogram
+    of score -> user count.
+
+    Args:
+        histogram (dict): The histogram hash as returned by HGETALL
+        (bytes -> bytes).
+        score (int): The user's score.
+
+    Returns:
+        dict: For example
+              {
+                "score": 4,
+                "rank": 12,
+                "players": 100,
+                "top_percent": 11.0,
+                "percentile": 85.0,
+                "bucket": "top 25%"
+              }
+              where rank is shared by users on the same score,
+              top_percent is the share of users with a higher score and
+              percentile is the share of users with a lower score. Both
+              ignore ties, so every user on a score gets the same figures.
+    """
+    above = below = players = 0
+    for raw_score, raw_count in histogram.items():
+        bucket_score, count = int(raw_score), int(raw_count)
+        if count <= 0:
+            continue
+        players += count
+        if bucket_score > score:
+            above += count
+        elif bucket_score < score:
+            below += count
+    # The user always counts themselves, even if the histogram lags behind.
+    players = max(players, above + below + 1)
+
+    top_percent = round(100 * above / players, 1)
+    return {
+        "score": score,
+        "rank": above + 1,
+        "players": players,
+        "top_percent": top_percent,
+        "percentile": round(100 * below / players, 1),
+        "bucket": percentile_bucket(top_percent),
+    }
+
+
+async def get_user_percentile(client, category: str, user_id: str):
+    """
+    Looks up a user's percentile in a category's all-time leaderboard.
+
+    Reads the user's score and the category's score histogram, whose size
+    is bounded by the number of distinct scores rather than the number of
+    users.
+
+    Returns:
+        dict | None: See compute_percentile, or None if the user has no
+              score in this category.
+    """
+    score, histogram = await asyncio.gather(
+        client.zscore(leaderboard_key(category), user_id),
+        client.hgetall(score_histogram_key(category)),
+    )
+    if score is None:
+        return None
+    return compute_percentile(histogram, int(score))
+
+
+async def get_user_percentiles(client, user_id: str) -> dict:
+    """
+    Looks up a user's percentile in every category.
+    """
+    results = await asyncio.gather(
+        *(get_user_percentile(client, c, user_id) for c in CATEGORIES)
+    )
+    return dict(zip(CATEGORIES, results))
@@ -1,4 +1,4 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 import json
 
 BASE_URL = (
@@ -29,7 +29,9 @@ def get_day_index(timestamp_str: str) -> int:
 
 
 def parse_inputs_outputs(data):
-    # Parses 'inputs' and 'outputs' fields into actual lists.
+    # Parses 'inputs' and 'outputs' fields into actual lists. Questions
+    # stored in the canonical format already arrive as lists and are left
+    # untouched.
     for key in ["inputs", "outputs"]:
         if key in data and isinstance(data[key], str):
             try:
@@ -39,3 +41,71 @@ def parse_inputs_outputs(data):
             except json.JSONDecodeError:
                 pass  # Leave it unchanged if it fails
     return data
+
+
+def select_test_cases(question, is_submit):
+    # Full submissions run the minimized suite when the question has one
+    # (see test-case-generation/minimize.py); it covers the same paths
+    # through the reference solution as the full suite for less CPU.
+    if is_submit and question.get("pruned_inputs"):
+        return {
+            "inputs": question["pruned_inputs"],
+            "outputs": question["pruned_outputs"],
+        }
+    return {"inputs": question["inputs"], "outputs": question["outputs"]}
+
+
+# Question schedule published by the questions cache updater: a pointer to
+# immutable schedule versions, each with a ready-to-serve entry per day
+# (see questions/lambda-cache-updater-questions/schedule.py)
+SCHEDULE_POINTER_KEY = "questions_schedule:pointer"
+
+# Decoded day entries as {(version, day): questions}; they never change
+# once written, so each is only parsed once per process
+_schedule_day_cache = {}
+
+
+def schedule_day_key(version: int, day: date) -> str:
+    return f"questions_schedule:v{version}:day:{day.isoformat()}"
+
+
+def active_schedule_entry(pointer: dict, today: date):
+    """
+    Returns the pointer entry for the schedule in use on a given day. A
+    staged "next" schedule takes over from its start day, so the cutover at
+    midnight UTC needs no write.
+    """
+    next_entry = pointer.get("next")
+    if next_entry and today >= date.fromisoformat(next_entry["start"]):
+        return next_entry
+    return pointer.get("current")
+
+
+async def get_scheduled_questions(client, today: date = None):
+    """
+    Reads today's easy and hard questions from the question schedule.
+
+    Returns:
+        dict | None: {"easy": {...}, "hard": {...}}, already without
+              solutions and with inputs/outputs as lists, or None if there
+              is no schedule covering today.
+    """
+    if today is None:
+        today = datetime.now(timezone.utc).date()
+
+    raw_pointer = await client.get(SCHEDULE_POINTER_KEY)
+    if raw_pointer is None:
+        return None
+    entry = active_schedule_entry(json.loads(raw_pointer), today)
+    if entry is None:
+        return None
+
+    cache_key = (entry["version"], today)
+    if cache_key not in _schedule_day_cache:
+        raw_day = await client.get(schedule_day_key(entry["version"], today))
+        if raw_day is None:
+            return None
+        # Drop entries from earlier days or versions before caching today's
+        _schedule_day_cache.clear()
+        _schedule_day_cache[cache_key] = json.loads(raw_day)
+    return _schedule_day_cache[cache_key]
@@ -1,8 +1,69 @@
-def get_leaderboard():
-    pass
+from datetime import date, datetime, timedelta, timezone
+
+
+def stats_key(user_id: str) -> str:
     """
-    Get the up-to-date leaderboard from the Stats API.
-    Used by the route for sending leaderboard to frontend,
-    either when there is a cache miss or when it needs to be
-    refreshed I suppose. Not sure yet
+    Returns the Valkey hash holding a user's stats. The hash is kept up to
+    date by the leaderboard-updater each time the user completes a question.
     """
+    return f"stats:{user_id}"
+
+
+def format_user_stats(user_id: str, raw: dict, today: date = None) -> dict:
+    """
+    Formats a user's stats hash for the frontend.
+
+    The stored current streak only changes when the user solves a question,
+    so it is reported as 0 once a full day has passed without a solve.
+
+    Args:
+        user_id (str): The user the stats belong to.
+        raw (dict): The stats hash as returned by HGETALL (bytes -> bytes).
+        today (date): The current UTC date; defaults to today.
+
+    Returns:
+        dict: For example
+              {
+                "user_id": "abc-123",
+                "solved": {"easy": 10, "hard": 4, "total": 14},
+                "current_streak": 3,
+                "longest_streak": 7,
+                "last_solved_day": "2025-03-02"
+              }
+    """
+    stats = {
+        key.decode("utf-8"): value.decode("utf-8")
+        for key, value in raw.items()
+    }
+    if today is None:
+        today = datetime.now(timezone.utc).date()
+
+    last_solved_day = stats.get("last_solved_day")
+    current_streak = int(stats.get("current_streak", 0))
+    if last_solved_day:
+        last_day = date.fromisoformat(last_solved_day)
+        if last_day < today - timedelta(days=1):
+            current_streak = 0
+
+    return {
+        "user_id": user_id,
+        "solved": {
+            "easy": int(stats.get("introductory", 0)),
+            "hard": int(stats.get("interview", 0)),
+            "total": int(stats.get("total", 0)),
+        },
+        "current_streak": current_streak,
+        "longest_streak": int(stats.get("longest_streak", 0)),
+        "last_solved_day": last_solved_day,
+    }
+
+
+async def get_user_stats(client, user_id: str):
+    """
+    Reads a user's stats with a single HGETALL.
+    Returns None if the user hasn't completed any questions.
+    """
+    raw = await client.hgetall(stats_key(user_id))
+    if not raw:
+        return None
+    return format_user_stats(user_id, raw)
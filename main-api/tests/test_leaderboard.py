@@ -0,0 +1,320 @@
+import json
+import datetime
+import pytest
+from fastapi.testclient import TestClient
+from app import app
+import leaderboard
+from leaderboard import compute_percentile, leaderboard_key
+
+
+# --- Fake Valkey Client ---
+class FakeValkeyClient:
+    def __init__(self):
+        self.store = {}
+        self.sorted_sets = {}
+        self.hashes = {}
+
+    async def get(self, key):
+        value = self.store.get(key)
+        if value is not None:
+            return value.encode("utf-8") if isinstance(value, str) else value
+        return None
+
+    async def set(self, key, value):
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        self.store[key] = value
+
+    async def zrange_withscores(self, key, range_query, reverse=False):
+        members = sorted(
+            self.sorted_sets.get(key, {}).items(),
+            key=lambda item: (item[1], item[0]),
+            reverse=reverse,
+        )
+        end = len(members) if range_query.end == -1 else range_query.end + 1
+        selected = members[slice(range_query.start, end)]
+        return {member.encode("utf-8"): score for member, score in selected}
+
+    async def zrevrank_withscore(self, key, member):
+        members = sorted(
+            self.sorted_sets.get(key, {}).items(),
+            key=lambda item: (item[1], item[0]),
+            reverse=True,
+        )
+        for position, (name, score) in enumerate(members):
+            if name == member:
+                return [position, score]
+        return None
+
+    async def zscore(self, key, member):
+        return self.sorted_sets.get(key, {}).get(member)
+
+    async def hgetall(self, key):
+        return {
+            field.encode("utf-8"): value.encode("utf-8")
+            for field, value in self.hashes.get(key, {}).items()
+        }
+
+    async def hmget(self, key, fields):
+        values = self.hashes.get(key, {})
+        result = []
+        for field in fields:
+            if isinstance(field, bytes):
+                field = field.decode("utf-8")
+            value = values.get(field)
+            result.append(value.encode("utf-8") if value else None)
+        return result
+
+    async def close(self):
+        pass
+
+
+# --- Pytest Fixtures ---
+@pytest.fixture
+def fake_valkey_client():
+    return FakeValkeyClient()
+
+
+@pytest.fixture
+def client(fake_valkey_client, monkeypatch):
+    from glide import GlideClient
+
+    async def fake_create(config):
+        return fake_valkey_client
+
+    monkeypatch.setattr(GlideClient, "create", fake_create)
+    # Start each test without any decoded snapshots from earlier tests.
+    monkeypatch.setattr(leaderboard, "_snapshot_cache", {})
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+# --- Test Cases ---
+def test_leaderboard_served_from_sorted_sets(client, fake_valkey_client):
+    """
+    The leaderboard route should return the top entries from the sorted
+    sets, highest score first, with display names from the names hash.
+    """
+    fake_valkey_client.sorted_sets["{lb}:easy"] = {
+        "u1": 3.0,
+        "u2": 7.0,
+        "u3": 5.0,
+    }
+    fake_valkey_client.sorted_sets["{lb}:hard"] = {"u1": 2.0}
+    fake_valkey_client.hashes["{lb}:names"] = {
+        "u1": "Alice",
+        "u2": "Bob",
+    }
+
+    response = client.get("/api/leaderboard")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["easy"] == [
+        {"rank": 1, "name": "Bob", "score": 7},
+        {"rank": 2, "name": "Unknown", "score": 5},
+        {"rank": 3, "name": "Alice", "score": 3},
+    ]
+    assert data["hard"] == [{"rank": 1, "name": "Alice", "score": 2}]
+
+
+def store_snapshot(fake_valkey_client, namespace, version, data):
+    tag = f"{{{namespace}}}"
+    fake_valkey_client.store[f"{tag}:v{version}"] = json.dumps(data)
+    fake_valkey_client.store[f"{tag}:current"] = json.dumps(
+        {"version": version, "hash": f"hash-{version}"}
+    )
+
+
+def test_leaderboard_falls_back_to_snapshot(client, fake_valkey_client):
+    """
+    Before the sorted sets are seeded, the current versioned snapshot is
+    served as-is.
+    """
+    snapshot = {
+        "easy": [{"rank": 1, "name": "Alice", "score": 1}],
+        "hard": [{"rank": 1, "name": "Bob", "score": 4}],
+    }
+    store_snapshot(fake_valkey_client, "leaderboard", 1, snapshot)
+
+    response = client.get("/api/leaderboard")
+    assert response.status_code == 200
+    assert response.json() == snapshot
+
+
+def test_leaderboard_snapshot_follows_pointer(client, fake_valkey_client):
+    """
+    Moving the pointer to a new version should serve the new snapshot.
+    """
+    store_snapshot(
+        fake_valkey_client,
+        "leaderboard_testing",
+        1,
+        {"easy": [{"rank": 1, "name": "Alice", "score": 1}], "hard": []},
+    )
+    assert client.get("/api/leaderboard-testing").json()["easy"][0] == {
+        "rank": 1,
+        "name": "Alice",
+        "score": 1,
+    }
+
+    store_snapshot(
+        fake_valkey_client,
+        "leaderboard_testing",
+        2,
+        {"easy": [{"rank": 1, "name": "Bob", "score": 2}], "hard": []},
+    )
+    response = client.get("/api/leaderboard-testing")
+    assert response.json()["easy"][0]["name"] == "Bob"
+
+
+def test_leaderboard_missing_snapshot(client):
+    response = client.get("/api/leaderboard")
+    assert response.status_code == 500
+
+
+def test_leaderboard_pagination(client, fake_valkey_client):
+    """
+    offset and limit should select a window of the sorted set, with ranks
+    continuing from the offset.
+    """
+    fake_valkey_client.sorted_sets["{lb}:easy"] = {
+        f"u{i}": float(i) for i in range(1, 11)
+    }
+
+    response = client.get("/api/leaderboard?offset=3&limit=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert [(e["rank"], e["score"]) for e in data["easy"]] == [(4, 7), (5, 6)]
+    assert data["hard"] == []
+
+
+def test_leaderboard_pagination_rejects_large_limit(client):
+    response = client.get("/api/leaderboard?limit=1000")
+    assert response.status_code == 422
+
+
+def test_leaderboard_rank_with_neighbours(client, fake_valkey_client):
+    """
+    The rank endpoint should return the user's rank and score along with
+    the entries either side of them.
+    """
+    fake_valkey_client.sorted_sets["{lb}:easy"] = {
+        f"u{i}": float(i) for i in range(1, 11)
+    }
+
+    response = client.get("/api/leaderboard/rank/u1?neighbours=1")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["easy"]["rank"] == 10
+    assert data["easy"]["score"] == 1
+    assert [e["rank"] for e in data["easy"]["neighbours"]] == [9, 10]
+    assert data["hard"] is None
+
+
+def test_leaderboard_rank_unknown_user(client):
+    response = client.get("/api/leaderboard/rank/nobody")
+    assert response.status_code == 404
+
+
+def test_leaderboard_key_windows():
+    day = datetime.date(2025, 3, 2)
+    assert leaderboard_key("easy") == "{lb}:easy"
+    assert (
+        leaderboard_key("easy", "daily", day) == "{lb}:daily:2025-03-02:easy"
+    )
+    assert (
+        leaderboard_key("hard", "weekly", day) == "{lb}:weekly:2025-W09:hard"
+    )
+
+
+def test_leaderboard_daily_window(client, fake_valkey_client):
+    """
+    window=daily should read today's bucket and never fall back to the
+    all-time snapshot.
+    """
+    fake_valkey_client.sorted_sets["{lb}:easy"] = {"u1": 9.0}
+    fake_valkey_client.sorted_sets[leaderboard_key("easy", "daily")] = {
+        "u2": 1.0
+    }
+    store_snapshot(
+        fake_valkey_client,
+        "leaderboard",
+        1,
+        {"easy": [{"rank": 1, "name": "Alice", "score": 1}], "hard": []},
+    )
+
+    response = client.get("/api/leaderboard?window=daily")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["easy"] == [{"rank": 1, "name": "Unknown", "score": 1}]
+    assert data["hard"] == []
+
+    response = client.get("/api/leaderboard?window=weekly")
+    assert response.json() == {"easy": [], "hard": []}
+
+
+def test_leaderboard_rejects_unknown_window(client):
+    response = client.get("/api/leaderboard?window=monthly")
+    assert response.status_code == 422
+
+
+def test_leaderboard_percentile(client, fake_valkey_client):
+    """
+    The percentile route should place a user using the score histogram,
+    without needing every user's score.
+    """
+    fake_valkey_client.sorted_sets["{lb}:easy"] = {"u1": 4.0}
+    # 2 users on 6, 3 on 4 (including u1) and 5 on 1
+    fake_valkey_client.hashes["{lb}:hist:easy"] = {
+        "6": "2",
+        "5": "0",
+        "4": "3",
+        "1": "5",
+    }
+
+    response = client.get("/api/leaderboard/percentile/u1")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["easy"] == {
+        "score": 4,
+        "rank": 3,
+        "players": 10,
+        "top_percent": 20.0,
+        "percentile": 50.0,
+        "bucket": "top 25%",
+    }
+    assert data["hard"] is None
+
+
+def test_leaderboard_percentile_unknown_user(client):
+    response = client.get("/api/leaderboard/percentile/nobody")
+    assert response.status_code == 404
+
+
+def test_compute_percentile_buckets():
+    histogram = {b"10": b"1", b"5": b"99"}
+    assert compute_percentile(histogram, 10)["bucket"] == "top 1%"
+    assert compute_percentile(histogram, 5)["bucket"] == "top 5%"
+    assert compute_percentile({b"1": b"10"}, 1)["bucket"] == "top 1%"
+    assert compute_percentile({b"2": b"1", b"1": b"1"}, 1)["bucket"] == (
+        "bottom 50%"
+    )
+    # A score the histogram hasn't caught up with still counts the user.
+    result = compute_percentile({}, 3)
+    assert result["players"] == 1
+    assert result["top_percent"] == 0.0
+    assert result["bucket"] == "top 1%"
+
+
+def test_compute_percentile_ties_share_top_percent():
+    """
+    Users on the same score are placed by the users strictly above them,
+    however many share the score.
+    """
+    histogram = {b"9": b"1", b"7": b"3", b"2": b"6"}
+    result = compute_percentile(histogram, 7)
+    assert result["rank"] == 2
+    assert result["top_percent"] == 10.0
+    assert result["percentile"] == 60.0
+    assert result["bucket"] == "top 25%"
@@ -0,0 +1,148 @@
+import json
+import datetime
+import pytest
+from fastapi.testclient import TestClient
+from app import app
+import questions_fns
+from questions_fns import (
+    active_schedule_entry,
+    schedule_day_key,
+    select_test_cases,
+)
+
+
+# --- Fake Valkey Client ---
+class FakeValkeyClient:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        value = self.store.get(key)
+        if value is not None:
+            return value.encode("utf-8") if isinstance(value, str) else value
+        return None
+
+    async def close(self):
+        pass
+
+
+# --- Pytest Fixtures ---
+@pytest.fixture
+def fake_valkey_client():
+    return FakeValkeyClient()
+
+
+@pytest.fixture
+def client(fake_valkey_client, monkeypatch):
+    from glide import GlideClient
+
+    async def fake_create(config):
+        return fake_valkey_client
+
+    monkeypatch.setattr(GlideClient, "create", fake_create)
+    # Start each test without any decoded days from earlier tests.
+    monkeypatch.setattr(questions_fns, "_schedule_day_cache", {})
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def make_question(question_id):
+    return {
+        "id": question_id,
+        "starter_code": "",
+        "inputs": [[1], [2], [3], [4]],
+        "outputs": [1, 2, 3, 4],
+    }
+
+
+# --- Test Cases ---
+def test_daily_question_from_schedule(client, fake_valkey_client):
+    """
+    Today's questions should come straight from the schedule's entry for
+    today, trimmed to 3 test cases, without touching active_questions.
+    """
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    fake_valkey_client.store["questions_schedule:pointer"] = json.dumps(
+        {
+            "current": {"version": 4, "start": today.isoformat(), "days": 5},
+            "next": None,
+        }
+    )
+    fake_valkey_client.store[schedule_day_key(4, today)] = json.dumps(
+        {"easy": make_question("e1"), "hard": make_question("h1")}
+    )
+
+    response = client.get("/api/daily-question")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["easy"]["id"] == "e1"
+    assert data["easy"]["inputs"] == [[1], [2], [3]]
+    assert data["hard"]["outputs"] == [1, 2, 3]
+
+
+def test_daily_question_falls_back_to_active_questions(
+    client, fake_valkey_client
+):
+    timestamp = datetime.datetime.now(datetime.timezone.utc).strftime(
+        "%Y-%m-%dT00:00:00"
+    )
+    fake_valkey_client.store["active_questions"] = json.dumps(
+        {
+            "timestamp": timestamp,
+            "questions": {
+                "easy": {"questions": [make_question("e1")]},
+                "hard": {"questions": [make_question("h1")]},
+            },
+        }
+    )
+
+    response = client.get("/api/daily-question")
+    assert response.status_code == 200
+    assert response.json()["hard"]["id"] == "h1"
+
+
+def test_active_schedule_entry_cutover():
+    pointer = {
+        "current": {"version": 1, "start": "2025-03-02", "days": 3},
+        "next": {"version": 2, "start": "2025-03-05", "days": 3},
+    }
+    assert active_schedule_entry(pointer, datetime.date(2025, 3, 4)) == (
+        pointer["current"]
+    )
+    assert active_schedule_entry(pointer, datetime.date(2025, 3, 5)) == (
+        pointer["next"]
+    )
+
+
+def test_submissions_use_pruned_suite(client, fake_valkey_client):
+    """
+    The minimized suite is kept out of the daily question and only used
+    for full submissions.
+    """
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    easy = make_question("e1")
+    easy["pruned_inputs"] = [[1], [4]]
+    easy["pruned_outputs"] = [1, 4]
+    fake_valkey_client.store["questions_schedule:pointer"] = json.dumps(
+        {
+            "current": {"version": 4, "start": today.isoformat(), "days": 5},
+            "next": None,
+        }
+    )
+    fake_valkey_client.store[schedule_day_key(4, today)] = json.dumps(
+        {"easy": easy, "hard": make_question("h1")}
+    )
+
+    response = client.get("/api/daily-question")
+    assert "pruned_inputs" not in response.json()["easy"]
+
+    assert select_test_cases(easy, is_submit=True) == {
+        "inputs": [[1], [4]],
+        "outputs": [1, 4],
+    }
+    assert select_test_cases(easy, is_submit=False)["inputs"] == (
+        easy["inputs"]
+    )
+    hard = make_question("h1")
+    assert select_test_cases(hard, is_submit=True)["outputs"] == [1, 2, 3, 4]
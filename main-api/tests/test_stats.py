@@ -0,0 +1,89 @@
+import datetime
+import pytest
+from fastapi.testclient import TestClient
+from app import app
+from stats_fns import format_user_stats
+
+
+# --- Fake Valkey Client ---
+class FakeValkeyClient:
+    def __init__(self):
+        self.hashes = {}
+
+    async def hgetall(self, key):
+        return {
+            field.encode("utf-8"): value.encode("utf-8")
+            for field, value in self.hashes.get(key, {}).items()
+        }
+
+    async def close(self):
+        pass
+
+
+# --- Pytest Fixtures ---
+@pytest.fixture
+def fake_valkey_client():
+    return FakeValkeyClient()
+
+
+@pytest.fixture
+def client(fake_valkey_client, monkeypatch):
+    from glide import GlideClient
+
+    async def fake_create(config):
+        return fake_valkey_client
+
+    monkeypatch.setattr(GlideClient, "create", fake_create)
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+# --- Test Cases ---
+def test_user_stats(client, fake_valkey_client):
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    fake_valkey_client.hashes["stats:u1"] = {
+        "introductory": "5",
+        "interview": "2",
+        "total": "7",
+        "current_streak": "3",
+        "longest_streak": "4",
+        "last_solved_day": today.isoformat(),
+    }
+
+    response = client.get("/api/stats/u1")
+    assert response.status_code == 200
+    assert response.json() == {
+        "user_id": "u1",
+        "solved": {"easy": 5, "hard": 2, "total": 7},
+        "current_streak": 3,
+        "longest_streak": 4,
+        "last_solved_day": today.isoformat(),
+    }
+
+
+def test_user_stats_unknown_user(client):
+    response = client.get("/api/stats/nobody")
+    assert response.status_code == 404
+
+
+def test_format_user_stats_broken_streak():
+    """
+    A streak is still current if the last solve was yesterday, and drops to
+    0 once a full day is missed.
+    """
+    raw = {
+        b"introductory": b"1",
+        b"total": b"1",
+        b"current_streak": b"2",
+        b"longest_streak": b"2",
+        b"last_solved_day": b"2025-03-02",
+    }
+
+    stats = format_user_stats("u1", raw, today=datetime.date(2025, 3, 3))
+    assert stats["current_streak"] == 2
+
+    stats = format_user_stats("u1", raw, today=datetime.date(2025, 3, 4))
+    assert stats["current_streak"] == 0
+    assert stats["longest_streak"] == 2
+    assert stats["solved"] == {"easy": 1, "hard": 0, "total": 1}
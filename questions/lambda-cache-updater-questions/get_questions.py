@@ -16,47 +16,46 @@ async def get_questions(
     difficulty_easy="introductory",
     difficulty_hard="interview",
 ):
-    print("Entering get_questions()...")
     """
-    Fetches two sets of questions (easy & hard) from the external API.
+    Fetches two sets of questions (easy & hard) from the external API in a
+    single request, which the random-questions Lambda serves from one
+    database call. claim=true marks them served, so the next refresh gets
+    different questions.
     Raises a WeeklyQuestionsError for network, status, or JSON errors.
-    Returns a dict with keys 'easy' and 'hard' containing lists of questions.
+    Returns a dict with keys 'easy' and 'hard', each shaped like the
+    single-difficulty response: {"questions": [...]}.
     """
-    query_string = f"/random-questions?count={count}&difficulty="
-    url_easy = f"{BASE_URL}{query_string}{difficulty_easy}"
-    url_hard = f"{BASE_URL}{query_string}{difficulty_hard}"
-    print("Constructed URLs for easy and hard calls")
+    print("Entering get_questions()...")
+    url = (
+        f"{BASE_URL}/random-questions?count={count}"
+        f"&difficulty={difficulty_easy},{difficulty_hard}&claim=true"
+    )
     try:
-        print("Enterying try block to make call...")
         async with httpx.AsyncClient(timeout=72.0) as client:
-            print("Making calls")
-            easy_response = await client.get(url_easy)
-            print("First call made")
-            hard_response = await client.get(url_hard)
-            print("Second call made")
+            print("Making call")
+            response = await client.get(url)
+            print("Call made")
     except httpx.RequestError as exc:
         raise WeeklyQuestionsError(
             f"Failed to contact external API: {str(exc)}"
         ) from exc
 
-    if easy_response.status_code != 200:
+    if response.status_code != 200:
         raise WeeklyQuestionsError(
-            f"Error fetching easy questions. Status code: {easy_response.status_code}"
-        )
-    if hard_response.status_code != 200:
-        raise WeeklyQuestionsError(
-            f"Error fetching hard questions. Status code: {hard_response.status_code}"
+            f"Error fetching questions. Status code: {response.status_code}"
         )
 
     try:
-        easy_questions = easy_response.json()
-        hard_questions = hard_response.json()
+        question_sets = response.json().get("questions", {})
     except ValueError as exc:
         raise WeeklyQuestionsError(
             f"Invalid JSON response from external API: {str(exc)}"
         ) from exc
 
-    return {"easy": easy_questions, "hard": hard_questions}
+    return {
+        "easy": {"questions": question_sets.get(difficulty_easy, [])},
+        "hard": {"questions": question_sets.get(difficulty_hard, [])},
+    }
 
 
 def get_day_start(reference=None):
@@ -13,6 +13,7 @@ from get_questions import (
     get_questions,
     format_questions_data,
 )  # Note: ensure function names match
+from schedule import publish_schedule
 
 # Load environment variables from .env file if needed
 load_dotenv()
@@ -46,7 +47,7 @@ async def async_handler(event, context):
     """
     Async handler that always creates a fresh Valkey client,
     fetches new questions, formats the data with a timestamp,
-    and updates the cache.
+    and publishes it as the current or next question schedule.
     """
     print("Initialising valkey client")
     try:
@@ -70,10 +71,10 @@ async def async_handler(event, context):
     # Format the data (e.g., add a timestamp, etc.)
     cache_payload = format_questions_data(questions)
 
-    # Update the cache with the new data.
-    key = "active_questions"
+    # Stage the new schedule and its per-day projections, then flip the
+    # pointer (see schedule.py).
     try:
-        await valkey_client.set(key, json.dumps(cache_payload))
+        cache_payload, _ = await publish_schedule(valkey_client, cache_payload)
     except Exception as e:
         return {
             "statusCode": 500,
@@ -0,0 +1,142 @@
+import json
+import datetime
+from glide import ExpirySet, ExpiryType
+
+# Double-buffered question schedule kept in Valkey.
+#
+# Each run of the updater writes a new immutable schedule version:
+#   questions_schedule:v{n}                - the full cache payload
+#   questions_schedule:v{n}:day:{date}     - that day's easy/hard questions,
+#                                            ready to serve
+# and only then moves the pointer, a single key holding
+#   {"current": {"version": n, "start": "2025-03-02", "days": 5},
+#    "next": {"version": m, "start": "2025-03-07", "days": 5} | null}
+# While the current schedule still has days left, the new one is staged as
+# "next" and readers switch to it by date once its start day arrives, so
+# nothing has to be written at midnight UTC.
+SCHEDULE_POINTER_KEY = "questions_schedule:pointer"
+SCHEDULE_VERSION_KEY = "questions_schedule:version"
+# Legacy single-key cache, still read by main-api when there is no pointer
+LEGACY_QUESTIONS_KEY = "active_questions"
+# Extra days a schedule's keys are kept after its last day
+SCHEDULE_TTL_MARGIN_DAYS = 2
+
+
+def schedule_key(version):
+    return f"questions_schedule:v{version}"
+
+
+def day_key(version, day):
+    return f"questions_schedule:v{version}:day:{day.isoformat()}"
+
+
+def schedule_end(entry):
+    """
+    Returns the first day after a pointer entry's schedule.
+    """
+    start = datetime.date.fromisoformat(entry["start"])
+    return start + datetime.timedelta(days=entry["days"])
+
+
+def active_entry(pointer, today):
+    """
+    Returns the pointer entry readers use on a given day.
+    """
+    next_entry = pointer.get("next")
+    if next_entry and today >= datetime.date.fromisoformat(
+        next_entry["start"]
+    ):
+        return next_entry
+    return pointer.get("current")
+
+
+def strip_question(question):
+    """
+    Returns a question as main-api serves it: without solutions, and with
+    stringified inputs/outputs parsed into lists.
+    """
+    question = {k: v for k, v in question.items() if k != "solutions"}
+    for key in ("inputs", "outputs"):
+        if isinstance(question.get(key), str):
+            try:
+                question[key] = json.loads(question[key])
+            except json.JSONDecodeError:
+                pass
+    return question
+
+
+def build_day_projections(cache_payload, start):
+    """
+    Splits a cache payload into one {"easy": ..., "hard": ...} entry per
+    day, keyed by date, starting at start.
+    """
+    questions = cache_payload.get("questions", {})
+    easy_qs = questions.get("easy", {}).get("questions", [])
+    hard_qs = questions.get("hard", {}).get("questions", [])
+    return {
+        start
+        + datetime.timedelta(days=index): {
+            "easy": strip_question(easy),
+            "hard": strip_question(hard),
+        }
+        for index, (easy, hard) in enumerate(zip(easy_qs, hard_qs))
+    }
+
+
+async def publish_schedule(client, cache_payload, today=None):
+    """
+    Writes a new schedule version with its per-day projections, then points
+    readers at it.
+
+    If the schedule readers are currently on still has days left, the new
+    one starts the day after it ends and is staged as "next". Otherwise it
+    starts today and becomes current straight away, and the legacy
+    active_questions key is updated too.
+
+    Returns (cache_payload, pointer), where the payload's timestamp is the
+    day the new schedule starts.
+    """
+    if today is None:
+        today = datetime.datetime.utcnow().date()
+
+    raw_pointer = await client.get(SCHEDULE_POINTER_KEY)
+    pointer = json.loads(raw_pointer) if raw_pointer else {}
+    current = active_entry(pointer, today)
+
+    staged = current is not None and schedule_end(current) > today
+    start = schedule_end(current) if staged else today
+
+    if staged:
+        cache_payload = {
+            **cache_payload,
+            "timestamp": datetime.datetime.combine(
+                start, datetime.time.min
+            ).isoformat(),
+        }
+    days = build_day_projections(cache_payload, start)
+    if not days:
+        raise ValueError("Cannot publish an empty question schedule.")
+
+    version = await client.incr(SCHEDULE_VERSION_KEY)
+    entry = {"version": version, "start": start.isoformat(), "days": len(days)}
+    ttl_days = (schedule_end(entry) - today).days + SCHEDULE_TTL_MARGIN_DAYS
+    expiry = ExpirySet(ExpiryType.SEC, ttl_days * 24 * 60 * 60)
+
+    # Warm every key the new version needs before anything points at it.
+    await client.set(
+        schedule_key(version), json.dumps(cache_payload), expiry=expiry
+    )
+    for day, projection in days.items():
+        await client.set(
+            day_key(version, day), json.dumps(projection), expiry=expiry
+        )
+
+    if staged:
+        new_pointer = {"current": current, "next": entry}
+    else:
+        new_pointer = {"current": entry, "next": None}
+        await client.set(LEGACY_QUESTIONS_KEY, json.dumps(cache_payload))
+    await client.set(SCHEDULE_POINTER_KEY, json.dumps(new_pointer))
+
+    print(f"DEBUG: Published question schedule {new_pointer}")
+    return cache_payload, new_pointer
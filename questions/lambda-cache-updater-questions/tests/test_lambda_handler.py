@@ -18,11 +18,16 @@ class FakeValkeyClient:
             return value.encode("utf-8") if isinstance(value, str) else value
         return None
 
-    async def set(self, key, value):
+    async def set(self, key, value, expiry=None):
         if isinstance(value, bytes):
             value = value.decode("utf-8")
         self.store[key] = value
 
+    async def incr(self, key):
+        value = int(self.store.get(key, 0)) + 1
+        self.store[key] = str(value)
+        return value
+
     async def close(self):
         pass
 
@@ -56,8 +61,8 @@ async def test_async_handler_success(mocker, fake_valkey_client):
     """
     # Fake data for get_questions and format_questions_data.
     fake_questions = {
-        "easy": [{"id": 1, "question": "Easy Q1"}],
-        "hard": [{"id": 2, "question": "Hard Q1"}],
+        "easy": {"questions": [{"id": 1, "question": "Easy Q1"}]},
+        "hard": {"questions": [{"id": 2, "question": "Hard Q1"}]},
     }
     fake_payload = {
         "timestamp": "2025-03-02T00:00:00",
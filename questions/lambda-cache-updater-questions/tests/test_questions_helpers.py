@@ -14,95 +14,63 @@ from get_questions import (
 @pytest.mark.asyncio
 async def test_get_questions_success(mocker):
     """
-    Test that get_questions() returns the expected 'easy' and 'hard' lists
-    when the external API responds with 200 status and valid JSON.
+    Test that get_questions() fetches both difficulties in one call and
+    returns the expected 'easy' and 'hard' sections when the external API
+    responds with 200 status and valid JSON.
     """
     # Mock environment variable
     mocker.patch.dict(
         "os.environ", {"QUESTIONS_API_URL": "http://mockapi.com"}
     )
 
-    # Create mock responses
+    # Create mock response
     easy_data = [{"id": 1, "question": "Easy Q1"}]
     hard_data = [{"id": 2, "question": "Hard Q1"}]
 
-    mock_easy_response = MagicMock(status_code=200)
-    mock_easy_response.json.return_value = easy_data
-
-    mock_hard_response = MagicMock(status_code=200)
-    mock_hard_response.json.return_value = hard_data
+    mock_response = MagicMock(status_code=200)
+    mock_response.json.return_value = {
+        "questions": {"introductory": easy_data, "interview": hard_data}
+    }
 
     # Create an AsyncMock for the client and configure __aenter__ to return itself
     mock_async_client = AsyncMock()
     mock_async_client.__aenter__.return_value = mock_async_client
-    mock_async_client.get.side_effect = [
-        mock_easy_response,
-        mock_hard_response,
-    ]
+    mock_async_client.get.return_value = mock_response
 
     # Patch httpx.AsyncClient to return our mock client
     mocker.patch("httpx.AsyncClient", return_value=mock_async_client)
 
     result = await get_questions()
-    assert result["easy"] == easy_data
-    assert result["hard"] == hard_data
-
-
-@pytest.mark.asyncio
-async def test_get_questions_non_200_easy(mocker):
-    """
-    Test that get_questions() raises WeeklyQuestionsError if the 'easy' call
-    returns a non-200 status code.
-    """
-    mocker.patch.dict(
-        "os.environ", {"QUESTIONS_API_URL": "http://mockapi.com"}
-    )
-
-    mock_easy_response = MagicMock(status_code=404)
-    mock_hard_response = MagicMock(status_code=200)
-    mock_hard_response.json.return_value = [{"id": 2, "question": "Hard Q1"}]
-
-    mock_async_client = AsyncMock()
-    mock_async_client.__aenter__.return_value = mock_async_client
-    # The first .get() -> easy_response, second -> hard_response
-    mock_async_client.get.side_effect = [
-        mock_easy_response,
-        mock_hard_response,
-    ]
+    assert result["easy"] == {"questions": easy_data}
+    assert result["hard"] == {"questions": hard_data}
 
-    mocker.patch("httpx.AsyncClient", return_value=mock_async_client)
-
-    with pytest.raises(WeeklyQuestionsError) as exc:
-        await get_questions()
-    assert "Error fetching easy questions. Status code: 404" in str(exc.value)
+    mock_async_client.get.assert_called_once()
+    url = mock_async_client.get.call_args.args[0]
+    assert "difficulty=introductory,interview" in url
+    assert "claim=true" in url
 
 
 @pytest.mark.asyncio
-async def test_get_questions_non_200_hard(mocker):
+async def test_get_questions_non_200(mocker):
     """
-    Test that get_questions() raises WeeklyQuestionsError if the 'hard' call
+    Test that get_questions() raises WeeklyQuestionsError if the call
     returns a non-200 status code.
     """
     mocker.patch.dict(
         "os.environ", {"QUESTIONS_API_URL": "http://mockapi.com"}
     )
 
-    mock_easy_response = MagicMock(status_code=200)
-    mock_easy_response.json.return_value = [{"id": 1, "question": "Easy Q1"}]
-    mock_hard_response = MagicMock(status_code=500)
+    mock_response = MagicMock(status_code=500)
 
     mock_async_client = AsyncMock()
     mock_async_client.__aenter__.return_value = mock_async_client
-    mock_async_client.get.side_effect = [
-        mock_easy_response,
-        mock_hard_response,
-    ]
+    mock_async_client.get.return_value = mock_response
 
     mocker.patch("httpx.AsyncClient", return_value=mock_async_client)
 
     with pytest.raises(WeeklyQuestionsError) as exc:
         await get_questions()
-    assert "Error fetching hard questions. Status code: 500" in str(exc.value)
+    assert "Error fetching questions. Status code: 500" in str(exc.value)
 
 
 @pytest.mark.asyncio
@@ -137,20 +105,14 @@ async def test_get_questions_invalid_json(mocker):
         "os.environ", {"QUESTIONS_API_URL": "http://mockapi.com"}
     )
 
-    mock_easy_response = MagicMock(status_code=200)
-    mock_easy_response.json.side_effect = ValueError(
+    mock_response = MagicMock(status_code=200)
+    mock_response.json.side_effect = ValueError(
         "No JSON object could be decoded"
     )
 
-    mock_hard_response = MagicMock(status_code=200)
-    mock_hard_response.json.return_value = []
-
     mock_async_client = AsyncMock()
     mock_async_client.__aenter__.return_value = mock_async_client
-    mock_async_client.get.side_effect = [
-        mock_easy_response,
-        mock_hard_response,
-    ]
+    mock_async_client.get.return_value = mock_response
 
     mocker.patch("httpx.AsyncClient", return_value=mock_async_client)
 
@@ -0,0 +1,109 @@
+import json
+import datetime
+import pytest
+
+from schedule import (
+    SCHEDULE_POINTER_KEY,
+    LEGACY_QUESTIONS_KEY,
+    active_entry,
+    day_key,
+    publish_schedule,
+)
+
+
+# --- Fake Valkey Client ---
+class FakeValkeyClient:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        value = self.store.get(key)
+        if value is not None:
+            return value.encode("utf-8") if isinstance(value, str) else value
+        return None
+
+    async def set(self, key, value, expiry=None):
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        self.store[key] = value
+
+    async def incr(self, key):
+        value = int(self.store.get(key, 0)) + 1
+        self.store[key] = str(value)
+        return value
+
+
+def make_payload(prefix, count=3):
+    return {
+        "timestamp": "2025-03-02T00:00:00",
+        "questions": {
+            "easy": {
+                "questions": [
+                    {
+                        "id": f"{prefix}-e{i}",
+                        "solutions": ["..."],
+                        "inputs": "[[1]]",
+                        "outputs": "[1]",
+                    }
+                    for i in range(count)
+                ]
+            },
+            "hard": {
+                "questions": [{"id": f"{prefix}-h{i}"} for i in range(count)]
+            },
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_publish_schedule_starts_immediately():
+    """
+    With no schedule running, the new one becomes current today and each
+    day's projection is written ready to serve.
+    """
+    client = FakeValkeyClient()
+    today = datetime.date(2025, 3, 2)
+
+    payload, pointer = await publish_schedule(client, make_payload("a"), today)
+
+    assert pointer == {
+        "current": {"version": 1, "start": "2025-03-02", "days": 3},
+        "next": None,
+    }
+    assert json.loads(client.store[SCHEDULE_POINTER_KEY]) == pointer
+    assert json.loads(client.store[LEGACY_QUESTIONS_KEY]) == payload
+
+    day = json.loads(client.store[day_key(1, datetime.date(2025, 3, 3))])
+    assert day["easy"] == {"id": "a-e1", "inputs": [[1]], "outputs": [1]}
+    assert day["hard"] == {"id": "a-h1"}
+
+
+@pytest.mark.asyncio
+async def test_publish_schedule_stages_next():
+    """
+    While the current schedule has days left, the new one is staged to
+    start the day after it ends, and readers cut over by date.
+    """
+    client = FakeValkeyClient()
+    await publish_schedule(
+        client, make_payload("a"), datetime.date(2025, 3, 2)
+    )
+    legacy = client.store[LEGACY_QUESTIONS_KEY]
+
+    payload, pointer = await publish_schedule(
+        client, make_payload("b"), datetime.date(2025, 3, 4)
+    )
+
+    assert pointer["current"]["version"] == 1
+    assert pointer["next"] == {
+        "version": 2,
+        "start": "2025-03-05",
+        "days": 3,
+    }
+    assert payload["timestamp"] == "2025-03-05T00:00:00"
+    assert day_key(2, datetime.date(2025, 3, 5)) in client.store
+    # The legacy key keeps serving the running schedule.
+    assert client.store[LEGACY_QUESTIONS_KEY] == legacy
+
+    assert active_entry(pointer, datetime.date(2025, 3, 4))["version"] == 1
+    assert active_entry(pointer, datetime.date(2025, 3, 5))["version"] == 2
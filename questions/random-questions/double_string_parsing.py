@@ -1,5 +1,59 @@
 import json
 
+# Questions with this format_version store their test cases as canonical
+# jsonb (test_inputs / test_outputs) and need none of the parsing below.
+CANONICAL_FORMAT_VERSION = 1
+
+
+def strip_extra_quotes(value):
+    """
+    If 'value' is something like '\"abc\"', parse it as JSON to see if it
+    resolves to a simpler string 'abc'. If parsing fails or doesn't yield
+    a string, just return 'value' unchanged.
+    """
+    if not isinstance(value, str):
+        return value
+
+    try:
+        parsed = json.loads(value)
+        # Only replace if the parsed result is actually a string.
+        if isinstance(parsed, str):
+            return parsed
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    return value
+
+
+def recursively_strip(obj):
+    """
+    Recursively walk lists/dicts/strings to apply `strip_extra_quotes`
+    to every string found.
+    """
+    if isinstance(obj, list):
+        return [recursively_strip(x) for x in obj]
+    elif isinstance(obj, dict):
+        return {k: recursively_strip(v) for k, v in obj.items()}
+    elif isinstance(obj, str):
+        return strip_extra_quotes(obj)
+    else:
+        return obj
+
+
+def canonical_test_cases(value):
+    """
+    Parses stored test cases (JSON text, or already parsed) into plain
+    Python values with any extra string layers removed. This is the form
+    kept in the canonical test_inputs / test_outputs columns.
+    """
+    if isinstance(value, str):
+        value = json.loads(value)
+    return recursively_strip(value)
+
+
+def is_canonical(row: dict) -> bool:
+    return (row.get("format_version") or 0) >= CANONICAL_FORMAT_VERSION
+
 
 def remove_extra_string_layers(row: dict) -> dict:
     """
@@ -7,51 +61,10 @@ def remove_extra_string_layers(row: dict) -> dict:
     parse them as JSON, strip any extra quotes from strings, then re-serialize
     back into JSON text.
     """
-
-    # Helper function: if a string looks like a JSON-escaped string, parse it once more.
-    def strip_extra_quotes(value):
-        """
-        If 'value' is something like '\"abc\"', parse it as JSON to see if it
-        resolves to a simpler string 'abc'. If parsing fails or doesn't yield
-        a string, just return 'value' unchanged.
-        """
-        if not isinstance(value, str):
-            return value
-
-        try:
-            parsed = json.loads(value)
-            # Only replace if the parsed result is actually a string.
-            if isinstance(parsed, str):
-                return parsed
-        except (json.JSONDecodeError, TypeError):
-            pass
-
-        return value
-
-    def recursively_strip(obj):
-        """
-        Recursively walk lists/dicts/strings to apply `strip_extra_quotes`
-        to every string found.
-        """
-        if isinstance(obj, list):
-            return [recursively_strip(x) for x in obj]
-        elif isinstance(obj, dict):
-            return {k: recursively_strip(v) for k, v in obj.items()}
-        elif isinstance(obj, str):
-            return strip_extra_quotes(obj)
-        else:
-            return obj
-
-    # 1. Parse the "inputs" and "outputs" from JSON text to Python objects.
-    parsed_inputs = json.loads(row["inputs"])
-    parsed_outputs = json.loads(row["outputs"])
-
-    # 2. Recursively strip extra quotes from the parsed objects.
-    fixed_inputs = recursively_strip(parsed_inputs)
-    fixed_outputs = recursively_strip(parsed_outputs)
-
-    # 3. Re-serialize the cleaned objects back to JSON text.
-    row["inputs"] = json.dumps(fixed_inputs)
-    row["outputs"] = json.dumps(fixed_outputs)
+    # Parse, strip and re-serialize whichever of "inputs" and "outputs" are
+    # present (a fields= projection may have left one or both out).
+    for key in ("inputs", "outputs"):
+        if key in row:
+            row[key] = json.dumps(canonical_test_cases(row[key]))
 
     return row
@@ -0,0 +1,78 @@
+"""
+One-off migration of questions_generated to canonical test cases.
+
+Reads rows still at format_version 0, parses generated_inputs /
+generated_outputs once with the same rules as remove_extra_string_layers,
+and writes them to test_inputs / test_outputs (format_version 1) through
+the apply_canonical_test_cases RPC, one call per batch. Safe to re-run:
+only unconverted rows are read, and rows that fail to parse are reported
+and left as they are.
+
+    python normalize_questions.py
+"""
+
+import os
+from db_client.db_client import supabase
+from double_string_parsing import canonical_test_cases
+
+BATCH_SIZE = int(os.getenv("NORMALIZE_BATCH_SIZE", "200"))
+# Database function writing a batch of canonical rows
+# (see supabase/migrations/20261019000008_canonical_test_cases.sql)
+APPLY_RPC = "apply_canonical_test_cases"
+
+
+def fetch_unconverted(after_id):
+    """
+    Returns the next batch of unconverted rows with an id above after_id.
+    """
+    response = (
+        supabase.table("questions_generated")
+        .select("id, generated_inputs, generated_outputs")
+        .eq("format_version", 0)
+        .gt("id", after_id)
+        .order("id")
+        .limit(BATCH_SIZE)
+        .execute()
+    )
+    return response.dict().get("data", [])
+
+
+def normalize_row(row):
+    return {
+        "id": row["id"],
+        "test_inputs": canonical_test_cases(row["generated_inputs"] or "[]"),
+        "test_outputs": canonical_test_cases(row["generated_outputs"] or "[]"),
+    }
+
+
+def normalize_all():
+    converted = failed = 0
+    after_id = -1
+    while True:
+        rows = fetch_unconverted(after_id)
+        if not rows:
+            break
+        after_id = rows[-1]["id"]
+
+        batch = []
+        for row in rows:
+            try:
+                batch.append(normalize_row(row))
+            except (ValueError, TypeError) as e:
+                print(f"DEBUG: Could not normalize question {row['id']}: {e}")
+                failed += 1
+
+        if batch:
+            response = supabase.rpc(APPLY_RPC, {"p_rows": batch}).execute()
+            data = response.dict()
+            if data.get("error"):
+                error_msg = data["error"].get("message", "Unknown error")
+                raise RuntimeError(f"Error writing batch: {error_msg}")
+            converted += data.get("data") or 0
+        print(f"Converted {converted} questions so far...")
+
+    print(f"Done. Converted {converted} questions, {failed} failed.")
+
+
+if __name__ == "__main__":
+    normalize_all()
@@ -1,9 +1,118 @@
-import random
+import os
 from db_client.db_client import supabase
+from double_string_parsing import is_canonical
+
+# Database function claiming unseen questions in one transaction
+# (see supabase/migrations/20261019000006_claim_daily_questions.sql)
+CLAIM_QUESTIONS_RPC = "claim_daily_questions"
+# Same, for several difficulties in one call
+# (see supabase/migrations/20261019000007_claim_daily_questions_batch.sql)
+CLAIM_QUESTIONS_BATCH_RPC = "claim_daily_questions_batch"
+
+# Questions whose reference solution needs more than this to run the
+# suite submissions are judged on are never claimed. The default leaves
+# half of the evaluator's 5s limit for submissions slower than the
+# reference. Empty disables the limit.
+# (see supabase/migrations/20261019000011_question_eval_cost.sql)
+MAX_EVAL_COST_MS = os.getenv("MAX_EVAL_COST_MS", "2500")
+MAX_PEAK_MEMORY_KB = os.getenv("MAX_PEAK_MEMORY_KB", "")
+
+
+def cost_limits():
+    """
+    Returns the RPC arguments limiting claimed questions by evaluation cost.
+    """
+    return {
+        "p_max_cost_ms": float(MAX_EVAL_COST_MS) if MAX_EVAL_COST_MS else None,
+        "p_max_memory_kb": (
+            int(MAX_PEAK_MEMORY_KB) if MAX_PEAK_MEMORY_KB else None
+        ),
+    }
+
+
+def claim_questions(count, difficulty, claim=False):
+    """
+    Picks `count` random unseen questions of a difficulty with a single
+    RPC. With claim=True the database marks them served before returning
+    them, and starts a new pass over the pool when too few unseen questions
+    are left; otherwise it only reads a sample and changes nothing.
+    Solutions and the example inputs/outputs are never returned, nor are
+    questions too expensive to evaluate (see cost_limits).
+    """
+    response = supabase.rpc(
+        CLAIM_QUESTIONS_RPC,
+        {
+            "p_difficulty": difficulty,
+            "p_count": count,
+            "p_claim": claim,
+            **cost_limits(),
+        },
+    ).execute()
+    data = response.dict()
+    if data.get("error"):
+        error_msg = data["error"].get("message", "Unknown error")
+        raise RuntimeError(f"Error claiming questions: {error_msg}")
+    return data.get("data") or []
+
+
+def claim_question_sets(counts, claim=False):
+    """
+    Picks questions for several difficulties with a single RPC, marking
+    them served only if claim is True (see claim_questions).
+    `counts` maps each difficulty to the number of questions wanted, and the
+    result maps each difficulty to its questions.
+    """
+    response = supabase.rpc(
+        CLAIM_QUESTIONS_BATCH_RPC,
+        {"p_counts": counts, "p_claim": claim, **cost_limits()},
+    ).execute()
+    data = response.dict()
+    if data.get("error"):
+        error_msg = data["error"].get("message", "Unknown error")
+        raise RuntimeError(f"Error claiming questions: {error_msg}")
+    claimed = data.get("data") or {}
+    return {difficulty: claimed.get(difficulty) or [] for difficulty in counts}
+
+
+def rename_generated_columns(question):
+    """
+    Drops the columns "inpputs" and "outputs" (if present) and renames
+    "generated_inputs" to "inputs" and "generated_outputs" to "outputs".
+    Canonical rows are renamed from "test_inputs" / "test_outputs" instead,
+    along with their minimized suite ("pruned_test_inputs" /
+    "pruned_test_outputs") when they have one.
+    """
+    pruned_inputs = question.pop("pruned_test_inputs", None)
+    pruned_outputs = question.pop("pruned_test_outputs", None)
+    if is_canonical(question):
+        question.pop("inpputs", None)
+        question["inputs"] = question.pop("test_inputs", None) or []
+        question["outputs"] = question.pop("test_outputs", None) or []
+        if pruned_inputs and pruned_outputs:
+            question["pruned_inputs"] = pruned_inputs
+            question["pruned_outputs"] = pruned_outputs
+        return question
+    if "inpputs" in question:
+        del question["inpputs"]
+    if "outputs" in question:
+        del question["outputs"]
+    if "generated_inputs" in question:
+        question["inputs"] = question.pop("generated_inputs")
+    if "generated_outputs" in question:
+        question["outputs"] = question.pop("generated_outputs")
+    return question
+
+
+def check_enough_questions(questions, count, difficulty):
+    if len(questions) < count:
+        raise ValueError(
+            f"Only {len(questions)} {difficulty} questions available, "
+            f"{count} requested."
+        )
 
 
 def generate_random_questions(
-    count=7, difficulty="introductory", source="leetcode"
+    count=7, difficulty="introductory", source="leetcode", claim=False
 ):
     print(
         (
@@ -12,88 +121,30 @@ def generate_random_questions(
         )
     )
 
-    # Build the query for questions that haven't been seen
-    query = supabase.table("questions_generated").select("*")
-    if difficulty:
-        query = query.eq("difficulty", difficulty)
-    # if source:
-    #     query = query.eq("source", source)
-    query = query.eq("seen", False)
+    result = claim_questions(count, difficulty, claim)
+    check_enough_questions(result, count, difficulty)
+    result = [rename_generated_columns(question) for question in result]
 
-    response = query.execute()
-    print("DEBUG: supabase response =", response)
-    data = response.dict()
-    if data.get("error"):
-        error_msg = data["error"].get("message", "Unknown error")
-        raise RuntimeError(f"Error fetching questions: {error_msg}")
+    print("DEBUG: returning questions =", result)
+    return result
 
-    questions = data.get("data", [])
 
-    # If there are not enough unseen questions, reset the seen flag and update id for all rows
-    if len(questions) < count:
-        print(
-            (
-                "DEBUG: Not enough unseen questions; "
-                "resetting seen status and incrementing id for all rows."
-            )
-        )
-        # Get all questions (ignoring seen flag)
-        all_response = (
-            supabase.table("questions_generated").select("*").execute()
-        )
-        all_data = all_response.dict()
-        if all_data.get("error"):
-            error_msg = all_data["error"].get("message", "Unknown error")
-            raise RuntimeError(f"Error fetching all questions: {error_msg}")
-        all_questions = all_data.get("data", [])
-
-        # For each question, update: set seen=False and add 1000 to its id
-        for q in all_questions:
-            new_id = q["id"] + 1000
-            _ = (
-                supabase.table("questions_generated")
-                .update({"seen": False, "id": new_id})
-                .eq("id", q["id"])
-                .execute()
-            )
-            print(
-                f"DEBUG: Updated question id {q['id']} to new id {new_id}, set seen to False."
-            )
-
-        # Re-run the query to get unseen questions (with filters)
-        query = supabase.table("questions_generated").select("*")
-        if difficulty:
-            query = query.eq("difficulty", difficulty)
-        # if source:
-        #     query = query.eq("source", source)
-        query = query.eq("seen", False)
-        response = query.execute()
-        data = response.dict()
-        if data.get("error"):
-            error_msg = data["error"].get("message", "Unknown error")
-            raise RuntimeError(
-                f"Error fetching questions after update: {error_msg}"
-            )
-        questions = data.get("data", [])
-        if len(questions) < count:
-            raise ValueError(
-                "Still not enough questions available even after resetting seen status."
-            )
-
-    # Randomly sample the desired count of questions
-    result = random.sample(questions, count)
-
-    # Drop the columns "inpputs" and "outputs" (if present)
-    # and rename "generated_inputs" to "inputs" and "generated_outputs" to "outputs"
-    for question in result:
-        if "inpputs" in question:
-            del question["inpputs"]
-        if "outputs" in question:
-            del question["outputs"]
-        if "generated_inputs" in question:
-            question["inputs"] = question.pop("generated_inputs")
-        if "generated_outputs" in question:
-            question["outputs"] = question.pop("generated_outputs")
+def generate_random_question_sets(counts, source="leetcode", claim=False):
+    """
+    Returns random questions for several difficulties, picked by a single
+    database call and marked served only if claim is True. `counts` maps
+    difficulty -> count, e.g. {"introductory": 5, "interview": 5}.
+    """
+    print(f"DEBUG: generate_random_question_sets called with counts={counts}")
 
-    print("DEBUG: returning questions =", result)
+    claimed = claim_question_sets(counts, claim)
+    result = {}
+    for difficulty, count in counts.items():
+        check_enough_questions(claimed[difficulty], count, difficulty)
+        result[difficulty] = [
+            rename_generated_columns(question)
+            for question in claimed[difficulty]
+        ]
+
+    print("DEBUG: returning question sets =", result)
     return result
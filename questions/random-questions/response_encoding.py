@@ -0,0 +1,91 @@
+import gzip
+import json
+import base64
+
+try:
+    import brotli
+except ImportError:  # br is only offered when the brotli package is installed
+    brotli = None
+
+# Preferred first when the client accepts several
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+
+def choose_encoding(accept_encoding):
+    """
+    Picks the response encoding from an Accept-Encoding header value,
+    e.g. "gzip, deflate, br" -> "br". Encodings with q=0 are ignored.
+    Returns None if nothing supported is accepted.
+    """
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                pass
+        accepted.add(name.strip().lower())
+
+    for encoding in SUPPORTED_ENCODINGS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+def get_header(event, name):
+    """
+    Reads a request header from an API Gateway event, ignoring case.
+    """
+    for key, value in (event.get("headers") or {}).items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+
+def project_fields(question, fields):
+    """
+    Keeps only the requested keys of a question, or all of them if fields
+    is empty.
+    """
+    if not fields:
+        return question
+    return {key: question[key] for key in fields if key in question}
+
+
+def encode_body(payload, encoding=None):
+    """
+    Serializes a response payload for API Gateway, as compact JSON
+    compressed in one call if an encoding was chosen.
+    Returns (body, is_base64_encoded).
+    """
+    body = json.dumps(payload, separators=(",", ":"))
+    if encoding is None:
+        return body, False
+
+    raw = body.encode("utf-8")
+    if encoding == "br":
+        compressed = brotli.compress(raw)
+    else:
+        # Level 6 is zlib's default; gzip's own default of 9 is much slower
+        compressed = gzip.compress(raw, compresslevel=6)
+
+    return base64.b64encode(compressed).decode("ascii"), True
+
+
+def build_response(status_code, payload, encoding=None):
+    """
+    Builds the Lambda proxy response, compressed if an encoding was chosen.
+    """
+    body, is_base64 = encode_body(payload, encoding)
+    headers = {"Content-Type": "application/json", "Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return {
+        "statusCode": status_code,
+        "headers": headers,
+        "body": body,
+        "isBase64Encoded": is_base64,
+    }
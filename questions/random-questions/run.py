@@ -1,34 +1,92 @@
-import json
-from randomq import generate_random_questions
-from double_string_parsing import remove_extra_string_layers
+from randomq import generate_random_questions, generate_random_question_sets
+from double_string_parsing import is_canonical, remove_extra_string_layers
+from response_encoding import (
+    build_response,
+    choose_encoding,
+    get_header,
+    project_fields,
+)
+
+
+def parse_counts(count_param, difficulty_param):
+    """
+    Parses the comma-separated query parameters into difficulty -> count.
+
+    e.g. count="5,3", difficulty="introductory,interview"
+         -> {"introductory": 5, "interview": 3}
+    A single count applies to every difficulty.
+    """
+    difficulties = [
+        d.strip() for d in difficulty_param.split(",") if d.strip()
+    ]
+    counts = [int(c) for c in count_param.split(",")]
+    if len(counts) == 1:
+        counts = counts * len(difficulties)
+    if len(counts) != len(difficulties):
+        raise ValueError(
+            "count must be a single value or one value per difficulty."
+        )
+    return dict(zip(difficulties, counts))
+
+
+def prepare_questions(questions, fields):
+    """
+    Projects each question onto the requested fields, then undoes the extra
+    string layers on whatever inputs/outputs are left. Canonical rows were
+    normalized once at ingest and are passed through untouched.
+    """
+    prepared = []
+    for question in questions:
+        canonical = is_canonical(question)
+        question = project_fields(question, fields)
+        if not canonical:
+            question = remove_extra_string_layers(question)
+        prepared.append(question)
+    return prepared
 
 
 def lambda_handler(event, context):
+    encoding = None
     try:
         qs = event.get("queryStringParameters") or {}
+        encoding = choose_encoding(get_header(event, "Accept-Encoding"))
 
-        count = int(qs["count"]) if "count" in qs else None
+        count = qs.get("count")
         difficulty = qs.get("difficulty")
+        # Optional projection, e.g. fields=id,question,starter_code
+        fields = [f.strip() for f in qs.get("fields", "").split(",")]
+        fields = [f for f in fields if f]
+        # Only the questions cache updater marks what it gets as served;
+        # any other call (e.g. a fields= probe) leaves the pool untouched.
+        claim = qs.get("claim") == "true"
+
+        # Several difficulties (e.g. difficulty=introductory,interview&count=5)
+        # are claimed together with one database call.
+        if difficulty is not None and "," in difficulty:
+            counts = parse_counts(count or "7", difficulty)
+            question_sets = generate_random_question_sets(
+                counts, source="leetcode", claim=claim
+            )
+            body = {
+                "questions": {
+                    d: prepare_questions(questions, fields)
+                    for d, questions in question_sets.items()
+                }
+            }
+            return build_response(200, body, encoding)
 
         # If count is None, or any parameter is not provided, the function's defaults will apply.
         questions = generate_random_questions(
-            count=count if count is not None else 7,
+            count=int(count) if count is not None else 7,
             difficulty=(
                 difficulty if difficulty is not None else "introductory"
             ),
             source="leetcode",  # Defaults to None if not provided
+            claim=claim,
         )
 
-        questions = [remove_extra_string_layers(q) for q in questions]
+        questions = prepare_questions(questions, fields)
 
-        return {
-            "statusCode": 200,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"questions": questions}),
-        }
+        return build_response(200, {"questions": questions}, encoding)
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": str(e)}),
-        }
+        return build_response(500, {"error": str(e)}, encoding)
@@ -0,0 +1,143 @@
+import sys
+import gzip
+import json
+import types
+import base64
+import pytest
+
+# db_client connects to Supabase on import, so the tests provide their own
+# module in its place; run.py's question sources are patched per test.
+sys.modules.setdefault("db_client", types.ModuleType("db_client"))
+fake_db_client = types.ModuleType("db_client.db_client")
+fake_db_client.supabase = None
+sys.modules["db_client.db_client"] = fake_db_client
+
+import run  # noqa: E402
+import response_encoding  # noqa: E402
+from response_encoding import (  # noqa: E402
+    build_response,
+    choose_encoding,
+    get_header,
+    project_fields,
+)
+
+QUESTION = {
+    "id": 1,
+    "question": "Add two numbers",
+    "starter_code": "def add(a, b):",
+    "difficulty": "introductory",
+}
+
+
+def decode_body(response):
+    """
+    Undoes what API Gateway does with a base64, gzip-encoded body.
+    """
+    assert response["isBase64Encoded"] is True
+    raw = gzip.decompress(base64.b64decode(response["body"]))
+    return json.loads(raw)
+
+
+# --- Accept-Encoding Negotiation ---
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip, deflate", "gzip"),
+        ("GZIP", "gzip"),
+        ("deflate;q=1.0, gzip;q=0.5", "gzip"),
+        ("*", "gzip"),
+        ("gzip;q=0", None),
+        ("gzip; q=0.0, deflate", None),
+        ("identity", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_choose_encoding_prefers_br_when_available(monkeypatch):
+    monkeypatch.setattr(
+        response_encoding, "SUPPORTED_ENCODINGS", ("br", "gzip")
+    )
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("gzip, br;q=0") == "gzip"
+
+
+def test_get_header_ignores_case():
+    event = {"headers": {"accept-encoding": "gzip"}}
+    assert get_header(event, "Accept-Encoding") == "gzip"
+    assert get_header({"headers": None}, "Accept-Encoding") is None
+
+
+# --- Response Body ---
+def test_uncompressed_response():
+    response = build_response(200, {"questions": [QUESTION]})
+
+    assert response["isBase64Encoded"] is False
+    assert "Content-Encoding" not in response["headers"]
+    assert response["headers"]["Vary"] == "Accept-Encoding"
+    assert json.loads(response["body"]) == {"questions": [QUESTION]}
+
+
+def test_gzip_response_is_base64_encoded():
+    payload = {"questions": [QUESTION] * 50}
+
+    response = build_response(200, payload, "gzip")
+
+    assert response["headers"]["Content-Encoding"] == "gzip"
+    assert decode_body(response) == payload
+    assert len(response["body"]) < len(json.dumps(payload))
+
+
+# --- Field Projection ---
+def test_project_fields_keeps_requested_keys():
+    assert project_fields(QUESTION, ["id", "question"]) == {
+        "id": 1,
+        "question": "Add two numbers",
+    }
+
+
+def test_project_fields_skips_unknown_keys():
+    assert project_fields(QUESTION, ["id", "no_such_field"]) == {"id": 1}
+    assert project_fields(QUESTION, ["no_such_field"]) == {}
+
+
+def test_project_fields_without_fields_keeps_everything():
+    assert project_fields(QUESTION, []) == QUESTION
+
+
+# --- Lambda Handler ---
+def test_lambda_handler_projects_and_compresses(monkeypatch):
+    monkeypatch.setattr(
+        run,
+        "generate_random_questions",
+        lambda **kwargs: [dict(QUESTION, format_version=1)],
+    )
+    event = {
+        "headers": {"Accept-Encoding": "gzip"},
+        "queryStringParameters": {"fields": "id, starter_code,missing"},
+    }
+
+    response = run.lambda_handler(event, None)
+
+    assert response["statusCode"] == 200
+    assert decode_body(response) == {
+        "questions": [{"id": 1, "starter_code": "def add(a, b):"}]
+    }
+
+
+def test_lambda_handler_error_uses_negotiated_encoding(monkeypatch):
+    def fail(**kwargs):
+        raise ValueError("Only 0 introductory questions available")
+
+    monkeypatch.setattr(run, "generate_random_questions", fail)
+    event = {"headers": {"Accept-Encoding": "gzip"}}
+
+    response = run.lambda_handler(event, None)
+
+    assert response["statusCode"] == 500
+    assert decode_body(response) == {
+        "error": "Only 0 introductory questions available"
+    }
@@ -0,0 +1,42 @@
+-- Minimal stand-in for the Supabase tables the migrations touch, for
+-- running them against a local Postgres (see benchmark_leaderboard.py).
+create table if not exists public.leaderboard (
+    user_id uuid primary key,
+    display_name text not null default '',
+    introductory integer not null default 0,
+    interview integer not null default 0
+);
+
+create table if not exists public.completed_questions (
+    id bigserial primary key,
+    user_id uuid not null,
+    question_id bigint not null,
+    difficulty text not null,
+    completed_at timestamptz not null default now()
+);
+
+create table if not exists public.questions_generated (
+    id bigserial primary key,
+    question text not null default '',
+    solutions jsonb not null default '[]',
+    inputs jsonb not null default '[]',
+    outputs jsonb not null default '[]',
+    generated_inputs jsonb not null default '[]',
+    generated_outputs jsonb not null default '[]',
+    difficulty text not null,
+    starter_code text not null default '',
+    source text not null default '',
+    seen boolean not null default false
+);
+
+create table if not exists public.questions (
+    id bigserial primary key,
+    question text not null default '',
+    solutions jsonb not null default '[]',
+    inputs jsonb not null default '[]',
+    outputs jsonb not null default '[]',
+    name text not null default '',
+    difficulty text not null default '',
+    starter_code text not null default '',
+    source text not null default ''
+);
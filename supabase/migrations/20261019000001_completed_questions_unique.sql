@@ -0,0 +1,15 @@
+-- Key completed_questions on (user_id, question_id) so the batched
+-- write-behind in leaderboard-updater/flush_completions.py can upsert with
+-- ON CONFLICT DO NOTHING and retried batches never double-count.
+
+-- Remove any duplicates recorded before the constraint existed, keeping the
+-- earliest completion.
+delete from public.completed_questions a
+using public.completed_questions b
+where a.user_id = b.user_id
+  and a.question_id = b.question_id
+  and (coalesce(a.completed_at, 'infinity'), a.ctid)
+    > (coalesce(b.completed_at, 'infinity'), b.ctid);
+
+create unique index if not exists completed_questions_user_question_key
+    on public.completed_questions (user_id, question_id);
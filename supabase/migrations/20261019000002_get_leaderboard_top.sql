@@ -0,0 +1,43 @@
+-- Returns the top entries for both difficulties in a single request:
+--   {"introductory": [{"name": ..., "score": ...}, ...],
+--    "interview":    [{"name": ..., "score": ...}, ...]}
+-- Called by leaderboard/leaderboard_function/leaderboard.py via
+-- POST /rest/v1/rpc/get_leaderboard_top.
+create or replace function public.get_leaderboard_top(p_count integer default 5)
+returns jsonb
+language sql
+stable
+as $$
+    select jsonb_build_object(
+        'introductory', coalesce(
+            (
+                select jsonb_agg(
+                    jsonb_build_object('name', display_name, 'score', introductory)
+                    order by introductory desc
+                )
+                from (
+                    select display_name, introductory
+                    from public.leaderboard
+                    order by introductory desc
+                    limit p_count
+                ) top_introductory
+            ),
+            '[]'::jsonb
+        ),
+        'interview', coalesce(
+            (
+                select jsonb_agg(
+                    jsonb_build_object('name', display_name, 'score', interview)
+                    order by interview desc
+                )
+                from (
+                    select display_name, interview
+                    from public.leaderboard
+                    order by interview desc
+                    limit p_count
+                ) top_interview
+            ),
+            '[]'::jsonb
+        )
+    );
+$$;
@@ -0,0 +1,69 @@
+-- Keep the leaderboard scores in step with completed_questions inside the
+-- database.
+--
+-- leaderboard.introductory / leaderboard.interview are the number of
+-- questions of each difficulty a user has completed. A statement-level
+-- trigger applies the delta of each INSERT to completed_questions, so a
+-- batch from leaderboard-updater/flush_completions.py is folded in with a
+-- single UPDATE. Rows skipped by ON CONFLICT DO NOTHING are never in the
+-- transition table, so retried batches don't double-count.
+
+create or replace function public.apply_completed_questions()
+returns trigger
+language plpgsql
+as $$
+begin
+    update public.leaderboard l
+    set introductory = l.introductory + delta.introductory,
+        interview = l.interview + delta.interview
+    from (
+        select
+            user_id,
+            count(*) filter (where difficulty = 'introductory') as introductory,
+            count(*) filter (where difficulty = 'interview') as interview
+        from new_completions
+        group by user_id
+    ) delta
+    where l.user_id = delta.user_id;
+    return null;
+end;
+$$;
+
+drop trigger if exists completed_questions_apply_scores
+    on public.completed_questions;
+create trigger completed_questions_apply_scores
+    after insert on public.completed_questions
+    referencing new table as new_completions
+    for each statement
+    execute function public.apply_completed_questions();
+
+-- Full recomputation, for reconciling after manual edits. This is the only
+-- path that scans completed_questions.
+create or replace function public.rebuild_leaderboard_scores()
+returns void
+language sql
+as $$
+    update public.leaderboard l
+    set introductory = coalesce(totals.introductory, 0),
+        interview = coalesce(totals.interview, 0)
+    from public.leaderboard target
+    left join (
+        select
+            user_id,
+            count(*) filter (where difficulty = 'introductory') as introductory,
+            count(*) filter (where difficulty = 'interview') as interview
+        from public.completed_questions
+        group by user_id
+    ) totals on totals.user_id = target.user_id
+    where l.user_id = target.user_id;
+$$;
+
+-- Index-only scans for get_top_leaderboard_entries / get_leaderboard_top,
+-- which order by each score descending with a limit.
+create index if not exists leaderboard_introductory_idx
+    on public.leaderboard (introductory desc) include (display_name);
+create index if not exists leaderboard_interview_idx
+    on public.leaderboard (interview desc) include (display_name);
+
+-- Start from scores that match completed_questions.
+select public.rebuild_leaderboard_scores();
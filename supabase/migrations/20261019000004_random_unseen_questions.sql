@@ -0,0 +1,36 @@
+-- Picks p_count random unseen questions of a difficulty (any difficulty if
+-- p_difficulty is null) inside the database, so
+-- questions/random-questions/randomq.py no longer downloads every unseen
+-- question just to sample a few of them.
+--
+-- The random pick only reads ids through the partial index below. Only the
+-- chosen rows are fetched, and solutions and the example inputs/outputs are
+-- dropped before they leave the database. Called via
+-- POST /rest/v1/rpc/random_unseen_questions, which returns a JSON array.
+create index if not exists questions_generated_unseen_idx
+    on public.questions_generated (difficulty, id)
+    where not seen;
+
+create or replace function public.random_unseen_questions(
+    p_difficulty text default null,
+    p_count integer default 7
+)
+returns jsonb
+language sql
+volatile
+as $$
+    with picked as (
+        select id
+        from public.questions_generated
+        where (p_difficulty is null or difficulty = p_difficulty)
+          and not seen
+        order by random()
+        limit p_count
+    )
+    select coalesce(
+        jsonb_agg(to_jsonb(q) - 'solutions' - 'inputs' - 'outputs'),
+        '[]'::jsonb
+    )
+    from public.questions_generated q
+    join picked using (id);
+$$;
@@ -0,0 +1,83 @@
+-- Resetting the question pool by epoch instead of rewriting every row.
+--
+-- Each difficulty has a current epoch in question_pool_state, and each
+-- question records the epoch it was last served in. A question is unseen
+-- while its last_epoch is below the current epoch, so starting a fresh
+-- pass over the pool is a single counter increment
+-- (advance_question_epoch) rather than one update per question.
+-- The old seen flag is no longer read.
+create table if not exists public.question_pool_state (
+    difficulty text primary key,
+    epoch integer not null default 1
+);
+
+insert into public.question_pool_state (difficulty)
+select distinct difficulty from public.questions_generated
+on conflict (difficulty) do nothing;
+
+alter table public.questions_generated
+    add column if not exists last_epoch integer not null default 0;
+
+-- Questions already marked seen count as served in the first epoch.
+update public.questions_generated
+set last_epoch = 1
+where seen and last_epoch = 0;
+
+create index if not exists questions_generated_epoch_idx
+    on public.questions_generated (difficulty, last_epoch);
+drop index if exists public.questions_generated_unseen_idx;
+
+-- Starts a new epoch for one difficulty, or for every difficulty when
+-- p_difficulty is null. Returns the number of difficulties advanced.
+create or replace function public.advance_question_epoch(
+    p_difficulty text default null
+)
+returns integer
+language sql
+volatile
+as $$
+    with advanced_one as (
+        insert into public.question_pool_state as s (difficulty, epoch)
+        select p_difficulty, 2
+        where p_difficulty is not null
+        on conflict (difficulty) do update set epoch = s.epoch + 1
+        returning 1
+    ),
+    advanced_all as (
+        update public.question_pool_state
+        set epoch = epoch + 1
+        where p_difficulty is null
+        returning 1
+    )
+    select (
+        (select count(*) from advanced_one)
+        + (select count(*) from advanced_all)
+    )::integer;
+$$;
+
+create or replace function public.random_unseen_questions(
+    p_difficulty text default null,
+    p_count integer default 7
+)
+returns jsonb
+language sql
+volatile
+as $$
+    with picked as (
+        select q.id
+        from public.questions_generated q
+        left join public.question_pool_state s using (difficulty)
+        where (p_difficulty is null or q.difficulty = p_difficulty)
+          and q.last_epoch < coalesce(s.epoch, 1)
+        order by random()
+        limit p_count
+    )
+    select coalesce(
+        jsonb_agg(
+            to_jsonb(q) - 'solutions' - 'inputs' - 'outputs' - 'last_epoch'
+        ),
+        '[]'::jsonb
+    )
+    from public.questions_generated q
+    join picked using (id);
+$$;
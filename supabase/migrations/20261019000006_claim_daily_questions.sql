@@ -0,0 +1,81 @@
+-- Claims p_count random unseen questions of a difficulty in one transaction:
+-- picks them, marks them served in the current epoch and returns them (as a
+-- JSON array, without solutions or example inputs/outputs). If fewer than
+-- p_count are left, the difficulty's epoch is advanced first so the whole
+-- pool is unseen again.
+--
+-- The difficulty's question_pool_state row is locked for the duration, so
+-- overlapping cache refreshes claim one after the other and never receive
+-- the same question. Called by questions/random-questions/randomq.py via
+-- POST /rest/v1/rpc/claim_daily_questions.
+create or replace function public.claim_daily_questions(
+    p_difficulty text,
+    p_count integer default 7
+)
+returns jsonb
+language plpgsql
+volatile
+as $$
+declare
+    v_epoch integer;
+    v_available integer;
+    v_claimed jsonb;
+begin
+    insert into public.question_pool_state (difficulty)
+    values (p_difficulty)
+    on conflict (difficulty) do nothing;
+
+    select epoch into v_epoch
+    from public.question_pool_state
+    where difficulty = p_difficulty
+    for update;
+
+    select count(*) into v_available
+    from (
+        select 1
+        from public.questions_generated
+        where difficulty = p_difficulty
+          and last_epoch < v_epoch
+        limit p_count
+    ) unseen;
+
+    if v_available < p_count then
+        update public.question_pool_state
+        set epoch = epoch + 1
+        where difficulty = p_difficulty
+        returning epoch into v_epoch;
+    end if;
+
+    with picked as (
+        select id
+        from public.questions_generated
+        where difficulty = p_difficulty
+          and last_epoch < v_epoch
+        order by random()
+        limit p_count
+        for update skip locked
+    ),
+    claimed as (
+        update public.questions_generated q
+        set last_epoch = v_epoch
+        from picked
+        where q.id = picked.id
+        returning q.*
+    )
+    select coalesce(
+        jsonb_agg(
+            to_jsonb(c) - 'solutions' - 'inputs' - 'outputs' - 'last_epoch'
+        ),
+        '[]'::jsonb
+    )
+    into v_claimed
+    from claimed c;
+
+    return v_claimed;
+end;
+$$;
+
+-- claim_daily_questions picks, marks and resets the pool itself, so the
+-- separate sampling and reset functions have no callers left.
+drop function if exists public.random_unseen_questions(text, integer);
+drop function if exists public.advance_question_epoch(text);
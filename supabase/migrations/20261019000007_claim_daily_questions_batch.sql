@@ -0,0 +1,33 @@
+-- Claims questions for several difficulties in one call, e.g.
+--   claim_daily_questions_batch('{"introductory": 5, "interview": 5}')
+-- returns
+--   {"introductory": [...], "interview": [...]}
+-- Every difficulty is claimed with claim_daily_questions inside the same
+-- transaction, in name order so overlapping batches lock the
+-- question_pool_state rows in the same order. Called by
+-- questions/random-questions/randomq.py via
+-- POST /rest/v1/rpc/claim_daily_questions_batch.
+create or replace function public.claim_daily_questions_batch(
+    p_counts jsonb
+)
+returns jsonb
+language plpgsql
+volatile
+as $$
+declare
+    v_difficulty text;
+    v_result jsonb := '{}'::jsonb;
+begin
+    for v_difficulty in
+        select key from jsonb_object_keys(p_counts) key order by key
+    loop
+        v_result := v_result || jsonb_build_object(
+            v_difficulty,
+            public.claim_daily_questions(
+                v_difficulty, (p_counts ->> v_difficulty)::integer
+            )
+        );
+    end loop;
+    return v_result;
+end;
+$$;
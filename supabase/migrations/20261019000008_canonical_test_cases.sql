@@ -0,0 +1,111 @@
+-- Canonical, typed storage for the generated test cases.
+--
+-- generated_inputs / generated_outputs hold JSON text whose strings can be
+-- wrapped in extra layers of JSON quoting, so every read used to re-parse
+-- them recursively (remove_extra_string_layers, then parse_inputs_outputs
+-- in main-api). test_inputs / test_outputs hold the same data parsed once
+-- into jsonb, and format_version records which representation a row has:
+--   0 - only the raw text columns
+--   1 - canonical test_inputs / test_outputs
+-- Rows are converted by questions/random-questions/normalize_questions.py,
+-- and new rows are written canonical at ingest.
+alter table public.questions_generated
+    add column if not exists test_inputs jsonb,
+    add column if not exists test_outputs jsonb,
+    add column if not exists format_version smallint not null default 0;
+
+-- Writes a batch of canonical test cases in one statement, e.g.
+--   [{"id": 1, "test_inputs": [...], "test_outputs": [...]}, ...]
+-- Returns the number of rows updated.
+create or replace function public.apply_canonical_test_cases(p_rows jsonb)
+returns integer
+language sql
+volatile
+as $$
+    with updated as (
+        update public.questions_generated q
+        set test_inputs = r.test_inputs,
+            test_outputs = r.test_outputs,
+            format_version = 1
+        from jsonb_to_recordset(p_rows)
+            as r(id bigint, test_inputs jsonb, test_outputs jsonb)
+        where q.id = r.id
+        returning 1
+    )
+    select count(*)::integer from updated;
+$$;
+
+-- Claimed questions carry either the canonical columns or the raw text
+-- ones, never both.
+create or replace function public.claim_daily_questions(
+    p_difficulty text,
+    p_count integer default 7
+)
+returns jsonb
+language plpgsql
+volatile
+as $$
+declare
+    v_epoch integer;
+    v_available integer;
+    v_claimed jsonb;
+begin
+    insert into public.question_pool_state (difficulty)
+    values (p_difficulty)
+    on conflict (difficulty) do nothing;
+
+    select epoch into v_epoch
+    from public.question_pool_state
+    where difficulty = p_difficulty
+    for update;
+
+    select count(*) into v_available
+    from (
+        select 1
+        from public.questions_generated
+        where difficulty = p_difficulty
+          and last_epoch < v_epoch
+        limit p_count
+    ) unseen;
+
+    if v_available < p_count then
+        update public.question_pool_state
+        set epoch = epoch + 1
+        where difficulty = p_difficulty
+        returning epoch into v_epoch;
+    end if;
+
+    with picked as (
+        select id
+        from public.questions_generated
+        where difficulty = p_difficulty
+          and last_epoch < v_epoch
+        order by random()
+        limit p_count
+        for update skip locked
+    ),
+    claimed as (
+        update public.questions_generated q
+        set last_epoch = v_epoch
+        from picked
+        where q.id = picked.id
+        returning q.*
+    )
+    select coalesce(
+        jsonb_agg(
+            case
+                when c.format_version >= 1 then
+                    to_jsonb(c) - 'generated_inputs' - 'generated_outputs'
+                else
+                    to_jsonb(c) - 'test_inputs' - 'test_outputs'
+            end
+            - 'solutions' - 'inputs' - 'outputs' - 'last_epoch'
+        ),
+        '[]'::jsonb
+    )
+    into v_claimed
+    from claimed c;
+
+    return v_claimed;
+end;
+$$;
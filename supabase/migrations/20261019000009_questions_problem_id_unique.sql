@@ -0,0 +1,11 @@
+-- Identifies each row of the raw questions table by where it came from in
+-- the APPS dataset, so test-case-generation/data_upload.py can upsert with
+-- on_conflict=split,problem_id. Retried and resumed uploads then update
+-- rows instead of duplicating them. problem_id restarts at 0 in each split,
+-- so the split is part of the key.
+alter table public.questions
+    add column if not exists split text,
+    add column if not exists problem_id integer;
+
+create unique index if not exists questions_split_problem_id_idx
+    on public.questions (split, problem_id);
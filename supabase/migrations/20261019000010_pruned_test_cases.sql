@@ -0,0 +1,13 @@
+-- Minimized test suites chosen at ingest.
+--
+-- test-case-generation/minimize.py keeps the subset of each question's
+-- generated cases that preserves the reference solution's coverage and
+-- edge cases within a CPU budget. The full suite stays in test_inputs /
+-- test_outputs; full submissions are judged on the pruned one when it is
+-- present (main-api questions_fns.select_test_cases).
+--
+-- claim_daily_questions returns the whole row, so claimed questions carry
+-- these columns without any change to the function.
+alter table public.questions_generated
+    add column if not exists pruned_test_inputs jsonb,
+    add column if not exists pruned_test_outputs jsonb;
@@ -0,0 +1,134 @@
+-- Evaluation cost of each question's reference solution, recorded at
+-- ingest by test-case-generation (see solution_runner.profile_solution):
+--   case_costs     - per generated case: {"ms": runtime, "kb": peak memory}
+--   eval_cost_ms   - total runtime of the suite submissions are judged on
+--                    (the pruned suite when there is one)
+--   peak_memory_kb - largest peak memory of any case
+-- Rows ingested before profiling have nulls and are treated as unknown.
+alter table public.questions_generated
+    add column if not exists case_costs jsonb,
+    add column if not exists eval_cost_ms real,
+    add column if not exists peak_memory_kb integer;
+
+create index if not exists questions_generated_difficulty_cost_idx
+    on public.questions_generated (difficulty, eval_cost_ms);
+
+-- Claiming takes optional cost limits. Questions over either limit are
+-- never claimed; unprofiled questions are still eligible. The argument
+-- lists change, so the old signatures are dropped rather than overloaded.
+drop function if exists public.claim_daily_questions_batch(jsonb);
+drop function if exists public.claim_daily_questions(text, integer);
+
+create or replace function public.claim_daily_questions(
+    p_difficulty text,
+    p_count integer default 7,
+    p_max_cost_ms real default null,
+    p_max_memory_kb integer default null
+)
+returns jsonb
+language plpgsql
+volatile
+as $$
+declare
+    v_epoch integer;
+    v_available integer;
+    v_claimed jsonb;
+begin
+    insert into public.question_pool_state (difficulty)
+    values (p_difficulty)
+    on conflict (difficulty) do nothing;
+
+    select epoch into v_epoch
+    from public.question_pool_state
+    where difficulty = p_difficulty
+    for update;
+
+    select count(*) into v_available
+    from (
+        select 1
+        from public.questions_generated
+        where difficulty = p_difficulty
+          and last_epoch < v_epoch
+          and (p_max_cost_ms is null or eval_cost_ms is null
+               or eval_cost_ms <= p_max_cost_ms)
+          and (p_max_memory_kb is null or peak_memory_kb is null
+               or peak_memory_kb <= p_max_memory_kb)
+        limit p_count
+    ) unseen;
+
+    if v_available < p_count then
+        update public.question_pool_state
+        set epoch = epoch + 1
+        where difficulty = p_difficulty
+        returning epoch into v_epoch;
+    end if;
+
+    with picked as (
+        select id
+        from public.questions_generated
+        where difficulty = p_difficulty
+          and last_epoch < v_epoch
+          and (p_max_cost_ms is null or eval_cost_ms is null
+               or eval_cost_ms <= p_max_cost_ms)
+          and (p_max_memory_kb is null or peak_memory_kb is null
+               or peak_memory_kb <= p_max_memory_kb)
+        order by random()
+        limit p_count
+        for update skip locked
+    ),
+    claimed as (
+        update public.questions_generated q
+        set last_epoch = v_epoch
+        from picked
+        where q.id = picked.id
+        returning q.*
+    )
+    select coalesce(
+        jsonb_agg(
+            case
+                when c.format_version >= 1 then
+                    to_jsonb(c) - 'generated_inputs' - 'generated_outputs'
+                else
+                    to_jsonb(c) - 'test_inputs' - 'test_outputs'
+            end
+            - 'solutions' - 'inputs' - 'outputs' - 'last_epoch'
+            - 'case_costs'
+        ),
+        '[]'::jsonb
+    )
+    into v_claimed
+    from claimed c;
+
+    return v_claimed;
+end;
+$$;
+
+create or replace function public.claim_daily_questions_batch(
+    p_counts jsonb,
+    p_max_cost_ms real default null,
+    p_max_memory_kb integer default null
+)
+returns jsonb
+language plpgsql
+volatile
+as $$
+declare
+    v_difficulty text;
+    v_result jsonb := '{}'::jsonb;
+begin
+    for v_difficulty in
+        select key from jsonb_object_keys(p_counts) key order by key
+    loop
+        v_result := v_result || jsonb_build_object(
+            v_difficulty,
+            public.claim_daily_questions(
+                v_difficulty,
+                (p_counts ->> v_difficulty)::integer,
+                p_max_cost_ms,
+                p_max_memory_kb
+            )
+        );
+    end loop;
+    return v_result;
+end;
+$$;
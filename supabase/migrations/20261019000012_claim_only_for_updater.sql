@@ -0,0 +1,171 @@
+-- Only the questions cache updater claims questions. Every other call to
+-- the random-questions API (e.g. a fields= probe) passes p_claim => false
+-- and just reads a sample of the unseen pool: nothing is marked served,
+-- no epoch is advanced and no rows are locked. When too few unseen
+-- questions are left, a peek samples the whole difficulty, which is what
+-- the next claim would start from. The argument lists change, so the old
+-- signatures are dropped rather than overloaded.
+drop function if exists public.claim_daily_questions_batch(
+    jsonb, real, integer
+);
+drop function if exists public.claim_daily_questions(
+    text, integer, real, integer
+);
+
+create or replace function public.claim_daily_questions(
+    p_difficulty text,
+    p_count integer default 7,
+    p_max_cost_ms real default null,
+    p_max_memory_kb integer default null,
+    p_claim boolean default true
+)
+returns jsonb
+language plpgsql
+volatile
+as $$
+declare
+    v_epoch integer;
+    v_available integer;
+    v_claimed jsonb;
+begin
+    if p_claim then
+        insert into public.question_pool_state (difficulty)
+        values (p_difficulty)
+        on conflict (difficulty) do nothing;
+
+        select epoch into v_epoch
+        from public.question_pool_state
+        where difficulty = p_difficulty
+        for update;
+    else
+        select coalesce(max(epoch), 1) into v_epoch
+        from public.question_pool_state
+        where difficulty = p_difficulty;
+    end if;
+
+    select count(*) into v_available
+    from (
+        select 1
+        from public.questions_generated
+        where difficulty = p_difficulty
+          and last_epoch < v_epoch
+          and (p_max_cost_ms is null or eval_cost_ms is null
+               or eval_cost_ms <= p_max_cost_ms)
+          and (p_max_memory_kb is null or peak_memory_kb is null
+               or peak_memory_kb <= p_max_memory_kb)
+        limit p_count
+    ) unseen;
+
+    if v_available < p_count then
+        if p_claim then
+            update public.question_pool_state
+            set epoch = epoch + 1
+            where difficulty = p_difficulty
+            returning epoch into v_epoch;
+        else
+            v_epoch := v_epoch + 1;
+        end if;
+    end if;
+
+    if not p_claim then
+        select coalesce(
+            jsonb_agg(
+                case
+                    when c.format_version >= 1 then
+                        to_jsonb(c) - 'generated_inputs'
+                        - 'generated_outputs'
+                    else
+                        to_jsonb(c) - 'test_inputs' - 'test_outputs'
+                end
+                - 'solutions' - 'inputs' - 'outputs' - 'last_epoch'
+                - 'case_costs'
+            ),
+            '[]'::jsonb
+        )
+        into v_claimed
+        from (
+            select *
+            from public.questions_generated
+            where difficulty = p_difficulty
+              and last_epoch < v_epoch
+              and (p_max_cost_ms is null or eval_cost_ms is null
+                   or eval_cost_ms <= p_max_cost_ms)
+              and (p_max_memory_kb is null or peak_memory_kb is null
+                   or peak_memory_kb <= p_max_memory_kb)
+            order by random()
+            limit p_count
+        ) c;
+        return v_claimed;
+    end if;
+
+    with picked as (
+        select id
+        from public.questions_generated
+        where difficulty = p_difficulty
+          and last_epoch < v_epoch
+          and (p_max_cost_ms is null or eval_cost_ms is null
+               or eval_cost_ms <= p_max_cost_ms)
+          and (p_max_memory_kb is null or peak_memory_kb is null
+               or peak_memory_kb <= p_max_memory_kb)
+        order by random()
+        limit p_count
+        for update skip locked
+    ),
+    claimed as (
+        update public.questions_generated q
+        set last_epoch = v_epoch
+        from picked
+        where q.id = picked.id
+        returning q.*
+    )
+    select coalesce(
+        jsonb_agg(
+            case
+                when c.format_version >= 1 then
+                    to_jsonb(c) - 'generated_inputs' - 'generated_outputs'
+                else
+                    to_jsonb(c) - 'test_inputs' - 'test_outputs'
+            end
+            - 'solutions' - 'inputs' - 'outputs' - 'last_epoch'
+            - 'case_costs'
+        ),
+        '[]'::jsonb
+    )
+    into v_claimed
+    from claimed c;
+
+    return v_claimed;
+end;
+$$;
+
+create or replace function public.claim_daily_questions_batch(
+    p_counts jsonb,
+    p_max_cost_ms real default null,
+    p_max_memory_kb integer default null,
+    p_claim boolean default true
+)
+returns jsonb
+language plpgsql
+volatile
+as $$
+declare
+    v_difficulty text;
+    v_result jsonb := '{}'::jsonb;
+begin
+    for v_difficulty in
+        select key from jsonb_object_keys(p_counts) key order by key
+    loop
+        v_result := v_result || jsonb_build_object(
+            v_difficulty,
+            public.claim_daily_questions(
+                v_difficulty,
+                (p_counts ->> v_difficulty)::integer,
+                p_max_cost_ms,
+                p_max_memory_kb,
+                p_claim
+            )
+        );
+    end loop;
+    return v_result;
+end;
+$$;
@@ -0,0 +1,11 @@
+-- test-case-generation/data_upload_test_cases.py writes its rows (with the
+-- canonical, pruned and cost columns added by the earlier migrations)
+-- straight to questions_generated, upserting on (split, problem_id) like
+-- data_upload.py does for the raw questions table. Rows from before this
+-- have null keys and are left alone by the unique index.
+alter table public.questions_generated
+    add column if not exists split text,
+    add column if not exists problem_id integer;
+
+create unique index if not exists questions_generated_split_problem_id_idx
+    on public.questions_generated (split, problem_id);
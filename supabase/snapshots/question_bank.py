@@ -0,0 +1,264 @@
+"""
+Exports questions_generated to a Parquet snapshot and bulk-loads it back.
+
+Seeding an environment (or the local stand-in database used by the
+benchmarks) otherwise means re-running the Hugging Face + LLM ingestion or
+paging rows out of Supabase. A snapshot is one zstd-compressed Parquet file:
+
+    python question_bank.py export --dsn $DATABASE_URL --out questions.parquet
+    python question_bank.py import --dsn postgresql://... --file questions.parquet
+
+Export streams rows through a server-side cursor, so memory is bounded by
+--batch-size. Import streams the row groups into COPY ... FROM STDIN.
+
+Numeric and boolean columns keep their Arrow types. Every other column
+(jsonb, text, timestamps) is stored as its Postgres text form and cast back
+by COPY. The file metadata records the snapshot format version, the
+column types and the latest migration at export time. Import only loads
+the columns the target table has, and warns about the rest.
+"""
+
+import os
+import io
+import glob
+import json
+import argparse
+import datetime
+import psycopg2
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+SNAPSHOTS_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATIONS_DIR = os.path.join(SNAPSHOTS_DIR, "..", "migrations")
+TABLE_NAME = "questions_generated"
+
+# Bump when the snapshot layout changes in a way older importers can't read
+SNAPSHOT_FORMAT_VERSION = 1
+METADATA_KEY = b"question_bank"
+
+# Postgres types stored with a native Arrow type; everything else is text
+ARROW_TYPES = {
+    "bigint": pa.int64(),
+    "integer": pa.int32(),
+    "smallint": pa.int16(),
+    "real": pa.float32(),
+    "double precision": pa.float64(),
+    "boolean": pa.bool_(),
+}
+
+
+def latest_migration():
+    paths = sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "*.sql")))
+    return os.path.basename(paths[-1]) if paths else None
+
+
+def table_columns(cur, table):
+    """
+    Returns [(name, postgres type), ...] in table order.
+    """
+    cur.execute(
+        "select column_name, data_type from information_schema.columns "
+        "where table_schema = 'public' and table_name = %s "
+        "order by ordinal_position",
+        (table,),
+    )
+    return cur.fetchall()
+
+
+def arrow_schema(columns):
+    return pa.schema(
+        [
+            (name, ARROW_TYPES.get(pg_type, pa.string()))
+            for name, pg_type in columns
+        ]
+    )
+
+
+def select_list(columns):
+    return ", ".join(
+        f'"{name}"' if pg_type in ARROW_TYPES else f'"{name}"::text'
+        for name, pg_type in columns
+    )
+
+
+def export_snapshot(conn, path, table=TABLE_NAME, batch_size=5000):
+    """
+    Writes the table to a Parquet snapshot. Returns the number of rows.
+    """
+    with conn.cursor() as cur:
+        columns = table_columns(cur, table)
+    if not columns:
+        raise ValueError(f"Table public.{table} not found")
+
+    metadata = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "table": table,
+        "columns": columns,
+        "migration": latest_migration(),
+        "exported_at": datetime.datetime.now(
+            datetime.timezone.utc
+        ).isoformat(),
+    }
+    schema = arrow_schema(columns).with_metadata(
+        {METADATA_KEY: json.dumps(metadata)}
+    )
+
+    rows_written = 0
+    # Named (server-side) cursor, so rows are fetched batch by batch
+    with conn.cursor(name="question_bank_export") as cur, pq.ParquetWriter(
+        path, schema, compression="zstd"
+    ) as writer:
+        cur.itersize = batch_size
+        cur.execute(
+            f"select {select_list(columns)} from public.{table} order by 1"
+        )
+        while rows := cur.fetchmany(batch_size):
+            arrays = [
+                pa.array([row[i] for row in rows], type=field.type)
+                for i, field in enumerate(schema)
+            ]
+            writer.write_batch(pa.record_batch(arrays, schema=schema))
+            rows_written += len(rows)
+            print(f"Exported {rows_written} rows...")
+
+    return rows_written
+
+
+def read_metadata(parquet_file):
+    raw = (parquet_file.schema_arrow.metadata or {}).get(METADATA_KEY)
+    if raw is None:
+        raise ValueError("Not a question bank snapshot (no metadata)")
+    metadata = json.loads(raw)
+    if metadata["format_version"] > SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(
+            f"Snapshot format {metadata['format_version']} is newer than "
+            f"this tool supports ({SNAPSHOT_FORMAT_VERSION})"
+        )
+    return metadata
+
+
+class CSVStream(io.RawIOBase):
+    """
+    File-like view of the snapshot as headerless CSV, one row group at a
+    time, for COPY ... FROM STDIN.
+    """
+
+    def __init__(self, parquet_file, columns, batch_size):
+        self.batches = parquet_file.iter_batches(
+            batch_size=batch_size, columns=columns
+        )
+        self.buffer = b""
+        self.rows = 0
+        # Nulls are written unquoted and every value quoted, which is how
+        # COPY's csv format tells NULL apart from an empty string.
+        self.options = pa_csv.WriteOptions(
+            include_header=False, quoting_style="all_valid"
+        )
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            batch = next(self.batches, None)
+            if batch is None:
+                break
+            sink = io.BytesIO()
+            pa_csv.write_csv(batch, sink, write_options=self.options)
+            self.buffer += sink.getvalue()
+            self.rows += batch.num_rows
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+
+def import_snapshot(conn, path, table=None, replace=False, batch_size=50000):
+    """
+    Bulk-loads a snapshot with COPY. Returns the number of rows loaded.
+    """
+    parquet_file = pq.ParquetFile(path)
+    metadata = read_metadata(parquet_file)
+    table = table or metadata["table"]
+    print(
+        f"Snapshot of {metadata['table']} exported {metadata['exported_at']} "
+        f"(migration {metadata['migration']})"
+    )
+
+    with conn.cursor() as cur:
+        target = {name for name, _ in table_columns(cur, table)}
+        if not target:
+            raise ValueError(f"Table public.{table} not found")
+        columns = [name for name, _ in metadata["columns"] if name in target]
+        skipped = [
+            name for name, _ in metadata["columns"] if name not in target
+        ]
+        if skipped:
+            print(f"Skipping columns missing from public.{table}: {skipped}")
+
+        if replace:
+            cur.execute(f"truncate public.{table}")
+
+        stream = CSVStream(parquet_file, columns, batch_size)
+        column_list = ", ".join(f'"{name}"' for name in columns)
+        cur.copy_expert(
+            f"copy public.{table} ({column_list}) from stdin with (format csv)",
+            stream,
+        )
+
+        # Keep the id sequence ahead of the imported ids. is_called=false
+        # makes the next id exactly max(id) + 1, or 1 for an empty table.
+        if "id" in columns:
+            cur.execute(
+                "select setval(pg_get_serial_sequence(%s, 'id'), "
+                f"coalesce((select max(id) from public.{table}), 0) + 1, "
+                "false)",
+                (f"public.{table}",),
+            )
+
+    conn.commit()
+    return stream.rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write a snapshot")
+    export_parser.add_argument("--dsn", required=True)
+    export_parser.add_argument("--out", required=True)
+    export_parser.add_argument("--table", default=TABLE_NAME)
+    export_parser.add_argument("--batch-size", type=int, default=5000)
+
+    import_parser = commands.add_parser("import", help="Load a snapshot")
+    import_parser.add_argument("--dsn", required=True)
+    import_parser.add_argument("--file", required=True)
+    import_parser.add_argument(
+        "--table", help="Defaults to the exported table"
+    )
+    import_parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="Truncate the table before loading",
+    )
+    import_parser.add_argument("--batch-size", type=int, default=50000)
+
+    args = parser.parse_args()
+    conn = psycopg2.connect(args.dsn)
+    try:
+        if args.command == "export":
+            rows = export_snapshot(conn, args.out, args.table, args.batch_size)
+            size_mb = os.path.getsize(args.out) / 2**20
+            print(f"Wrote {rows} rows to {args.out} ({size_mb:.1f} MB)")
+        else:
+            rows = import_snapshot(
+                conn, args.file, args.table, args.replace, args.batch_size
+            )
+            print(f"Loaded {rows} rows from {args.file}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
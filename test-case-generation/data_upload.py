@@ -1,8 +1,11 @@
-from datasets import load_dataset
 import json
 import os
+import threading
 import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Load environment variables
 load_dotenv()
@@ -12,14 +15,24 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_API_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 TABLE_NAME = "questions"
 
-# Supabase REST endpoint
+# Supabase REST endpoint. Rows are upserted on (split, problem_id) (see
+# supabase/migrations/*_questions_problem_id_unique.sql), so retried or
+# resumed batches never create duplicates.
 SUPABASE_ENDPOINT = f"{SUPABASE_URL}/rest/v1/{TABLE_NAME}"
+UPSERT_CONFLICT_COLUMNS = "split,problem_id"
 HEADERS = {
     "apikey": SUPABASE_API_KEY,
     "Authorization": f"Bearer {SUPABASE_API_KEY}",
     "Content-Type": "application/json",
+    "Prefer": "resolution=merge-duplicates,return=minimal",
 }
 
+# Upload tuning
+BATCH_SIZE = int(os.getenv("UPLOAD_BATCH_SIZE", "100"))
+CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
+# One "split/problem_id" per line for every row already uploaded
+CHECKPOINT_FILE = os.getenv("UPLOAD_CHECKPOINT_FILE", "upload_checkpoint.txt")
+
 
 # Extract and filter dataset
 def filter_and_prepare_question(sample, split):
@@ -55,6 +68,8 @@ def filter_and_prepare_question(sample, split):
 
         # Return the processed question in the required format
         return {
+            "split": split,
+            "problem_id": sample.get("problem_id"),
             "question": sample.get("question", ""),
             "solutions": solutions,
             "inputs": inputs,
@@ -69,49 +84,134 @@ def filter_and_prepare_question(sample, split):
         return None
 
 
+def checkpoint_key(row):
+    return f"{row['split']}/{row['problem_id']}"
+
+
+def load_checkpoint(path):
+    """
+    Returns the set of "split/problem_id" keys already uploaded.
+    """
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def create_session(pool_size=CONCURRENCY):
+    """
+    Creates a pooled HTTP session that retries throttled and failed
+    requests. Retrying POSTs is safe because every upload is an upsert.
+    """
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=None,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 # Upload to Supabase
-def upload_to_supabase(data, counter):
+def upload_batch(session, rows, endpoint=SUPABASE_ENDPOINT):
+    """
+    Upserts a batch of rows in a single request. Returns True on success.
+    """
     try:
-        response = requests.post(
-            SUPABASE_ENDPOINT, headers=HEADERS, json=[data]
+        response = session.post(
+            endpoint,
+            params={"on_conflict": UPSERT_CONFLICT_COLUMNS},
+            json=rows,
         )
-        if response.status_code == 201:
-            print(f"Uploaded question {counter}.")
+        if response.status_code in (200, 201, 204):
             return True
-        else:
-            print(f"Upload failed: {response.status_code} - {response.text}")
-            return False
+        print(f"Upload failed: {response.status_code} - {response.text}")
+        return False
     except Exception as e:
         print(f"Upload error: {e}")
         return False
 
 
+def prepared_batches(dataset, split, done, batch_size):
+    """
+    Yields lists of prepared rows not yet in the checkpoint.
+    """
+    batch = []
+    for sample in dataset:
+        row = filter_and_prepare_question(sample, split)
+        if row is None or checkpoint_key(row) in done:
+            continue
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
 # Process dataset for both splits
-def process_and_upload_dataset(dataset, split):
+def process_and_upload_dataset(
+    dataset,
+    split,
+    session=None,
+    endpoint=SUPABASE_ENDPOINT,
+    batch_size=BATCH_SIZE,
+    concurrency=CONCURRENCY,
+    checkpoint_path=CHECKPOINT_FILE,
+):
+    """
+    Uploads the dataset in batches, with up to `concurrency` requests in
+    flight. Each uploaded batch is appended to the checkpoint file, so a
+    rerun skips everything that already made it. Returns the number of rows
+    uploaded.
+    """
+    session = session or create_session(concurrency)
+    done = load_checkpoint(checkpoint_path)
+    checkpoint_lock = threading.Lock()
     uploaded_count = 0
-    for i, sample in enumerate(dataset):
-        processed_question = filter_and_prepare_question(sample, split)
-        if processed_question:
-            success = upload_to_supabase(processed_question, uploaded_count)
-            if success:
-                uploaded_count += 1
+
+    def upload_and_checkpoint(rows):
+        if not upload_batch(session, rows, endpoint):
+            return 0
+        if checkpoint_path:
+            with checkpoint_lock, open(checkpoint_path, "a") as f:
+                f.writelines(f"{checkpoint_key(row)}\n" for row in rows)
+        return len(rows)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight = set()
+        for rows in prepared_batches(dataset, split, done, batch_size):
+            # Keep at most `concurrency` batches queued or running.
+            if len(in_flight) >= concurrency:
+                finished, in_flight = wait(
+                    in_flight, return_when=FIRST_COMPLETED
+                )
+                for future in finished:
+                    uploaded_count += future.result()
+            in_flight.add(executor.submit(upload_and_checkpoint, rows))
+
+        for future in in_flight:
+            uploaded_count += future.result()
+
     print(f"Total {split} questions uploaded: {uploaded_count}")
+    return uploaded_count
 
 
 if __name__ == "__main__":
-    # Load both train and test splits from Hugging Face
-    print("Loading dataset from Hugging Face...")
-    train_data = load_dataset("codeparrot/apps", split="train")
-    test_data = load_dataset("codeparrot/apps", split="test")
-    print(
-        f"Loaded {len(train_data)} training questions and {len(test_data)} testing questions."
-    )
+    from dataset_stream import stream_samples
 
-    # Process and upload both train and test splits
+    # Stream both train and test splits without loading them into memory
     print("Uploading training dataset...")
-    process_and_upload_dataset(train_data, "train")
+    process_and_upload_dataset(stream_samples("train"), "train")
 
     print("Uploading testing dataset...")
-    process_and_upload_dataset(test_data, "test")
+    process_and_upload_dataset(stream_samples("test"), "test")
 
     print("All uploads completed successfully.")
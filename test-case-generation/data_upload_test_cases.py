@@ -1,142 +1,41 @@
 import os
 import re
 import json
-import requests
-import time
-import multiprocessing
 import math
 from dotenv import load_dotenv
-from openai import OpenAI
-from datasets import load_dataset
+from double_string_parsing import canonical_test_cases
+from llm_cache import cache_key
+from minimize import minimize_suite
+from solution_runner import get_solution_runner
 
 # Load environment variables
 load_dotenv()
 
 # OpenAI API setup
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY)
+LLM_MODEL = "gpt-4o-mini"
+# Bump whenever build_test_case_prompt changes, so cached generations from
+# the old prompt are no longer used.
+PROMPT_VERSION = 1
+
+# Seconds allowed for profiling a question's generated cases, on top of the
+# plain run. Profiling runs each case more than once and under a tracer.
+PROFILE_TIMEOUT = float(os.getenv("PROFILE_TIMEOUT", "60"))
 
 # Supabase setup
 SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_API_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-TABLE_NAME = "questions"
+# Rows are upserted on (split, problem_id) like the raw questions (see
+# supabase/migrations/*_questions_generated_problem_id.sql)
+TABLE_NAME = "questions_generated"
 
 SUPABASE_ENDPOINT = f"{SUPABASE_URL}/rest/v1/{TABLE_NAME}"
-HEADERS = {
-    "apikey": SUPABASE_API_KEY,
-    "Authorization": f"Bearer {SUPABASE_API_KEY}",
-    "Content-Type": "application/json",
-}
 
 
 def run_solution_with_timeout(solution_code, inputs, timeout=5):
     """
-    Runs the solution in a separate process to enforce a timeout.
+    Runs the solution on the shared worker pool to enforce a timeout.
     """
-
-    def target_function(queue, solution_code, inputs):
-        """
-        This function executes the provided solution code and stores results in a queue.
-        """
-        try:
-            import math
-            import collections
-            import heapq
-            import queue as q
-            import itertools
-            import functools
-            import bisect
-            import re
-            import json
-            import string
-            import datetime
-            import statistics
-            import random
-            import typing
-            from typing import List, Tuple, Dict, Set, Optional
-            from collections import defaultdict, deque, Counter
-            from functools import lru_cache
-
-            # Inject all modules into execution environment
-            exec_globals = {
-                "__builtins__": __builtins__,
-                "math": math,
-                "collections": collections,
-                "heapq": heapq,
-                "queue": q,
-                "itertools": itertools,
-                "functools": functools,
-                "bisect": bisect,
-                "re": re,
-                "json": json,
-                "string": string,
-                "datetime": datetime,
-                "statistics": statistics,
-                "random": random,
-                "typing": typing,
-                "List": List,
-                "Tuple": Tuple,
-                "Dict": Dict,
-                "Set": Set,
-                "Optional": Optional,
-                "defaultdict": defaultdict,
-                "deque": deque,
-                "Counter": Counter,
-                "lru_cache": lru_cache,
-            }
-            exec_locals = {}
-
-            # Execute the solution code safely
-            exec(solution_code, exec_globals, exec_locals)
-
-            # Check if it's a class-based solution
-            if "Solution" in exec_locals:
-                solution_instance = exec_locals["Solution"]()
-                for key in dir(solution_instance):
-                    if not key.startswith("__") and callable(
-                        getattr(solution_instance, key)
-                    ):
-                        method = getattr(solution_instance, key)
-
-                        # Run method and store result
-                        results = [method(*inp) for inp in inputs]
-                        queue.put(results)
-                        return
-
-            # Check for standalone function
-            for name, obj in exec_locals.items():
-                if callable(obj) and not name.startswith("__"):
-                    results = [obj(*inp) for inp in inputs]
-                    queue.put(results)
-                    return
-
-            queue.put([])  # If no valid function/class method found
-
-        except Exception as e:
-            queue.put(f"Error: {str(e)}")  # Send error to parent process
-
-    # Run in separate process
-    result_queue = multiprocessing.Queue()
-    process = multiprocessing.Process(
-        target=target_function, args=(result_queue, solution_code, inputs)
-    )
-    process.start()
-    process.join(timeout)  # Timeout Enforced
-
-    # If process is still alive after timeout, terminate it
-    if process.is_alive():
-        print(
-            f"Timeout! Solution execution took longer than {timeout} seconds."
-        )
-        process.terminate()
-        process.join()
-        return f"Error: Timeout after {timeout} seconds"
-
-    # Retrieve result from queue
-    if not result_queue.empty():
-        return result_queue.get()
-
-    return "Error: No output received"
+    return get_solution_runner().run(solution_code, inputs, timeout)
 
 
 def execute_solution(solution_code, inputs, timeout=5):
@@ -152,11 +51,43 @@ def execute_solution(solution_code, inputs, timeout=5):
     return result
 
 
-def generate_test_cases_with_llm(question, example_inputs, example_outputs):
+def execute_and_minimize(
+    solution_code, inputs, timeout=5, profile_timeout=PROFILE_TIMEOUT
+):
+    """
+    Runs the solution for its outputs, then profiles it under coverage and
+    returns (outputs, selected, costs): selected are the indices of the
+    minimized suite (see minimize.py), and costs each case's
+    {"ms": runtime, "kb": peak memory}.
+
+    Profiling runs every case several times, so it gets its own time
+    budget. If it fails anyway, the outputs are kept without a pruned
+    suite or costs: (outputs, None, None). Returns ([], None, None) if the
+    solution itself failed.
+    """
+    outputs = execute_solution(solution_code, inputs, timeout)
+    if not outputs:
+        return outputs, None, None
+
+    profiles = get_solution_runner().profile(
+        solution_code, inputs, profile_timeout
+    )
+    if isinstance(profiles, str) and "Error" in profiles:
+        print(f"Profiling failed, keeping the full suite: {profiles}")
+        return outputs, None, None
+
+    costs = [
+        {"ms": round(profile["seconds"] * 1000, 3), "kb": profile["peak_kb"]}
+        for profile in profiles
+    ]
+    return outputs, minimize_suite(inputs, profiles), costs
+
+
+def build_test_case_prompt(question, example_inputs, example_outputs):
     """
-    Uses GPT-4o mini to generate additional test cases.
+    Builds the prompt asking the LLM for new test cases.
     """
-    prompt = f"""
+    return f"""
     You are an AI test case generator. Your task is to generate additional valid
     test cases for a given coding problem. Make basic, edge, and large scale test
     cases. Please don't add any comments, only outputs. Please don't add any
@@ -180,37 +111,38 @@ def generate_test_cases_with_llm(question, example_inputs, example_outputs):
         'outputs': [[...], [...], ...]]  # Corresponding expected outputs
     }}
     """
-    retries = 3
-    for attempt in range(retries):
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You generate programming test cases.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.5,
-            )
 
-            raw_response = response.choices[0].message.content
-            print(f"RAW LLM RESPONSE:\n{raw_response}")
 
-            cleaned_response = re.sub(
-                r"```json\s*|\s*```", "", raw_response
-            ).strip()
-            return json.loads(cleaned_response)
+def build_llm_messages(prompt):
+    return [
+        {
+            "role": "system",
+            "content": "You generate programming test cases.",
+        },
+        {"role": "user", "content": prompt},
+    ]
+
+
+def parse_llm_response(raw_response):
+    """
+    Strips any markdown code fence from the LLM's reply and parses the JSON.
+    """
+    cleaned_response = re.sub(r"```json\s*|\s*```", "", raw_response).strip()
+    return json.loads(cleaned_response)
 
-        except Exception as e:
-            print(f"API error: {e}. Retrying in {2 ** attempt} seconds...")
-            time.sleep(2**attempt)
 
-    return {"inputs": [], "outputs": []}
+def llm_cache_key(question, example_inputs, example_outputs):
+    return cache_key(
+        LLM_MODEL, PROMPT_VERSION, question, example_inputs, example_outputs
+    )
 
 
-def process_question(sample):
+def prepare_sample(sample):
+    """
+    Picks out what test case generation needs from a dataset sample: the
+    question, its examples and a reference solution (class-based preferred).
+    Returns None for samples that can't be used.
+    """
     try:
         url = sample.get("url", "")
         source = "leetcode" if "leetcode" in url else None
@@ -268,32 +200,12 @@ def process_question(sample):
             print("No valid solution found, skipping...")
             return None
 
-        print(f"Generating test cases for: {question_text[:50]}...")
-        llm_generated_tests = generate_test_cases_with_llm(
-            question_text, example_inputs, example_outputs
-        )
-
-        valid_inputs = llm_generated_tests.get("inputs", [])
-
-        # Run the solution and generate outputs
-        final_generated_outputs = execute_solution(
-            valid_solution, valid_inputs
-        )
-
-        # Skip if outputs are completely empty
-        if not final_generated_outputs:
-            print(
-                f"No outputs generated for: {question_text[:50]}... Skipping upload."
-            )
-            return None
-
         return {
+            "problem_id": sample.get("problem_id"),
             "question": question_text,
-            "solutions": [valid_solution],
-            "inputs": example_inputs,
-            "outputs": example_outputs,
-            "generated_inputs": valid_inputs,
-            "generated_outputs": final_generated_outputs,
+            "solution": valid_solution,
+            "example_inputs": example_inputs,
+            "example_outputs": example_outputs,
             "difficulty": sample.get("difficulty", "Easy"),
             "starter_code": sample.get("starter_code", ""),
             "source": source,
@@ -304,6 +216,48 @@ def process_question(sample):
         return None
 
 
+def build_question_row(
+    prepared, generated_inputs, generated_outputs, selected=None, costs=None
+):
+    """
+    Builds the row uploaded for a question once its generated inputs have
+    been run through the reference solution. `selected` are the indices of
+    the minimized suite, stored alongside the full one, and `costs` the
+    per-case costs from execute_and_minimize.
+    """
+    test_inputs = canonical_test_cases(generated_inputs)
+    test_outputs = canonical_test_cases(generated_outputs)
+    row = {
+        "problem_id": prepared["problem_id"],
+        "question": prepared["question"],
+        "solutions": [prepared["solution"]],
+        "inputs": prepared["example_inputs"],
+        "outputs": prepared["example_outputs"],
+        "generated_inputs": generated_inputs,
+        "generated_outputs": generated_outputs,
+        # Canonical copies, so readers never need to re-parse the text
+        # columns (see supabase/migrations/*_canonical_test_cases.sql)
+        "test_inputs": test_inputs,
+        "test_outputs": test_outputs,
+        "format_version": 1,
+        "difficulty": prepared["difficulty"],
+        "starter_code": prepared["starter_code"],
+        "source": prepared["source"],
+    }
+    if selected is not None:
+        row["pruned_test_inputs"] = [test_inputs[i] for i in selected]
+        row["pruned_test_outputs"] = [test_outputs[i] for i in selected]
+    if costs:
+        # Cost of the suite submissions are judged on, used to keep
+        # expensive questions out of the daily set
+        # (see supabase/migrations/*_question_eval_cost.sql)
+        judged = [costs[i] for i in selected] if selected else costs
+        row["case_costs"] = costs
+        row["eval_cost_ms"] = round(sum(cost["ms"] for cost in judged), 3)
+        row["peak_memory_kb"] = max(cost["kb"] for cost in judged)
+    return row
+
+
 def contains_invalid_values(data):
     """
     Check if the data contains 'inf' or 'NaN'.
@@ -317,49 +271,18 @@ def contains_invalid_values(data):
     return False
 
 
-def process_and_upload_dataset(dataset, split):
-    uploaded_count = 0
-    for sample in dataset:
-        processed_question = process_question(sample)
-        if processed_question:
-            # Check for invalid values before upload
-            if contains_invalid_values(processed_question):
-                print(
-                    "Skipping question due to invalid values: "
-                    f"{processed_question['question'][:50]}..."
-                )
-                continue  # Skip uploading this entry
-
-            try:
-                response = requests.post(
-                    SUPABASE_ENDPOINT,
-                    headers=HEADERS,
-                    json=[processed_question],
-                )
-                if response.status_code == 201:
-                    uploaded_count += 1
-                else:
-                    print(
-                        f"Failed to upload. Status Code: {response.status_code}, "
-                        f"Response: {response.text}"
-                    )
-
-            except requests.exceptions.RequestException as e:
-                print(f"Request error: {e}")
-
-    print(f"Uploaded {uploaded_count} {split} questions.")
-
-
 # Main execution
 if __name__ == "__main__":
-    print("Loading dataset from Hugging Face...")
-    train_data = load_dataset("codeparrot/apps", split="train")
-    test_data = load_dataset("codeparrot/apps", split="test")
+    import asyncio
+
+    from dataset_stream import stream_samples
+    from test_case_pipeline import run_pipeline
 
+    # Only leetcode questions get generated test cases.
     print("Uploading training dataset...")
-    process_and_upload_dataset(train_data, "train")
+    asyncio.run(run_pipeline(stream_samples("train", ("leetcode",)), "train"))
 
     print("Uploading testing dataset...")
-    process_and_upload_dataset(test_data, "test")
+    asyncio.run(run_pipeline(stream_samples("test", ("leetcode",)), "test"))
 
     print("All uploads completed successfully.")
@@ -0,0 +1,107 @@
+"""
+Lazy iteration over APPS samples, so ingestion never holds a whole split
+in memory.
+
+Samples come from a local copy of the dataset when DATASET_DIR is set (the
+`train.jsonl` / `test.jsonl` files of codeparrot/apps, or `.parquet`
+exports), otherwise from Hugging Face in streaming mode. Samples from
+sources we don't use are dropped before their JSON fields are parsed: for
+jsonl files the raw line is checked before it is decoded at all.
+"""
+
+import os
+import json
+import time
+
+DATASET_NAME = "codeparrot/apps"
+DATASET_DIR = os.getenv("DATASET_DIR")
+SOURCES = ("leetcode", "codewars")
+# Parquet rows read per batch
+PARQUET_BATCH_SIZE = 1024
+
+
+class StreamStats:
+    """
+    Counts samples read and kept, reported with throughput.
+    """
+
+    def __init__(self, split):
+        self.split = split
+        self.read = 0
+        self.kept = 0
+        self.started = time.perf_counter()
+
+    def report(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        print(
+            f"{self.split} stream: read={self.read} "
+            f"({self.read / elapsed:.1f}/s), kept={self.kept} "
+            f"({self.kept / elapsed:.1f}/s)"
+        )
+
+
+def from_source(url, sources):
+    return any(source in url for source in sources)
+
+
+def read_jsonl(path, sources, stats):
+    encoded = [source.encode("utf-8") for source in sources]
+    with open(path, "rb") as f:
+        for line in f:
+            stats.read += 1
+            # Cheap check on the raw bytes; the url is confirmed below.
+            if not any(source in line for source in encoded):
+                continue
+            sample = json.loads(line)
+            if from_source(sample.get("url", ""), sources):
+                yield sample
+
+
+def read_parquet(path, sources, stats):
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=PARQUET_BATCH_SIZE):
+        urls = batch.column("url").to_pylist()
+        stats.read += len(urls)
+        keep = [i for i, url in enumerate(urls) if from_source(url, sources)]
+        if not keep:
+            continue
+        for sample in batch.take(keep).to_pylist():
+            yield sample
+
+
+def read_hugging_face(split, sources, stats):
+    from datasets import load_dataset
+
+    dataset = load_dataset(DATASET_NAME, split=split, streaming=True)
+    for sample in dataset:
+        stats.read += 1
+        if from_source(sample.get("url", ""), sources):
+            yield sample
+
+
+def stream_samples(split, sources=SOURCES, dataset_dir=DATASET_DIR):
+    """
+    Yields the split's samples from the given sources, one at a time, and
+    reports throughput once the stream is exhausted.
+    """
+    stats = StreamStats(split)
+    if dataset_dir:
+        jsonl_path = os.path.join(dataset_dir, f"{split}.jsonl")
+        parquet_path = os.path.join(dataset_dir, f"{split}.parquet")
+        if os.path.exists(jsonl_path):
+            samples = read_jsonl(jsonl_path, sources, stats)
+        elif os.path.exists(parquet_path):
+            samples = read_parquet(parquet_path, sources, stats)
+        else:
+            raise FileNotFoundError(
+                f"No {split}.jsonl or {split}.parquet in {dataset_dir}"
+            )
+    else:
+        samples = read_hugging_face(split, sources, stats)
+
+    for sample in samples:
+        stats.kept += 1
+        yield sample
+    stats.report()
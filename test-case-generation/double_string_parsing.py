@@ -0,0 +1,50 @@
+import json
+
+# Same normalization as questions/random-questions/double_string_parsing.py,
+# so rows written at ingest match rows converted by normalize_questions.py.
+
+
+def strip_extra_quotes(value):
+    """
+    If 'value' is something like '\"abc\"', parse it as JSON to see if it
+    resolves to a simpler string 'abc'. If parsing fails or doesn't yield
+    a string, just return 'value' unchanged.
+    """
+    if not isinstance(value, str):
+        return value
+
+    try:
+        parsed = json.loads(value)
+        # Only replace if the parsed result is actually a string.
+        if isinstance(parsed, str):
+            return parsed
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    return value
+
+
+def recursively_strip(obj):
+    """
+    Recursively walk lists/dicts/strings to apply `strip_extra_quotes`
+    to every string found.
+    """
+    if isinstance(obj, list):
+        return [recursively_strip(x) for x in obj]
+    elif isinstance(obj, dict):
+        return {k: recursively_strip(v) for k, v in obj.items()}
+    elif isinstance(obj, str):
+        return strip_extra_quotes(obj)
+    else:
+        return obj
+
+
+def canonical_test_cases(value):
+    """
+    Parses stored test cases (JSON text, or already parsed) into plain
+    Python values with any extra string layers removed. This is the form
+    kept in the canonical test_inputs / test_outputs columns.
+    """
+    if isinstance(value, str):
+        value = json.loads(value)
+    return recursively_strip(value)
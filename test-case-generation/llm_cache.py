@@ -0,0 +1,125 @@
+"""
+On-disk cache of LLM test-case generations.
+
+Entries are content-addressed: the file name is a sha256 of everything that
+determines the response (model, prompt version, question and examples), so
+a rerun over unchanged questions never calls the LLM again, and changing any
+of them simply misses. Each entry stores the raw reply and its parsed JSON.
+
+The directory is kept under a size limit by evicting the least recently
+used entries (by file mtime, which is bumped on every hit).
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".llm_cache")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 2**20)))
+
+
+def cache_key(
+    model, prompt_version, question, example_inputs, example_outputs
+):
+    """
+    Returns the hex digest identifying one generation request.
+    """
+    material = json.dumps(
+        [model, prompt_version, question, example_inputs, example_outputs],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, directory=LLM_CACHE_DIR, max_bytes=LLM_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        # Two-level fan-out keeps directories small.
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def get(self, key):
+        """
+        Returns the cached entry ({"raw": ..., "parsed": ...}) or None.
+        """
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key, raw, parsed):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps({"raw": raw, "parsed": parsed})
+
+        # Write then rename, so readers never see a partial entry.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """
+        Deletes least recently used entries until the cache is back under
+        90% of its limit, so eviction doesn't run on every put.
+        """
+        entries = sorted(self._entries())
+        self._size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+
+_default_cache = None
+
+
+def get_llm_cache():
+    """
+    Returns the shared cache, or None when LLM_CACHE_DIR is set empty.
+    """
+    global _default_cache
+    if not LLM_CACHE_DIR:
+        return None
+    if _default_cache is None:
+        _default_cache = LLMCache()
+    return _default_cache
@@ -0,0 +1,72 @@
+"""
+Coverage-guided minimization of generated test suites.
+
+The LLM produces ~15 cases per question, many of which exercise the same
+paths through the reference solution. Given each case's coverage arcs and
+runtime (solution_runner.profile_solution), pick a small subset that:
+
+- keeps the smallest and largest inputs as edge cases,
+- covers every arc the full suite covers, preferring cases that add the
+  most new arcs per second of runtime,
+- stays within a CPU budget per question.
+
+The full suite is still stored; the evaluator runs the pruned one on
+submission.
+"""
+
+import os
+import json
+
+# Seconds of reference-solution runtime the pruned suite may cost
+MINIMIZE_CPU_BUDGET = float(os.getenv("MINIMIZE_CPU_BUDGET", "1.0"))
+
+
+def input_size(case_input):
+    return len(json.dumps(case_input, default=str))
+
+
+def minimize_suite(inputs, profiles, cpu_budget=MINIMIZE_CPU_BUDGET):
+    """
+    Returns the sorted indices of the cases to keep.
+    """
+    if not profiles:
+        return []
+
+    sizes = [input_size(case_input) for case_input in inputs]
+    selected = []
+    covered = set()
+    spent = 0.0
+
+    def take(index):
+        nonlocal spent
+        selected.append(index)
+        covered.update(profiles[index]["arcs"])
+        spent += profiles[index]["seconds"]
+
+    # Edge cases first. The smallest input is always kept so the pruned
+    # suite is never empty; the largest only if it fits the budget.
+    cases = range(len(profiles))
+    smallest = min(cases, key=sizes.__getitem__)
+    largest = max(cases, key=sizes.__getitem__)
+    take(smallest)
+    if largest != smallest and profiles[largest]["seconds"] <= cpu_budget:
+        take(largest)
+
+    # Greedy set cover, weighted by runtime.
+    remaining = set(cases) - set(selected)
+    while remaining:
+        best = max(
+            remaining,
+            key=lambda i: (
+                len(set(profiles[i]["arcs"]) - covered)
+                / (profiles[i]["seconds"] + 1e-6),
+                -sizes[i],
+            ),
+        )
+        remaining.discard(best)
+        if not set(profiles[best]["arcs"]) - covered:
+            break
+        if spent + profiles[best]["seconds"] <= cpu_budget:
+            take(best)
+
+    return sorted(selected)
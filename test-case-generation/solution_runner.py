@@ -0,0 +1,314 @@
+"""
+Persistent pool of worker processes for running reference solutions.
+
+Each worker imports the solution prelude once at startup and then runs
+tasks sent over a pipe, so a question costs one round trip instead of a
+process start. A task that runs past its timeout has only its own worker
+killed and replaced; the rest of the pool keeps going.
+
+Everything a worker runs is defined at module level, so the pool works
+under the spawn start method as well as fork.
+"""
+
+import os
+import sys
+import copy
+import time
+import queue
+import atexit
+import threading
+import tracemalloc
+import multiprocessing
+
+# Solutions are compiled under this name, so the tracer can tell their
+# frames apart from library code.
+SOLUTION_FILENAME = "<solution>"
+SOLUTION_WORKERS = int(os.getenv("SOLUTION_WORKERS", str(os.cpu_count() or 1)))
+
+
+def build_prelude():
+    """
+    Returns the globals every solution runs with: the modules and names
+    solutions commonly use without importing them.
+    """
+    import math
+    import collections
+    import heapq
+    import queue as q
+    import itertools
+    import functools
+    import bisect
+    import re
+    import json
+    import string
+    import datetime
+    import statistics
+    import random
+    import typing
+    from typing import List, Tuple, Dict, Set, Optional
+    from collections import defaultdict, deque, Counter
+    from functools import lru_cache
+
+    return {
+        "__builtins__": __builtins__,
+        "math": math,
+        "collections": collections,
+        "heapq": heapq,
+        "queue": q,
+        "itertools": itertools,
+        "functools": functools,
+        "bisect": bisect,
+        "re": re,
+        "json": json,
+        "string": string,
+        "datetime": datetime,
+        "statistics": statistics,
+        "random": random,
+        "typing": typing,
+        "List": List,
+        "Tuple": Tuple,
+        "Dict": Dict,
+        "Set": Set,
+        "Optional": Optional,
+        "defaultdict": defaultdict,
+        "deque": deque,
+        "Counter": Counter,
+        "lru_cache": lru_cache,
+    }
+
+
+def load_entry_point(prelude, solution_code):
+    """
+    Executes the solution code and returns the callable to test: the first
+    method of a `Solution` class, else the first standalone function, else
+    None.
+    """
+    exec_globals = dict(prelude)
+    exec_locals = {}
+
+    # Execute the solution code safely
+    exec(
+        compile(solution_code, SOLUTION_FILENAME, "exec"),
+        exec_globals,
+        exec_locals,
+    )
+
+    # Check if it's a class-based solution
+    if "Solution" in exec_locals:
+        solution_instance = exec_locals["Solution"]()
+        for key in dir(solution_instance):
+            if not key.startswith("__") and callable(
+                getattr(solution_instance, key)
+            ):
+                return getattr(solution_instance, key)
+
+    # Check for standalone function
+    for name, obj in exec_locals.items():
+        if callable(obj) and not name.startswith("__"):
+            return obj
+
+    return None
+
+
+def run_solution(prelude, solution_code, inputs):
+    """
+    Runs the solution on every input. Returns the list of results, or an
+    "Error: ..." string.
+    """
+    try:
+        entry_point = load_entry_point(prelude, solution_code)
+        if entry_point is None:
+            return []  # If no valid function/class method found
+        return [entry_point(*inp) for inp in inputs]
+
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+def trace_arcs(function, args):
+    """
+    Calls function(*args) under a line tracer and returns the arcs
+    (function name, from line, to line) it took through the solution's own
+    code. A return is recorded as an arc to line -1, so both sides of every
+    branch show up as distinct arcs.
+    """
+    arcs = set()
+
+    def trace_calls(frame, event, arg):
+        if frame.f_code.co_filename != SOLUTION_FILENAME:
+            return None
+        name = frame.f_code.co_name
+        last_line = frame.f_lineno
+
+        def trace_lines(frame, event, arg):
+            nonlocal last_line
+            if event == "line":
+                arcs.add((name, last_line, frame.f_lineno))
+                last_line = frame.f_lineno
+            elif event == "return":
+                arcs.add((name, last_line, -1))
+            return trace_lines
+
+        return trace_lines
+
+    sys.settrace(trace_calls)
+    try:
+        function(*args)
+    finally:
+        sys.settrace(None)
+    return arcs
+
+
+def profile_solution(prelude, solution_code, inputs):
+    """
+    Runs the solution on every input three times: untraced to time it,
+    under tracemalloc alone for its peak memory (so the tracer's own
+    allocations aren't counted), and under the tracer for coverage.
+    Returns one {"output", "seconds", "arcs", "peak_kb"} per input, or an
+    "Error: ..." string.
+    """
+    try:
+        entry_point = load_entry_point(prelude, solution_code)
+        if entry_point is None:
+            return []
+        profiles = []
+        for inp in inputs:
+            # Fresh copies, in case the solution mutates its arguments.
+            args = copy.deepcopy(inp)
+            started = time.perf_counter()
+            output = entry_point(*args)
+            seconds = time.perf_counter() - started
+
+            args = copy.deepcopy(inp)
+            tracemalloc.start()
+            try:
+                entry_point(*args)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+            arcs = trace_arcs(entry_point, copy.deepcopy(inp))
+            profiles.append(
+                {
+                    "output": output,
+                    "seconds": seconds,
+                    "arcs": arcs,
+                    "peak_kb": peak // 1024,
+                }
+            )
+        return profiles
+
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+# Tasks a worker can run, by name
+TASKS = {"run": run_solution, "profile": profile_solution}
+
+
+def worker_main(conn):
+    """
+    Worker loop: receives (task, solution_code, inputs) and sends back the
+    result until the pipe is closed.
+    """
+    prelude = build_prelude()
+    while True:
+        try:
+            task, solution_code, inputs = conn.recv()
+        except (EOFError, OSError):
+            return
+        result = TASKS[task](prelude, solution_code, inputs)
+        try:
+            conn.send(result)
+        except Exception as e:
+            # e.g. a result that can't be pickled
+            conn.send(f"Error: {str(e)}")
+
+
+class Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=worker_main, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class SolutionRunner:
+    """
+    Runs solutions on a fixed pool of worker processes. `run` is safe to
+    call from many threads at once; each call takes an idle worker.
+    """
+
+    def __init__(self, workers=SOLUTION_WORKERS, start_method=None):
+        self.context = multiprocessing.get_context(start_method)
+        self.workers = [Worker(self.context) for _ in range(workers)]
+        self.idle = queue.Queue()
+        for worker in self.workers:
+            self.idle.put(worker)
+        self._lock = threading.Lock()
+
+    def _replace(self, worker):
+        worker.kill()
+        replacement = Worker(self.context)
+        with self._lock:
+            self.workers[self.workers.index(worker)] = replacement
+        return replacement
+
+    def run(self, solution_code, inputs, timeout=5):
+        """
+        Returns the solution's results, or an "Error: ..." string if it
+        failed, crashed its worker or ran longer than `timeout` seconds.
+        """
+        return self._submit("run", solution_code, inputs, timeout)
+
+    def profile(self, solution_code, inputs, timeout=5):
+        """
+        Returns per-input outputs, runtimes and coverage arcs (see
+        profile_solution), or an "Error: ..." string.
+        """
+        return self._submit("profile", solution_code, inputs, timeout)
+
+    def _submit(self, task, solution_code, inputs, timeout):
+        worker = self.idle.get()
+        try:
+            worker.conn.send((task, solution_code, inputs))
+            if worker.conn.poll(timeout):
+                return worker.conn.recv()
+            print(
+                f"Timeout! Solution execution took longer than {timeout} seconds."
+            )
+            worker = self._replace(worker)
+            return f"Error: Timeout after {timeout} seconds"
+        except (EOFError, OSError):
+            # The solution took its worker down with it.
+            worker = self._replace(worker)
+            return "Error: Worker exited while running the solution"
+        finally:
+            self.idle.put(worker)
+
+    def close(self):
+        for worker in self.workers:
+            worker.kill()
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_solution_runner():
+    """
+    Returns the shared runner, starting its workers on first use.
+    """
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = SolutionRunner()
+            atexit.register(_runner.close)
+    return _runner
@@ -0,0 +1,306 @@
+"""
+Staged, concurrent test case generation for data_upload_test_cases.py.
+
+Questions flow through four stages connected by bounded queues:
+
+    load -> LLM generation -> reference execution -> upload
+
+so waiting on the LLM overlaps running solutions and uploading. The LLM
+stage is limited by an AIMD limiter: concurrency grows by one per window of
+fast successful calls and halves on a 429 or a slow response.
+
+The LLM is called through its OpenAI-compatible REST API at
+OPENAI_BASE_URL, so the pipeline can be pointed at a local fake endpoint.
+"""
+
+import os
+import time
+import asyncio
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from data_upload import create_session, upload_batch
+from llm_cache import get_llm_cache
+from data_upload_test_cases import (
+    LLM_MODEL,
+    OPENAI_API_KEY,
+    SUPABASE_ENDPOINT,
+    build_llm_messages,
+    build_question_row,
+    build_test_case_prompt,
+    contains_invalid_values,
+    execute_and_minimize,
+    llm_cache_key,
+    parse_llm_response,
+    prepare_sample,
+)
+
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+# Pipeline tuning
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_LATENCY_TARGET = float(os.getenv("LLM_LATENCY_TARGET", "20"))
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", "5"))
+EXECUTION_CONCURRENCY = int(
+    os.getenv("EXECUTION_CONCURRENCY", str(os.cpu_count() or 1))
+)
+UPLOAD_BATCH_SIZE = int(os.getenv("UPLOAD_BATCH_SIZE", "100"))
+# Items buffered between two stages
+QUEUE_SIZE = 64
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class AIMDLimiter:
+    """
+    Concurrency limiter with additive increase / multiplicative decrease.
+
+    Each successful call under the latency target raises the limit by
+    1 / limit, i.e. by one after a full window of calls. A throttled (429)
+    or slow call multiplies it by `backoff`. Other failures (server errors,
+    unparseable replies) leave it unchanged.
+    """
+
+    def __init__(
+        self,
+        initial=LLM_MIN_CONCURRENCY,
+        minimum=LLM_MIN_CONCURRENCY,
+        maximum=LLM_MAX_CONCURRENCY,
+        latency_target=LLM_LATENCY_TARGET,
+        backoff=0.5,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self.in_flight < int(self.limit)
+            )
+            self.in_flight += 1
+
+    async def release(self, latency=None, throttled=False, succeeded=False):
+        async with self._condition:
+            self.in_flight -= 1
+            if throttled or (
+                latency is not None and latency > self.latency_target
+            ):
+                self.limit = max(self.minimum, self.limit * self.backoff)
+            elif succeeded:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class PipelineStats:
+    """
+    Per-stage counters, reported with throughput at the end of a run.
+    """
+
+    def __init__(self):
+        self.counts = {
+            "loaded": 0,
+            "prepared": 0,
+            "generated": 0,
+            "executed": 0,
+            "uploaded": 0,
+            "skipped": 0,
+        }
+        self.started = time.perf_counter()
+
+    def add(self, stage, n=1):
+        self.counts[stage] += n
+
+    def report(self, split):
+        elapsed = time.perf_counter() - self.started
+        rates = ", ".join(
+            f"{stage}={n} ({n / elapsed:.1f}/s)"
+            for stage, n in self.counts.items()
+        )
+        print(f"{split}: {rates} in {elapsed:.1f}s")
+
+
+async def request_test_cases(http, limiter, prepared, cache=None):
+    """
+    Asks the LLM for new test cases, retrying throttled and failed calls.
+    Returns {"inputs": [...], "outputs": [...]}, empty if every attempt
+    failed. Cached generations are returned without calling the LLM.
+    """
+    key = llm_cache_key(
+        prepared["question"],
+        prepared["example_inputs"],
+        prepared["example_outputs"],
+    )
+    if cache and (entry := cache.get(key)):
+        return entry["parsed"]
+
+    prompt = build_test_case_prompt(
+        prepared["question"],
+        prepared["example_inputs"],
+        prepared["example_outputs"],
+    )
+    payload = {
+        "model": LLM_MODEL,
+        "messages": build_llm_messages(prompt),
+        "temperature": 0.5,
+    }
+
+    for attempt in range(LLM_RETRIES):
+        await limiter.acquire()
+        started = time.perf_counter()
+        throttled = succeeded = False
+        delay = 2**attempt
+        try:
+            response = await http.post("/chat/completions", json=payload)
+            throttled = response.status_code == 429
+            if throttled:
+                # Honour the server's own estimate when it gives one.
+                delay = float(response.headers.get("Retry-After", delay))
+            response.raise_for_status()
+            raw_response = response.json()["choices"][0]["message"]["content"]
+            parsed = parse_llm_response(raw_response)
+            succeeded = True
+            if cache:
+                cache.put(key, raw_response, parsed)
+            return parsed
+        except Exception as e:
+            print(f"API error: {e}. Retrying in {delay} seconds...")
+        finally:
+            await limiter.release(
+                time.perf_counter() - started, throttled, succeeded
+            )
+        await asyncio.sleep(delay)
+
+    return {"inputs": [], "outputs": []}
+
+
+async def run_pipeline(
+    dataset,
+    split,
+    endpoint=SUPABASE_ENDPOINT,
+    llm_base_url=OPENAI_BASE_URL,
+    session=None,
+    limiter=None,
+    cache=None,
+    execution_concurrency=EXECUTION_CONCURRENCY,
+    upload_batch_size=UPLOAD_BATCH_SIZE,
+):
+    """
+    Generates test cases for every usable sample and upserts the results
+    into the questions table. Returns the PipelineStats for the run.
+    """
+    stats = PipelineStats()
+    limiter = limiter or AIMDLimiter()
+    cache = cache or get_llm_cache()
+    session = session or create_session()
+    loop = asyncio.get_running_loop()
+    llm_queue = asyncio.Queue(QUEUE_SIZE)
+    execution_queue = asyncio.Queue(QUEUE_SIZE)
+    upload_queue = asyncio.Queue(QUEUE_SIZE)
+    # Threads wait on solution processes and blocking uploads.
+    threads = ThreadPoolExecutor(max_workers=execution_concurrency + 1)
+    # The dataset is a blocking iterator (HF streaming or file reads), so it
+    # is pulled on its own thread to keep the loop free for LLM requests.
+    loader = ThreadPoolExecutor(max_workers=1)
+
+    def load_next(samples):
+        # Returns (next usable sample or _DONE, loaded, skipped).
+        loaded = skipped = 0
+        for sample in samples:
+            loaded += 1
+            prepared = prepare_sample(sample)
+            if prepared is not None:
+                return prepared, loaded, skipped
+            skipped += 1
+        return _DONE, loaded, skipped
+
+    async def load():
+        samples = iter(dataset)
+        while True:
+            prepared, loaded, skipped = await loop.run_in_executor(
+                loader, load_next, samples
+            )
+            stats.add("loaded", loaded)
+            stats.add("skipped", skipped)
+            if prepared is _DONE:
+                return
+            stats.add("prepared")
+            await llm_queue.put(prepared)
+
+    async def generate(http):
+        while (prepared := await llm_queue.get()) is not _DONE:
+            generated = await request_test_cases(
+                http, limiter, prepared, cache
+            )
+            stats.add("generated")
+            await execution_queue.put((prepared, generated.get("inputs", [])))
+
+    async def execute():
+        while (item := await execution_queue.get()) is not _DONE:
+            prepared, inputs = item
+            outputs, selected, costs = await loop.run_in_executor(
+                threads, execute_and_minimize, prepared["solution"], inputs
+            )
+            stats.add("executed")
+            row = build_question_row(
+                prepared, inputs, outputs, selected, costs
+            )
+            if not outputs or contains_invalid_values(row):
+                stats.add("skipped")
+                continue
+            await upload_queue.put({"split": split, **row})
+
+    async def upload():
+        batch = []
+        while True:
+            row = await upload_queue.get()
+            if row is not _DONE:
+                batch.append(row)
+            if batch and (row is _DONE or len(batch) >= upload_batch_size):
+                ok = await loop.run_in_executor(
+                    threads, upload_batch, session, batch, endpoint
+                )
+                stats.add("uploaded" if ok else "skipped", len(batch))
+                batch = []
+            if row is _DONE:
+                return
+
+    async def run_stage(workers, next_queue, count):
+        # Lets the next stage's workers finish once this stage is done.
+        await asyncio.gather(*workers)
+        for _ in range(count):
+            await next_queue.put(_DONE)
+
+    headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"}
+    async with httpx.AsyncClient(
+        base_url=llm_base_url, headers=headers, timeout=120.0
+    ) as http:
+        llm_workers = limiter.maximum
+        uploader = asyncio.create_task(upload())
+        try:
+            await asyncio.gather(
+                run_stage([load()], llm_queue, llm_workers),
+                run_stage(
+                    [generate(http) for _ in range(llm_workers)],
+                    execution_queue,
+                    execution_concurrency,
+                ),
+                run_stage(
+                    [execute() for _ in range(execution_concurrency)],
+                    upload_queue,
+                    1,
+                ),
+            )
+            await uploader
+        finally:
+            uploader.cancel()
+            threads.shutdown(wait=False)
+            loader.shutdown(wait=False)
+
+    stats.report(split)
+    return stats
@@ -0,0 +1,129 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from data_upload import create_session, process_and_upload_dataset
+
+
+# --- Local PostgREST stand-in ---
+class FakePostgREST:
+    """
+    Accepts upserts on /rest/v1/questions and records each request. The
+    first `fail_first` requests get a 400 so failures can be simulated.
+    """
+
+    def __init__(self, fail_first=0):
+        self.requests = []
+        self.rows = {}
+        self.fail_first = fail_first
+        self.lock = threading.Lock()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                with fake.lock:
+                    fake.requests.append(
+                        {
+                            "path": self.path,
+                            "prefer": self.headers.get("Prefer"),
+                            "rows": json.loads(body),
+                        }
+                    )
+                    failing = len(fake.requests) <= fake.fail_first
+                    if not failing:
+                        for row in json.loads(body):
+                            key = (row["split"], row["problem_id"])
+                            fake.rows[key] = row
+                self.send_response(400 if failing else 201)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.endpoint = (
+            f"http://127.0.0.1:{self.server.server_port}/rest/v1/questions"
+        )
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def postgrest():
+    server = FakePostgREST()
+    yield server
+    server.close()
+
+
+def make_samples(count):
+    return [
+        {
+            "problem_id": i,
+            "url": "https://leetcode.com/problems/p" if i % 3 else "x.com",
+            "input_output": json.dumps({"inputs": [[i]], "outputs": [i]}),
+            "solutions": json.dumps(["def f(x): return x"]),
+            "question": f"Question {i}",
+        }
+        for i in range(count)
+    ]
+
+
+# --- Test Cases ---
+def test_uploads_in_upsert_batches(postgrest, tmp_path):
+    """
+    Relevant samples should be upserted in batches of batch_size.
+    """
+    uploaded = process_and_upload_dataset(
+        make_samples(30),
+        "train",
+        session=create_session(),
+        endpoint=postgrest.endpoint,
+        batch_size=7,
+        concurrency=3,
+        checkpoint_path=str(tmp_path / "checkpoint.txt"),
+    )
+
+    # Every third sample isn't from leetcode/codewars.
+    assert uploaded == 20
+    assert len(postgrest.rows) == 20
+    assert sorted(len(r["rows"]) for r in postgrest.requests) == [6, 7, 7]
+    for request in postgrest.requests:
+        assert "on_conflict=split%2Cproblem_id" in request["path"]
+        assert "resolution=merge-duplicates" in request["prefer"]
+
+
+def test_rerun_resumes_from_checkpoint(postgrest, tmp_path):
+    """
+    A failed batch isn't checkpointed, so a rerun uploads only that batch.
+    """
+    postgrest.fail_first = 1
+    checkpoint = str(tmp_path / "checkpoint.txt")
+    options = dict(
+        endpoint=postgrest.endpoint,
+        batch_size=5,
+        concurrency=1,
+        checkpoint_path=checkpoint,
+    )
+
+    first = process_and_upload_dataset(
+        make_samples(15), "train", session=create_session(), **options
+    )
+    assert first == 5
+
+    second = process_and_upload_dataset(
+        make_samples(15), "train", session=create_session(), **options
+    )
+    assert second == 5
+    assert len(postgrest.rows) == 10
+
+    third = process_and_upload_dataset(
+        make_samples(15), "train", session=create_session(), **options
+    )
+    assert third == 0
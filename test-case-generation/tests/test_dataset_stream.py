@@ -0,0 +1,46 @@
+import json
+import pytest
+
+import dataset_stream
+from dataset_stream import stream_samples
+
+
+def write_split(tmp_path, split, count):
+    with open(tmp_path / f"{split}.jsonl", "w") as f:
+        for i in range(count):
+            url = ["https://leetcode.com/p", "https://codewars.com/k"][i % 2]
+            if i % 5 == 0:
+                url = "https://atcoder.jp/x"
+            f.write(json.dumps({"problem_id": i, "url": url}) + "\n")
+
+
+# --- Test Cases ---
+def test_streams_matching_samples_without_parsing_others(
+    tmp_path, monkeypatch
+):
+    """
+    Samples from other sources should be skipped before JSON decoding, and
+    the rest yielded lazily.
+    """
+    write_split(tmp_path, "train", 20)
+    decoded = []
+    real_loads = json.loads
+    monkeypatch.setattr(
+        dataset_stream.json,
+        "loads",
+        lambda line: decoded.append(line) or real_loads(line),
+    )
+
+    samples = stream_samples("train", ("leetcode",), str(tmp_path))
+    assert next(samples)["problem_id"] == 2
+    # Nothing past the first match has been read yet.
+    assert len(decoded) == 1
+
+    rest = [sample["problem_id"] for sample in samples]
+    assert rest == [4, 6, 8, 12, 14, 16, 18]
+    assert len(decoded) == 8
+
+
+def test_missing_split_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(stream_samples("test", dataset_dir=str(tmp_path)))
@@ -0,0 +1,45 @@
+import os
+
+from llm_cache import LLMCache, cache_key
+
+
+# --- Test Cases ---
+def test_key_changes_with_any_input():
+    base = cache_key("gpt-4o-mini", 1, "Q", [[1]], [2])
+    assert base == cache_key("gpt-4o-mini", 1, "Q", [[1]], [2])
+    assert base != cache_key("gpt-4o-mini", 2, "Q", [[1]], [2])
+    assert base != cache_key("gpt-4o", 1, "Q", [[1]], [2])
+    assert base != cache_key("gpt-4o-mini", 1, "Q", [[1]], [3])
+
+
+def test_round_trip_and_lru_eviction(tmp_path):
+    """
+    Entries should round-trip, and once the directory grows past its limit
+    the least recently used entries are evicted first.
+    """
+    cache = LLMCache(str(tmp_path), max_bytes=10_000)
+    raw = "x" * 1000
+    keys = [cache_key("m", 1, f"Q{i}", [], []) for i in range(5)]
+
+    cache.put(keys[0], raw, {"inputs": [[0]], "outputs": [0]})
+    assert cache.get(keys[0])["parsed"] == {"inputs": [[0]], "outputs": [0]}
+    assert cache.get(keys[1]) is None
+
+    for i, key in enumerate(keys):
+        cache.put(key, raw, {"inputs": [[i]]})
+        # Distinct mtimes so recency is unambiguous.
+        os.utime(cache._path(key), (i, i))
+    # Reading the oldest entry makes it the most recently used.
+    cache.get(keys[0])
+
+    for i in range(5, 12):
+        cache.put(cache_key("m", 1, f"Q{i}", [], []), raw, {})
+
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    total = sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(tmp_path)
+        for name in files
+    )
+    assert total <= 10_000
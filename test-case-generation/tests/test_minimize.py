@@ -0,0 +1,112 @@
+import data_upload_test_cases
+from minimize import minimize_suite
+from solution_runner import build_prelude, profile_solution
+
+SIGN = """
+class Solution:
+    def sign(self, x):
+        if x < 0:
+            return -1
+        if x == 0:
+            return 0
+        return 1
+"""
+
+
+# --- Test Cases ---
+def test_keeps_one_case_per_path_and_edge_cases():
+    """
+    Cases taking the same path through the solution should collapse to
+    one, while every branch stays covered and the smallest and largest
+    inputs are kept.
+    """
+    inputs = [[55], [66], [-7], [88], [-9], [0], [123456789]]
+    profiles = profile_solution(build_prelude(), SIGN, inputs)
+    assert [p["output"] for p in profiles] == [1, 1, -1, 1, -1, 0, 1]
+
+    selected = minimize_suite(inputs, profiles)
+
+    kept = [inputs[i] for i in selected]
+    # Smallest ([0]), largest, plus one negative case.
+    assert [0] in kept and [123456789] in kept
+    assert {profiles[i]["output"] for i in selected} == {-1, 0, 1}
+    assert len(selected) == 3
+
+
+def test_respects_cpu_budget():
+    profiles = [
+        {"output": i, "seconds": 0.4, "arcs": [("f", 1, i)]} for i in range(5)
+    ]
+    inputs = [[i] for i in range(5)]
+
+    selected = minimize_suite(inputs, profiles, cpu_budget=1.0)
+
+    # The smallest case plus whatever else fits in the budget.
+    assert len(selected) == 2
+    assert selected[0] == 0
+
+
+class FakeRunner:
+    """
+    Returns fixed results for run and profile, recording the timeouts.
+    """
+
+    def __init__(self, profiles):
+        self.profiles = profiles
+        self.timeouts = {}
+
+    def run(self, solution_code, inputs, timeout=5):
+        self.timeouts["run"] = timeout
+        return [1] * len(inputs)
+
+    def profile(self, solution_code, inputs, timeout=5):
+        self.timeouts["profile"] = timeout
+        return self.profiles
+
+
+def test_profiling_gets_its_own_budget(monkeypatch):
+    runner = FakeRunner(profile_solution(build_prelude(), SIGN, [[1], [2]]))
+    monkeypatch.setattr(
+        data_upload_test_cases, "get_solution_runner", lambda: runner
+    )
+
+    outputs, selected, costs = data_upload_test_cases.execute_and_minimize(
+        SIGN, [[1], [2]], timeout=5, profile_timeout=60
+    )
+
+    assert runner.timeouts == {"run": 5, "profile": 60}
+    assert outputs == [1, 1]
+    assert selected and len(costs) == 2
+
+
+def test_failed_profile_keeps_full_suite(monkeypatch):
+    """
+    A suite that runs within the plain timeout but not under the profiler
+    should still be uploaded, just without a pruned suite or costs.
+    """
+    runner = FakeRunner("Error: Timeout after 60 seconds")
+    monkeypatch.setattr(
+        data_upload_test_cases, "get_solution_runner", lambda: runner
+    )
+    prepared = {
+        "problem_id": 1,
+        "question": "Sign",
+        "solution": SIGN,
+        "example_inputs": [[1]],
+        "example_outputs": [1],
+        "difficulty": "introductory",
+        "starter_code": "",
+        "source": "leetcode",
+    }
+
+    outputs, selected, costs = data_upload_test_cases.execute_and_minimize(
+        SIGN, [[1], [2]]
+    )
+    row = data_upload_test_cases.build_question_row(
+        prepared, [[1], [2]], outputs, selected, costs
+    )
+
+    assert (outputs, selected, costs) == ([1, 1], None, None)
+    assert row["test_outputs"] == [1, 1]
+    assert "pruned_test_inputs" not in row
+    assert "eval_cost_ms" not in row
@@ -0,0 +1,261 @@
+import json
+import asyncio
+import threading
+import httpx
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from data_upload import create_session
+from data_upload_test_cases import build_question_row, prepare_sample
+from llm_cache import LLMCache
+from test_case_pipeline import AIMDLimiter, request_test_cases, run_pipeline
+
+
+# --- Local OpenAI-compatible and PostgREST stand-ins ---
+class FakeServer:
+    """
+    Answers /chat/completions with generated test cases (a 429 for the
+    first `throttle_first` calls, then a reply that isn't JSON for the next
+    `garble_next` calls) and records upserts on /rest/v1/questions_generated.
+    """
+
+    def __init__(self, throttle_first=0, garble_next=0):
+        self.llm_calls = 0
+        self.upserts = []
+        self.throttle_first = throttle_first
+        self.garble_next = garble_next
+        self.lock = threading.Lock()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(
+                    self.rfile.read(int(self.headers["Content-Length"]))
+                )
+                if self.path.startswith("/v1/chat/completions"):
+                    self.chat_completion()
+                else:
+                    with fake.lock:
+                        fake.upserts.append(body)
+                    self.reply(201, b"")
+
+            def chat_completion(self):
+                with fake.lock:
+                    fake.llm_calls += 1
+                    throttled = fake.llm_calls <= fake.throttle_first
+                    garbled = (
+                        fake.llm_calls
+                        <= fake.throttle_first + fake.garble_next
+                    )
+                if throttled:
+                    self.reply(429, b"{}", {"Retry-After": "0"})
+                    return
+                content = json.dumps({"inputs": [[2], [3]], "outputs": []})
+                if garbled:
+                    content = "Here are your test cases!"
+                self.reply(
+                    200,
+                    json.dumps(
+                        {"choices": [{"message": {"content": content}}]}
+                    ).encode("utf-8"),
+                )
+
+            def reply(self, status, body, headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        base = f"http://127.0.0.1:{self.server.server_port}"
+        self.llm_base_url = f"{base}/v1"
+        self.endpoint = f"{base}/rest/v1/questions_generated"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def server():
+    fake = FakeServer(throttle_first=1)
+    yield fake
+    fake.close()
+
+
+def make_samples(count):
+    return [
+        {
+            "problem_id": i,
+            "url": "https://leetcode.com/problems/p" if i % 2 else "x.com",
+            "input_output": json.dumps({"inputs": [[1]], "outputs": [2]}),
+            "solutions": json.dumps(
+                [
+                    "class Solution:\n    def double(self, x):\n"
+                    "        return x * 2\n"
+                ]
+            ),
+            "question": f"Question {i}",
+        }
+        for i in range(count)
+    ]
+
+
+def run(server, cache, samples):
+    return asyncio.run(
+        run_pipeline(
+            samples,
+            "train",
+            endpoint=server.endpoint,
+            llm_base_url=server.llm_base_url,
+            session=create_session(),
+            limiter=AIMDLimiter(initial=2, minimum=1, maximum=4),
+            cache=cache,
+            execution_concurrency=2,
+            upload_batch_size=2,
+        )
+    )
+
+
+# --- Test Cases ---
+def test_pipeline_generates_runs_and_uploads(server, tmp_path):
+    """
+    Every leetcode sample should go through generation and execution and be
+    upserted with the reference solution's outputs, even when the first LLM
+    call is throttled.
+    """
+    stats = run(server, LLMCache(str(tmp_path)), make_samples(6))
+
+    assert stats.counts["prepared"] == 3
+    assert stats.counts["generated"] == 3
+    assert stats.counts["uploaded"] == 3
+    # Two full batches would need four rows.
+    assert sorted(len(batch) for batch in server.upserts) == [1, 2]
+
+    rows = [row for batch in server.upserts for row in batch]
+    assert sorted(row["problem_id"] for row in rows) == [1, 3, 5]
+    for row in rows:
+        assert row["split"] == "train"
+        assert row["test_inputs"] == [[2], [3]]
+        assert row["test_outputs"] == [4, 6]
+        assert len(row["case_costs"]) == 2
+        assert row["eval_cost_ms"] >= 0
+        assert row["peak_memory_kb"] >= 0
+    # One throttled call plus one per question.
+    assert server.llm_calls == 4
+
+
+def test_samples_are_loaded_off_the_event_loop(server, tmp_path):
+    """
+    The dataset blocks while streaming, so it must not be pulled on the
+    event loop's thread.
+    """
+    loading_threads = set()
+
+    def samples():
+        for sample in make_samples(4):
+            loading_threads.add(threading.current_thread())
+            yield sample
+
+    stats = run(server, LLMCache(str(tmp_path)), samples())
+
+    assert stats.counts["loaded"] == 4
+    assert stats.counts["skipped"] == 2
+    assert stats.counts["uploaded"] == 2
+    assert threading.main_thread() not in loading_threads
+
+
+def test_rerun_uses_cached_generations(server, tmp_path):
+    """
+    A rerun over the same questions should upload the same rows without
+    calling the LLM again.
+    """
+    cache = LLMCache(str(tmp_path))
+    run(server, cache, make_samples(6))
+    calls = server.llm_calls
+
+    stats = run(server, cache, make_samples(6))
+
+    assert server.llm_calls == calls
+    assert cache.hits == 3
+    assert stats.counts["uploaded"] == 3
+
+
+def test_question_row_stores_canonical_test_cases():
+    """
+    test_inputs / test_outputs (and the pruned suite) should be stored in
+    the same canonical form normalize_questions.py writes, with extra
+    string layers removed, while the raw columns keep what the LLM sent.
+    """
+    prepared = prepare_sample(make_samples(2)[1])
+    inputs = [['"abc"'], ["d"]]
+    outputs = ['"abc"', "d"]
+
+    row = build_question_row(prepared, inputs, outputs, selected=[0])
+
+    assert row["generated_inputs"] == inputs
+    assert row["test_inputs"] == [["abc"], ["d"]]
+    assert row["test_outputs"] == ["abc", "d"]
+    assert row["pruned_test_inputs"] == [["abc"]]
+    assert row["pruned_test_outputs"] == ["abc"]
+    assert row["format_version"] == 1
+
+
+def test_unparseable_reply_is_not_a_success():
+    """
+    A 200 whose content isn't valid JSON is retried, and only the call that
+    parsed should grow the limit.
+    """
+    fake = FakeServer(garble_next=1)
+    prepared = prepare_sample(make_samples(2)[1])
+
+    async def scenario():
+        limiter = AIMDLimiter(initial=2, minimum=1, maximum=4)
+        async with httpx.AsyncClient(base_url=fake.llm_base_url) as http:
+            generated = await request_test_cases(http, limiter, prepared)
+        return generated, limiter
+
+    try:
+        generated, limiter = asyncio.run(scenario())
+    finally:
+        fake.close()
+
+    assert generated["inputs"] == [[2], [3]]
+    assert fake.llm_calls == 2
+    assert limiter.limit == 2.5
+    assert limiter.in_flight == 0
+
+
+def test_aimd_limiter_backs_off_and_recovers():
+    async def scenario():
+        limiter = AIMDLimiter(
+            initial=4, minimum=1, maximum=8, latency_target=1.0
+        )
+        await limiter.acquire()
+        await limiter.release(0.1, throttled=True)
+        assert limiter.limit == 2
+
+        await limiter.acquire()
+        await limiter.release(5.0, succeeded=True)
+        assert limiter.limit == 1
+
+        # Additive increase: one more slot after a full window of calls.
+        for _ in range(3):
+            await limiter.acquire()
+            await limiter.release(0.1, succeeded=True)
+        assert 2 < limiter.limit < 3
+
+        # Fast failures that weren't throttled don't count as successes.
+        limit = limiter.limit
+        await limiter.acquire()
+        await limiter.release(0.1)
+        assert limiter.limit == limit
+
+    asyncio.run(scenario())
@@ -0,0 +1,66 @@
+import pytest
+
+from solution_runner import SolutionRunner
+
+DOUBLE = "class Solution:\n    def double(self, x):\n        return x * 2\n"
+SPIN = "def spin(x):\n    while True:\n        pass\n"
+
+
+@pytest.fixture
+def runner():
+    # Spawn, so the test also covers platforms without fork.
+    pool = SolutionRunner(workers=2, start_method="spawn")
+    yield pool
+    pool.close()
+
+
+# --- Test Cases ---
+def test_runs_solutions_on_warm_workers(runner):
+    pids = [worker.process.pid for worker in runner.workers]
+
+    for _ in range(4):
+        assert runner.run(DOUBLE, [[1], [21]]) == [2, 42]
+    assert runner.run("def f(x):\n    return 1 / x\n", [[0]]).startswith(
+        "Error:"
+    )
+
+    # No task should have needed a new process.
+    assert [worker.process.pid for worker in runner.workers] == pids
+
+
+def test_timeout_replaces_only_the_slow_worker(runner):
+    pids = {worker.process.pid for worker in runner.workers}
+
+    assert runner.run(SPIN, [[1]], timeout=0.5) == (
+        "Error: Timeout after 0.5 seconds"
+    )
+
+    new_pids = {worker.process.pid for worker in runner.workers}
+    assert len(pids & new_pids) == 1
+    assert runner.run(DOUBLE, [[3]]) == [6]
+    assert runner.run(DOUBLE, [[4]]) == [8]
+
+
+def test_profile_reports_runtime_and_peak_memory(runner):
+    solution = "def grow(n):\n    return len([0] * n)\n"
+
+    profiles = runner.profile(solution, [[10], [1_000_000]])
+
+    assert [p["output"] for p in profiles] == [10, 1_000_000]
+    # A million-element list needs ~8MB; ten elements need next to none.
+    assert profiles[0]["peak_kb"] < 100 < 7000 < profiles[1]["peak_kb"]
+    assert all(p["seconds"] >= 0 and p["arcs"] for p in profiles)
+
+
+def test_peak_memory_excludes_the_tracer(runner):
+    """
+    Thousands of distinct arcs make the tracer allocate a sizeable set,
+    none of which belongs to the solution.
+    """
+    body = "".join(f"    x = {i}\n" for i in range(3000))
+    solution = f"def straight_line(n):\n{body}    return n\n"
+
+    profiles = runner.profile(solution, [[1]])
+
+    assert len(profiles[0]["arcs"]) > 3000
+    assert profiles[0]["peak_kb"] < 50